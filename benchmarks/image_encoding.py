@@ -0,0 +1,195 @@
+"""
+Image encoding benchmark for Matrichaya Properties.
+
+Runs every original image under media/ (the resize cache excluded) through
+the upload pipeline's crop and compares the old fixed encoder (JPEG,
+quality 85, optimize) with the perceptual encoder: JPEG only, as stored for
+uploads, and the smallest of JPEG/WebP/AVIF, as served by the resize
+endpoint to browsers that accept them. Reports bytes saved, the SSIM each
+encoding reaches and encode time per image. Results are saved as JSON in
+benchmarks/results/ so runs can be compared across commits.
+
+Usage:
+    python benchmarks/image_encoding.py                    # 1200x650 carousel crop of media/
+    python benchmarks/image_encoding.py --size 400x240     # card-sized variants
+    python benchmarks/image_encoding.py --target 0.99      # stricter SSIM target
+    python benchmarks/image_encoding.py --media-dir /path/to/media --no-save
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from io import BytesIO
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif')
+
+sys.path.insert(0, PROJECT_DIR)
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'matrichaya_properties.settings')
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def find_images(media_dir, exclude_dir):
+    exclude_dir = os.path.realpath(exclude_dir)
+    for directory, dirnames, filenames in os.walk(media_dir):
+        if os.path.realpath(directory).startswith(exclude_dir):
+            dirnames[:] = []
+            continue
+        for filename in sorted(filenames):
+            if os.path.splitext(filename)[1].lower() in IMAGE_EXTENSIONS:
+                yield os.path.join(directory, filename)
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def measure(path, width, height, target):
+    from PIL import Image
+    from properties import image_utils
+
+    with Image.open(path) as img:
+        img = image_utils.fit_image(image_utils.to_rgb(img), width, height, 'cover')
+    reference = image_utils.luma(img)
+
+    def score(data):
+        with Image.open(BytesIO(data)) as decoded:
+            return image_utils.ssim(reference, image_utils.luma(decoded))
+
+    baseline, baseline_ms = timed(image_utils.encode, img, 'jpeg', 85)
+    (jpeg, jpeg_quality, jpeg_ssim), jpeg_ms = timed(image_utils.encode_to_target, img, 'jpeg', target, reference)
+
+    best = {'format': 'jpeg', 'bytes': len(jpeg), 'quality': jpeg_quality, 'ssim': jpeg_ssim, 'ms': jpeg_ms}
+    formats = {'jpeg': dict(best)}
+    for name in image_utils.available_formats():
+        if name == 'jpeg':
+            continue
+        (data, quality, ssim), ms = timed(image_utils.encode_to_target, img, name, target, reference)
+        formats[name] = {'format': name, 'bytes': len(data), 'quality': quality, 'ssim': ssim, 'ms': ms}
+        best['ms'] += ms
+        if len(data) < best['bytes']:
+            best.update(format=name, bytes=len(data), quality=quality, ssim=ssim)
+
+    return {
+        'baseline': {'bytes': len(baseline), 'ssim': score(baseline), 'ms': baseline_ms},
+        'jpeg': formats['jpeg'],
+        'best': best,
+        'formats': formats,
+    }
+
+
+def summarize(rows):
+    totals = {'baseline': 0, 'jpeg': 0, 'best': 0}
+    times = {'baseline': 0.0, 'jpeg': 0.0, 'best': 0.0}
+    for row in rows:
+        for key in totals:
+            totals[key] += row[key]['bytes']
+            times[key] += row[key]['ms']
+
+    def saved(key):
+        return 100.0 * (1 - totals[key] / totals['baseline']) if totals['baseline'] else 0.0
+
+    count = len(rows) or 1
+    return {
+        'images': len(rows),
+        'bytes': totals,
+        'saved_pct': {'jpeg': saved('jpeg'), 'best': saved('best')},
+        'mean_ms': {key: value / count for key, value in times.items()},
+        'best_formats': {
+            name: sum(1 for row in rows if row['best']['format'] == name)
+            for name in sorted({row['best']['format'] for row in rows})
+        },
+    }
+
+
+def print_report(rows, summary):
+    header = (f"{'image':<52}{'q85 KB':>8}{'ssim':>7}{'jpeg KB':>9}{'q':>4}"
+              f"{'best KB':>9}{'fmt':>6}{'q85 ms':>8}{'jpeg ms':>9}{'best ms':>9}")
+    print('\n' + header)
+    print('-' * len(header))
+    for row in rows:
+        base, jpeg, best = row['baseline'], row['jpeg'], row['best']
+        print(f"{row['image'][-52:]:<52}{base['bytes'] / 1024:>8.1f}{base['ssim']:>7.3f}"
+              f"{jpeg['bytes'] / 1024:>9.1f}{jpeg['quality']:>4}{best['bytes'] / 1024:>9.1f}{best['format']:>6}"
+              f"{base['ms']:>8.1f}{jpeg['ms']:>9.1f}{best['ms']:>9.1f}")
+
+    totals, saved, mean_ms = summary['bytes'], summary['saved_pct'], summary['mean_ms']
+    print(f"\n{summary['images']} images")
+    print(f"  fixed JPEG q85:      {totals['baseline'] / 1024:>9.1f} KB  {mean_ms['baseline']:>7.1f} ms/image")
+    print(f"  perceptual JPEG:     {totals['jpeg'] / 1024:>9.1f} KB  {mean_ms['jpeg']:>7.1f} ms/image  "
+          f"({saved['jpeg']:+.1f}% saved)")
+    print(f"  perceptual best-of:  {totals['best'] / 1024:>9.1f} KB  {mean_ms['best']:>7.1f} ms/image  "
+          f"({saved['best']:+.1f}% saved)")
+    print('  winning formats:     ' + ', '.join(f'{name} {count}' for name, count in summary['best_formats'].items()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--media-dir', help='Image corpus (defaults to MEDIA_ROOT)')
+    parser.add_argument('--size', default='1200x650', help='Crop each image to WIDTHxHEIGHT first')
+    parser.add_argument('--target', type=float, help='SSIM target (defaults to IMAGE_SSIM_TARGET)')
+    parser.add_argument('--output-dir', default=os.path.join(BENCHMARK_DIR, 'results'), help='Where to store result JSON')
+    parser.add_argument('--no-save', action='store_true', help='Only print the report')
+    args = parser.parse_args()
+
+    import django
+    django.setup()
+    from django.conf import settings
+    from properties import image_utils
+
+    if image_utils.np is None:
+        parser.error('NumPy is required for the perceptual encoder')
+    width, height = (int(value) for value in args.size.lower().split('x'))
+    target = args.target or image_utils.get_ssim_target()
+    media_dir = args.media_dir or str(settings.MEDIA_ROOT)
+    exclude_dir = os.path.join(media_dir, 'cache')
+
+    print(f"Encoding {media_dir} at {width}x{height}, SSIM target {target}, "
+          f"formats {', '.join(image_utils.available_formats())}")
+    rows = []
+    for path in find_images(media_dir, exclude_dir):
+        try:
+            row = measure(path, width, height, target)
+        except OSError as e:
+            print(f'Skipping {path}: {e}')
+            continue
+        row['image'] = os.path.relpath(path, media_dir)
+        rows.append(row)
+
+    summary = summarize(rows)
+    print_report(rows, summary)
+    if args.no_save:
+        return
+
+    revision = git_revision()
+    timestamp = datetime.now(timezone.utc)
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"images-{timestamp.strftime('%Y%m%d-%H%M%S')}-{revision}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'timestamp': timestamp.isoformat(),
+            'config': {'media_dir': media_dir, 'size': [width, height], 'target': target},
+            'summary': summary,
+            'images': rows,
+        }, f, indent=2)
+    print(f'\nSaved results to {os.path.relpath(path, PROJECT_DIR)}')
+
+
+if __name__ == '__main__':
+    main()
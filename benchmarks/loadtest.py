@@ -0,0 +1,336 @@
+"""
+Load-testing harness for Matrichaya Properties.
+
+Boots the app under gunicorn against a freshly migrated and seeded SQLite
+database, drives the traffic mix from mix.json and reports latency
+percentiles and throughput per scenario. Results are saved as JSON in
+benchmarks/results/ so runs can be compared across commits.
+
+Usage:
+    python benchmarks/loadtest.py                      # boot, seed and run the default mix
+    python benchmarks/loadtest.py --duration 60 -c 16  # longer run, more concurrent clients
+    python benchmarks/loadtest.py --url http://127.0.0.1:8000  # run against an already running server
+    python benchmarks/loadtest.py --compare results/a.json results/b.json
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BENCHMARK_DIR)
+ADMIN_USERNAME = 'loadtest'
+ADMIN_PASSWORD = 'loadtest-password'
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Server:
+    """A gunicorn process serving the app from a throwaway seeded database"""
+
+    def __init__(self, port, workers, seed_args):
+        self.port = port
+        self.workers = workers
+        self.seed_args = seed_args
+        self.tmpdir = tempfile.mkdtemp(prefix='matrichaya-loadtest-')
+        self.env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{os.path.join(self.tmpdir, 'db.sqlite3')}",
+            METRICS_DIR=os.path.join(self.tmpdir, 'metrics'),
+            PROFILE_DIR=os.path.join(self.tmpdir, 'profiles'),
+            MEDIA_ROOT=os.path.join(self.tmpdir, 'media'),
+            CACHE_DIR=os.path.join(self.tmpdir, 'cache'),
+            # Clients pose as visitors behind one proxy, so each gets its own rate limit bucket
+            TRUSTED_PROXY_COUNT='1',
+            PYTHONUNBUFFERED='1',
+        )
+        self.process = None
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.port}'
+
+    def manage(self, *args):
+        subprocess.run(
+            [sys.executable, 'manage.py', *args],
+            cwd=PROJECT_DIR, env=self.env, check=True, stdout=subprocess.DEVNULL,
+        )
+
+    def prepare(self):
+        print(f'Preparing database in {self.tmpdir}')
+        self.manage('migrate', '--noinput')
+        self.manage(*self.seed_args)
+        self.manage('shell', '-c', (
+            'from django.contrib.auth.models import User; '
+            f"u, _ = User.objects.get_or_create(username='{ADMIN_USERNAME}', defaults={{'is_staff': True}}); "
+            f"u.is_staff = True; u.set_password('{ADMIN_PASSWORD}'); u.save()"
+        ))
+
+    def start(self):
+        self.process = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', 'matrichaya_properties.wsgi:application',
+             '--workers', str(self.workers), '--bind', f'127.0.0.1:{self.port}',
+             '--log-level', 'warning'],
+            cwd=PROJECT_DIR, env=self.env, stdout=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            try:
+                urllib.request.urlopen(f'{self.url}/healthz', timeout=1).read()
+                print(f'gunicorn ready on {self.url} with {self.workers} workers')
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise RuntimeError('gunicorn did not become healthy within 30 seconds')
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+
+
+class Client:
+    """One simulated visitor with its own cookie jar"""
+
+    def __init__(self, base_url, index):
+        self.base_url = base_url
+        self.index = index
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.logged_in = False
+        self.counter = 0
+
+    def login(self):
+        self.opener.open(f'{self.base_url}/custom-admin/login/', timeout=30).read()
+        token = next((cookie.value for cookie in self.cookies if cookie.name == 'csrftoken'), '')
+        data = urllib.parse.urlencode({
+            'username': ADMIN_USERNAME,
+            'password': ADMIN_PASSWORD,
+            'csrfmiddlewaretoken': token,
+        }).encode()
+        self.opener.open(f'{self.base_url}/custom-admin/login/', data=data, timeout=30).read()
+        self.logged_in = True
+
+    def build_request(self, scenario):
+        url = self.base_url + scenario['path']
+        if scenario.get('query'):
+            url += '?' + urllib.parse.urlencode(random.choice(scenario['query']))
+        # The hop a single trusted proxy would add; servers started with --url
+        # only honour it when they run with TRUSTED_PROXY_COUNT=1
+        headers = {'X-Forwarded-For': f'10.0.{self.index % 256}.{random.randint(1, 254)}'}
+        if scenario['method'] == 'POST_JSON':
+            self.counter += 1
+            body = json.dumps({
+                'first_name': 'Load',
+                'last_name': f'Test {self.index}',
+                'email': f'loadtest{self.index}@example.com',
+                'phone': f'01700{self.index:06d}',
+                'property_type': 'land',
+                'budget': '50-100',
+                'message': f'Load test message {self.counter} from client {self.index}',
+            }).encode()
+            headers['Content-Type'] = 'application/json'
+            return urllib.request.Request(url, data=body, headers=headers, method='POST')
+        return urllib.request.Request(url, headers=headers)
+
+    def execute(self, scenario):
+        if scenario.get('admin') and not self.logged_in:
+            self.login()
+        request = self.build_request(scenario)
+        start = time.perf_counter()
+        try:
+            with self.opener.open(request, timeout=30) as response:
+                size = len(response.read())
+                status = response.status
+        except urllib.error.HTTPError as e:
+            size = len(e.read())
+            status = e.code
+        except OSError:
+            size, status = 0, 0
+        return time.perf_counter() - start, status, size
+
+
+def run_load(base_url, mix, duration, concurrency, warmup):
+    scenarios = mix['scenarios']
+    weights = [scenario['weight'] for scenario in scenarios]
+    samples = defaultdict(list)
+    statuses = defaultdict(Counter)
+    sizes = defaultdict(int)
+    lock = threading.Lock()
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+
+    def worker(index):
+        client = Client(base_url, index)
+        local = []
+        while time.monotonic() < stop_at:
+            scenario = random.choices(scenarios, weights)[0]
+            latency, status, size = client.execute(scenario)
+            if time.monotonic() >= measure_from:
+                local.append((scenario['name'], latency, status, size))
+        with lock:
+            for name, latency, status, size in local:
+                samples[name].append(latency)
+                statuses[name][status] += 1
+                sizes[name] += size
+
+    print(f'Running {concurrency} clients for {warmup}s warmup + {duration}s')
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(samples, statuses, sizes, duration)
+
+
+def summarize(samples, statuses, sizes, duration):
+    def stats(values, status_counts, total_bytes):
+        values = sorted(values)
+        count = len(values)
+        return {
+            'requests': count,
+            'rps': round(count / duration, 2),
+            'mean_ms': round(sum(values) / count * 1000, 2) if count else 0.0,
+            'p50_ms': round(percentile(values, 50) * 1000, 2),
+            'p95_ms': round(percentile(values, 95) * 1000, 2),
+            'p99_ms': round(percentile(values, 99) * 1000, 2),
+            'max_ms': round(values[-1] * 1000, 2) if values else 0.0,
+            'avg_bytes': int(total_bytes / count) if count else 0,
+            'status': {str(status): value for status, value in sorted(status_counts.items())},
+        }
+
+    scenarios = {name: stats(values, statuses[name], sizes[name]) for name, values in sorted(samples.items())}
+    all_values = [value for values in samples.values() for value in values]
+    all_statuses = sum(statuses.values(), Counter())
+    overall = stats(all_values, all_statuses, sum(sizes.values()))
+    return {'overall': overall, 'scenarios': scenarios}
+
+
+def print_report(results):
+    header = f"{'scenario':<28}{'reqs':>8}{'rps':>9}{'p50':>9}{'p95':>9}{'p99':>9}  status"
+    print('\n' + header)
+    print('-' * len(header))
+    rows = list(results['scenarios'].items()) + [('OVERALL', results['overall'])]
+    for name, data in rows:
+        status = ' '.join(f'{code}:{count}' for code, count in data['status'].items())
+        print(f"{name:<28}{data['requests']:>8}{data['rps']:>9.1f}{data['p50_ms']:>9.1f}"
+              f"{data['p95_ms']:>9.1f}{data['p99_ms']:>9.1f}  {status}")
+
+
+def compare(path_a, path_b):
+    with open(path_a) as f:
+        a = json.load(f)
+    with open(path_b) as f:
+        b = json.load(f)
+    print(f"A: {a['revision']} {a['timestamp']}\nB: {b['revision']} {b['timestamp']}\n")
+    print(f"{'scenario':<28}{'rps A':>9}{'rps B':>9}{'p95 A':>9}{'p95 B':>9}{'p95 delta':>11}")
+    names = sorted(set(a['results']['scenarios']) | set(b['results']['scenarios'])) + ['OVERALL']
+    for name in names:
+        if name == 'OVERALL':
+            data_a, data_b = a['results']['overall'], b['results']['overall']
+        else:
+            data_a = a['results']['scenarios'].get(name)
+            data_b = b['results']['scenarios'].get(name)
+            if not data_a or not data_b:
+                continue
+        delta = (data_b['p95_ms'] - data_a['p95_ms']) / data_a['p95_ms'] * 100 if data_a['p95_ms'] else 0.0
+        print(f"{name:<28}{data_a['rps']:>9.1f}{data_b['rps']:>9.1f}{data_a['p95_ms']:>9.1f}"
+              f"{data_b['p95_ms']:>9.1f}{delta:>+10.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', default=os.path.join(BENCHMARK_DIR, 'mix.json'), help='Traffic mix JSON file')
+    parser.add_argument('--duration', type=int, help='Measured seconds (overrides the mix file)')
+    parser.add_argument('-c', '--concurrency', type=int, help='Concurrent clients (overrides the mix file)')
+    parser.add_argument('--warmup', type=int, help='Warmup seconds excluded from results')
+    parser.add_argument('--workers', type=int, default=2, help='gunicorn workers')
+    parser.add_argument('--port', type=int, default=8765, help='Port for the gunicorn server')
+    parser.add_argument('--url', help='Use an already running server instead of booting one')
+    parser.add_argument('--seed', nargs='+', default=['seed_data', '--land-properties', '2000', '--seed', '1'],
+                        help='Management command (and arguments) used to seed the database')
+    parser.add_argument('--output-dir', default=os.path.join(BENCHMARK_DIR, 'results'), help='Where to store result JSON')
+    parser.add_argument('--compare', nargs=2, metavar=('A', 'B'), help='Compare two result files and exit')
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    with open(args.mix) as f:
+        mix = json.load(f)
+    duration = args.duration or mix.get('duration', 30)
+    concurrency = args.concurrency or mix.get('concurrency', 8)
+    warmup = args.warmup if args.warmup is not None else mix.get('warmup', 3)
+
+    server = None
+    base_url = args.url
+    if not base_url:
+        server = Server(args.port, args.workers, args.seed)
+        server.prepare()
+        server.start()
+        base_url = server.url
+    try:
+        results = run_load(base_url, mix, duration, concurrency, warmup)
+    finally:
+        if server:
+            server.stop()
+
+    print_report(results)
+    revision = git_revision()
+    timestamp = datetime.now(timezone.utc)
+    os.makedirs(args.output_dir, exist_ok=True)
+    path = os.path.join(args.output_dir, f"{timestamp.strftime('%Y%m%d-%H%M%S')}-{revision}.json")
+    with open(path, 'w') as f:
+        json.dump({
+            'revision': revision,
+            'timestamp': timestamp.isoformat(),
+            'config': {
+                'mix': os.path.relpath(args.mix, PROJECT_DIR),
+                'duration': duration,
+                'concurrency': concurrency,
+                'warmup': warmup,
+                'workers': None if args.url else args.workers,
+                'url': base_url if args.url else None,
+                'seed': args.seed,
+            },
+            'results': results,
+        }, f, indent=2)
+    print(f'\nSaved results to {os.path.relpath(path, PROJECT_DIR)}')
+
+
+if __name__ == '__main__':
+    main()
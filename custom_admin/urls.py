@@ -11,6 +11,13 @@ urlpatterns = [
     # Dashboard
     path('', views.dashboard, name='dashboard'),
     
+    # Slow Queries
+    path('slow-queries/', views.slow_queries, name='slow_queries'),
+    
+    # Request Profiles
+    path('profiles/', views.profiles, name='profiles'),
+    path('profiles/<str:view_name>/<str:filename>/', views.download_profile, name='download_profile'),
+    
     
     # Logo Upload
     path('logo-upload/', views.logo_upload, name='logo_upload'),
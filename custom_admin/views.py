@@ -4,6 +4,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.http import JsonResponse
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q, Count
 from django.utils import timezone
 from django.core.files.storage import default_storage
@@ -11,22 +12,19 @@ from django.core.files.base import ContentFile
 import json
 import os
 
-from properties.models import CompanyInfo, NavbarImage, CarouselSlide, LandProperty, ContactMessage
-from properties.image_utils import resize_image, delete_image_file
+from properties.models import (
+    CompanyInfo, NavbarImage, CarouselSlide, LandProperty, LandPropertyImage, ContactMessage,
+    carousel_slides_bulk_created, land_property_images_bulk_created,
+)
+from properties.image_utils import resize_image, resize_images, delete_image_file
+from properties.slow_queries import collect_slow_queries, slow_query_log
+from properties.profiling import list_profiles, get_profile_path, make_profile_token
+from properties.uploads import get_upload_errors, image_uploads
+from properties.views import get_client_ip
 from .models import AdminProfile, AdminActivity
 from django.contrib.auth.hashers import check_password, make_password
 
 
-def get_client_ip(request):
-    """Get client IP address"""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
-
-
 def log_admin_activity(admin, action, model_name, description, request, object_id=None):
     """Log admin activity"""
     AdminActivity.objects.create(
@@ -40,6 +38,14 @@ def log_admin_activity(admin, action, model_name, description, request, object_i
     )
 
 
+def reject_invalid_uploads(request):
+    """Report files the upload handler refused; True if the action should not go ahead"""
+    errors = get_upload_errors(request)
+    for error in errors:
+        messages.error(request, f'Upload rejected: {error}')
+    return bool(errors)
+
+
 def admin_login(request):
     """Custom admin login"""
     if request.user.is_authenticated:
@@ -117,11 +123,64 @@ def dashboard(request):
 
 
 @login_required
+def slow_queries(request):
+    """Slow query log captured by the DB instrumentation layer"""
+    from django.conf import settings
+    
+    if request.method == 'POST' and request.POST.get('action') == 'clear':
+        slow_query_log.clear()
+        log_admin_activity(request.user, 'delete', 'SlowQuery', 'Cleared slow query log', request)
+        messages.success(request, 'Slow query log cleared!')
+        return redirect('custom_admin:slow_queries')
+    
+    entries, recent_queries, workers = collect_slow_queries()
+    
+    context = {
+        'entries': entries,
+        'recent_queries': recent_queries[:50],
+        'threshold_ms': getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100),
+        'total_slow_queries': sum(entry['count'] for entry in entries),
+        'workers': workers,
+    }
+    return render(request, 'custom_admin/slow_queries.html', context)
+
+
+@login_required
+def profiles(request):
+    """List request profiles captured by the profiling middleware"""
+    from django.conf import settings
+    
+    context = {
+        'profiles': list_profiles()[:200],
+        'sample_rate': getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0),
+        'profile_mode': getattr(settings, 'PROFILE_MODE', 'sampler'),
+        'profile_token': make_profile_token(),
+    }
+    return render(request, 'custom_admin/profiles.html', context)
+
+
+@login_required
+def download_profile(request, view_name, filename):
+    """Download a collapsed-stack profile"""
+    from django.http import FileResponse, Http404
+    
+    path = get_profile_path(view_name, filename)
+    if path is None:
+        raise Http404('Profile not found')
+    log_admin_activity(request.user, 'view', 'Profile', f'Downloaded profile: {view_name}/{filename}', request)
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=f'{view_name}-{filename}', content_type='text/plain')
+
+
+@login_required
+@image_uploads
 def logo_upload(request):
     """Manage logo uploads"""
     logos = NavbarImage.objects.filter(image_type='logo').order_by('order', '-created_at')
     
     if request.method == 'POST':
+        if reject_invalid_uploads(request):
+            return redirect('custom_admin:logo_upload')
+        
         action = request.POST.get('action')
         
         if action == 'upload':
@@ -198,6 +257,7 @@ def logo_upload(request):
 
 
 @login_required
+@image_uploads
 def carousel_slides(request):
     """Manage carousel slides"""
     slides = CarouselSlide.objects.all().order_by('order', '-created_at')
@@ -205,6 +265,10 @@ def carousel_slides(request):
     if request.method == 'POST':
         action = request.POST.get('action')
         
+        # Batch uploads report rejected files alongside the others instead
+        if action != 'batch_create' and reject_invalid_uploads(request):
+            return redirect('custom_admin:carousel_slides')
+        
         if action == 'create':
             try:
                 # Process the uploaded image
@@ -224,6 +288,39 @@ def carousel_slides(request):
             except Exception as e:
                 messages.error(request, f'Error creating carousel slide: {str(e)}')
         
+        elif action == 'batch_create':
+            reject_invalid_uploads(request)
+            image_files = request.FILES.getlist('images')
+            try:
+                # Resize every image in parallel, then insert all the slides at once
+                results = resize_images(image_files, target_width=1200, target_height=650)
+                order = int(request.POST.get('order', 0))
+                slides, created_names = [], []
+                for image_file, (processed_image, error) in zip(image_files, results):
+                    if error:
+                        messages.error(request, f'Error processing "{image_file.name}": {error}')
+                        continue
+                    slides.append(CarouselSlide(
+                        title=request.POST.get('title') or os.path.splitext(image_file.name)[0].replace('_', ' ').replace('-', ' ').title(),
+                        description=request.POST.get('description', ''),
+                        image=processed_image,
+                        button_text=request.POST.get('button_text', 'More Details'),
+                        button_url=request.POST.get('button_url', ''),
+                        is_active=request.POST.get('is_active') == 'on',
+                        order=order + len(slides),
+                    ))
+                    created_names.append(image_file.name)
+                
+                if slides:
+                    CarouselSlide.objects.bulk_create(slides)
+                    carousel_slides_bulk_created()
+                    log_admin_activity(request.user, 'create', 'CarouselSlide', f'Batch created {len(slides)} carousel slides', request)
+                    messages.success(request, f'Created {len(slides)} carousel slides from {", ".join(created_names)}. Images resized to 1200x650.')
+                elif not image_files:
+                    messages.error(request, 'Select at least one image to upload.')
+            except Exception as e:
+                messages.error(request, f'Error creating carousel slides: {str(e)}')
+        
         elif action == 'toggle_active':
             slide_id = request.POST.get('slide_id')
             slide_obj = get_object_or_404(CarouselSlide, pk=slide_id)
@@ -277,9 +374,10 @@ def carousel_slides(request):
 
 
 @login_required
+@image_uploads
 def land_properties(request):
     """Manage land properties"""
-    land_properties_list = LandProperty.objects.all().order_by('-created_at')
+    land_properties_list = LandProperty.objects.annotate(gallery_count=Count('images')).order_by('-created_at')
     
     # Search functionality
     search = request.GET.get('search', '')
@@ -319,6 +417,10 @@ def land_properties(request):
     if request.method == 'POST':
         action = request.POST.get('action')
         
+        # Gallery uploads report rejected files alongside the others instead
+        if action != 'upload_gallery' and reject_invalid_uploads(request):
+            return redirect('custom_admin:land_properties')
+        
         if action == 'create':
             try:
                 land_property = LandProperty.objects.create(
@@ -384,6 +486,43 @@ def land_properties(request):
             log_admin_activity(request.user, 'delete', 'LandProperty', f'Deleted land property: {land_property_name}', request, land_property_id)
             messages.success(request, f'Land property "{land_property_name}" deleted successfully!')
         
+        elif action == 'upload_gallery':
+            reject_invalid_uploads(request)
+            land_property_id = request.POST.get('land_property_id')
+            land_property = get_object_or_404(LandProperty, pk=land_property_id)
+            image_files = request.FILES.getlist('gallery_images')
+            try:
+                # Bound the stored originals in parallel; the site serves resized variants of them
+                results = resize_images(image_files, target_width=1920, target_height=1920, fit='contain')
+                first_order = (land_property.images.order_by('-order').values_list('order', flat=True).first() or 0) + 1
+                set_cover = request.POST.get('set_cover') == 'on'
+                images, added_names = [], []
+                for image_file, (processed_image, error) in zip(image_files, results):
+                    if error:
+                        messages.error(request, f'Error processing "{image_file.name}": {error}')
+                        continue
+                    images.append(LandPropertyImage(
+                        land_property=land_property,
+                        image=processed_image,
+                        is_cover=set_cover and not images,
+                        order=first_order + len(images),
+                    ))
+                    added_names.append(image_file.name)
+                
+                if images:
+                    with transaction.atomic():
+                        LandPropertyImage.objects.bulk_create(images)
+                        # Only now that the new cover exists, so a failed upload keeps the old one
+                        if set_cover:
+                            land_property.images.filter(is_cover=True).exclude(pk=images[0].pk).update(is_cover=False)
+                    land_property_images_bulk_created(land_property)
+                    log_admin_activity(request.user, 'create', 'LandPropertyImage', f'Added {len(images)} gallery images to: {land_property.name}', request, land_property.id)
+                    messages.success(request, f'Added {len(images)} images to "{land_property.name}": {", ".join(added_names)}')
+                elif not image_files:
+                    messages.error(request, 'Select at least one image to upload.')
+            except Exception as e:
+                messages.error(request, f'Error uploading gallery images: {str(e)}')
+        
         elif action == 'toggle_featured':
             land_property_id = request.POST.get('land_property_id')
             land_property = get_object_or_404(LandProperty, pk=land_property_id)
@@ -570,12 +709,16 @@ def delete_all_activities(request):
 
 
 @login_required
+@image_uploads
 def admin_profile(request):
     """Admin profile management"""
     # Get or create admin profile
     profile, created = AdminProfile.objects.get_or_create(user=request.user)
     
     if request.method == 'POST':
+        if reject_invalid_uploads(request):
+            return redirect('custom_admin:admin_profile')
+        
         action = request.POST.get('action')
         
         if action == 'update_profile':
@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'matrichaya_properties.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after Django is set up, since it reads models through the cache helpers
+from properties.preload import EarlyHintsMiddleware  # noqa: E402
+from properties.search import warm_search_index  # noqa: E402
+
+# Each worker builds its autocomplete index before serving requests
+warm_search_index()
+
+# Sends 103 Early Hints for critical images on servers that support them
+application = EarlyHintsMiddleware(django_application)
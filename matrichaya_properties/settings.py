@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -54,6 +55,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'properties.middleware.HealthCheckMiddleware',  # /healthz and /readyz, before everything else
+    'properties.metrics.MetricsMiddleware',  # Per-view latency and query metrics for /metrics
+    'properties.slow_queries.SlowQueryMiddleware',  # Slow query log shown in the custom admin
+    'properties.profiling.ProfilingMiddleware',  # Sampled request profiles shown in the custom admin
+    'properties.compression.CompressionMiddleware',  # Brotli/gzip for HTML, cached by ETag
+    'properties.preload.PreloadMiddleware',  # Link: rel=preload for the logo and hero image
+    'properties.cache_tags.CacheTagMiddleware',  # Surrogate-Key tags for a front cache
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # For static files serving
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -62,6 +70,10 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Pre-rendered public pages for anonymous visitors. Last, so snapshot hits
+    # still get the host check, SSL redirect, security headers, metrics,
+    # preload links and cache tags above
+    'properties.snapshot.SnapshotMiddleware',
 ]
 
 ROOT_URLCONF = 'matrichaya_properties.urls'
@@ -103,6 +115,88 @@ else:
         }
     }
 
+# Trigram lookups for the public search (pg_trgm)
+if DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
+    INSTALLED_APPS.append('django.contrib.postgres')
+
+
+# Cache: a per-process LRU (L1) in front of a cache shared by all workers (L2).
+# SHARED_CACHE_BACKEND selects the L2: 'file' (default), 'db' (run
+# `python manage.py createcachetable`), 'redis' (REDIS_URL) or 'locmem', a
+# per-process stand-in for tests and local development.
+SHARED_CACHE_BACKEND = os.environ.get('SHARED_CACHE_BACKEND', 'redis' if os.environ.get('REDIS_URL') else 'file')
+SHARED_CACHES = {
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('CACHE_DIR', os.path.join(tempfile.gettempdir(), 'matrichaya_cache')),
+    },
+    'db': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'matrichaya_cache',
+    },
+    'redis': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
+    },
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'matrichaya-shared',
+    },
+}
+CACHES = {
+    'default': {
+        'BACKEND': 'properties.cache_backends.TwoTierCache',
+        'OPTIONS': {
+            'SHARED_CACHE': 'shared',
+            'MAX_ENTRIES': 1000,
+            'L1_TIMEOUT': 60,
+            'GENERATION_CHECK_INTERVAL': 0.05,
+        },
+    },
+    'shared': SHARED_CACHES[SHARED_CACHE_BACKEND],
+}
+
+# Single-flight locks for cache_page_coalesced and image resizing go straight
+# to the shared tier when its add() is atomic. The file cache's is not, so
+# with it the locks are flock()ed files in SINGLE_FLIGHT_LOCK_DIR instead
+# (local to the host, like CACHE_DIR).
+SINGLE_FLIGHT_CACHE = None if SHARED_CACHE_BACKEND == 'file' else 'shared'
+SINGLE_FLIGHT_LOCK_DIR = os.environ.get('SINGLE_FLIGHT_LOCK_DIR', os.path.join(tempfile.gettempdir(), 'matrichaya_locks'))
+
+# Full-page cache for home and land_properties (seconds). Expired pages are
+# served stale for PAGE_CACHE_STALE_TIMEOUT more seconds while one request
+# rebuilds them.
+PAGE_CACHE_TIMEOUT = 60
+PAGE_CACHE_STALE_TIMEOUT = 300
+
+# Static snapshot of the public pages (see `python manage.py export_snapshot`).
+# When enabled, anonymous GETs are answered from SNAPSHOT_DIR; admin changes
+# expire the affected pages and queue them in SNAPSHOT_QUEUE_DIR, which a
+# background thread in the web workers polls every SNAPSHOT_POLL_INTERVAL
+# seconds to re-render them. Both directories are local to the host, so only
+# the host holding a SNAPSHOT_HOST_LEASE-second lease in the shared cache
+# serves snapshots; any other host serves pages live.
+SNAPSHOT_ENABLED = os.environ.get('SNAPSHOT_ENABLED', 'False').lower() == 'true'
+SNAPSHOT_DIR = os.environ.get('SNAPSHOT_DIR', os.path.join(BASE_DIR, 'snapshot'))
+SNAPSHOT_QUEUE_DIR = os.environ.get('SNAPSHOT_QUEUE_DIR', f'{SNAPSHOT_DIR}-queue')
+SNAPSHOT_POLL_INTERVAL = 2
+SNAPSHOT_HOST_LEASE = 60
+# Listing pages rendered per facet combination, and per export in total;
+# anything beyond is served live
+SNAPSHOT_PAGES_PER_LISTING = 5
+SNAPSHOT_MAX_PAGES = int(os.environ.get('SNAPSHOT_MAX_PAGES', '2000'))
+
+# Front cache (Varnish, Fastly, ...) integration: public responses list the
+# objects they show in CACHE_TAG_HEADER, and model changes purge those tags
+# at CACHE_PURGE['URL']. `python manage.py run_purge_receiver` is a local
+# stand-in that logs purges.
+CACHE_TAG_HEADER = 'Surrogate-Key'
+CACHE_TAG_MAX_AGE = int(os.environ.get('CACHE_TAG_MAX_AGE', '0')) or None
+CACHE_PURGE = {
+    'URL': os.environ.get('CACHE_PURGE_URL', ''),
+    'METHOD': os.environ.get('CACHE_PURGE_METHOD', 'PURGE'),
+    'TOKEN': os.environ.get('CACHE_PURGE_TOKEN', ''),
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -144,12 +238,45 @@ STATICFILES_DIRS = [
 ]
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-# WhiteNoise configuration for static files
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+# WhiteNoise configuration for static files: hashed names, gzip/brotli
+# precompression, and minification of the bundles in static/js and static/css.
+# (STATICFILES_STORAGE is ignored since Django 5.1, so this uses STORAGES.)
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'properties.storage.MinifiedCompressedManifestStaticFilesStorage',
+    },
+}
+
+# Hashed static files never change, so let browsers cache them for a year
+WHITENOISE_MAX_AGE = 60 * 60 * 24 * 365
 
 # Media files configuration
 MEDIA_URL = '/media/'
-MEDIA_ROOT = BASE_DIR / 'media'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', BASE_DIR / 'media')
+
+# Resized image variants served from /media/r/ (see properties.image_cache),
+# kept on disk and evicted least-recently-used beyond RESIZE_CACHE_MAX_BYTES
+RESIZE_CACHE_DIR = os.environ.get('RESIZE_CACHE_DIR', os.path.join(MEDIA_ROOT, 'cache', 'resized'))
+RESIZE_CACHE_MAX_BYTES = int(os.environ.get('RESIZE_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))
+
+# 'fixed' writes JPEG at quality 85. 'perceptual' (opt-in, as it costs
+# several encode/decode/SSIM passes per upload and first render of a variant)
+# picks the lowest quality, and for resized variants the smallest of
+# JPEG/WebP/AVIF the browser accepts, whose SSIM against the original
+# reaches IMAGE_SSIM_TARGET
+IMAGE_ENCODER = os.environ.get('IMAGE_ENCODER', 'fixed')
+IMAGE_SSIM_TARGET = float(os.environ.get('IMAGE_SSIM_TARGET', '0.98'))
+
+# Custom admin image uploads stream to a temporary file through a handler that
+# hashes them and rejects non-images, oversized files and pixel bombs while
+# they arrive (see properties.uploads.image_uploads)
+IMAGE_UPLOAD_MAX_BYTES = int(os.environ.get('IMAGE_UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+IMAGE_UPLOAD_MAX_PIXELS = int(os.environ.get('IMAGE_UPLOAD_MAX_PIXELS', '40000000'))
+# Worker processes for batch uploads (defaults to the CPU count)
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '0')) or None
 
 # Security settings for production
 if not DEBUG:
@@ -170,3 +297,78 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # Custom Admin Login URL
 LOGIN_URL = '/custom-admin/login/'
+
+# Cached navbar/footer fragments and navbar images (seconds). Entries are also
+# invalidated by version bumps when NavbarImage or CompanyInfo rows change.
+CHROME_CACHE_TIMEOUT = 300
+
+# Dynamic response compression: bodies under COMPRESSION_MIN_SIZE bytes are
+# sent as-is; compressed bodies are cached by ETag for COMPRESSION_CACHE_TIMEOUT
+COMPRESSION_MIN_SIZE = 500
+COMPRESSION_CACHE_TIMEOUT = 3600
+COMPRESSION_CACHE_MAX_SIZE = 512 * 1024
+COMPRESSION_BROTLI_QUALITY = 5
+
+# How long /readyz reuses its database and media checks, and how long its
+# database ping (connecting included) may take before it fails (seconds)
+HEALTH_CHECK_CACHE_SECONDS = 5
+HEALTH_CHECK_TIMEOUT = 2
+
+# Request metrics: each worker writes snapshots into METRICS_DIR (local to the
+# host, as exited workers are detected by PID) and /metrics merges them.
+# Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(tempfile.gettempdir(), 'matrichaya_metrics'))
+METRICS_FLUSH_INTERVAL = 5
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
+# Queries slower than this (milliseconds) are logged with their EXPLAIN plan
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_QUERY_LOG_SIZE = 200
+# Each worker writes its log here (local to the host, like METRICS_DIR) at
+# most once per SLOW_QUERY_FLUSH_INTERVAL seconds; the admin page merges them
+SLOW_QUERY_DIR = os.environ.get('SLOW_QUERY_DIR', os.path.join(tempfile.gettempdir(), 'matrichaya_slow_queries'))
+SLOW_QUERY_FLUSH_INTERVAL = 1
+
+# Request profiling: profile this fraction of requests (0 disables sampling),
+# plus any request sending the signed X-Profile header from the admin Profiles page.
+# PROFILE_MODE is 'sampler' (stack sampler) or 'cprofile'.
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'sampler')
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'matrichaya_profiles'))
+# Only the newest profiles are kept
+PROFILE_MAX_FILES = int(os.environ.get('PROFILE_MAX_FILES', '500'))
+
+# Seconds between tracemalloc snapshots once tracing is started with a POST of
+# action=start to /debug/memory (protected like /metrics)
+MEMORY_SNAPSHOT_INTERVAL = 60
+
+# Suggestions returned by /land-properties/autocomplete (at most 10)
+AUTOCOMPLETE_LIMIT = 8
+
+# Public search: 'auto' uses pg_trgm on PostgreSQL and an in-process NumPy
+# trigram matcher elsewhere ('postgres', 'numpy' or 'contains' to force one).
+# Place-name spellings are folded by the alias table in properties/fuzzy_search.py,
+# extended by SEARCH_PLACE_ALIASES = {'canonical': ['variant', ...]}.
+SEARCH_ENGINE = os.environ.get('SEARCH_ENGINE', 'auto')
+SEARCH_MIN_SIMILARITY = 0.6
+
+# Identical contact submissions within this window (seconds) are collapsed
+# into a counter on the original ContactMessage
+CONTACT_DUPLICATE_WINDOW = 60 * 60 * 24
+
+# Proxies in front of the app that append to X-Forwarded-For (e.g. 1 behind a
+# single load balancer). Client IPs, used for rate limiting and logs, are read
+# from that many hops from the right; 0 uses the connecting address.
+TRUSTED_PROXY_COUNT = int(os.environ.get('TRUSTED_PROXY_COUNT', '0'))
+
+# Rate limiting for the public contact endpoints (see properties/ratelimit.py)
+# Set BACKEND to 'cache' to share buckets across gunicorn workers.
+RATE_LIMIT = {
+    'RATE': int(os.environ.get('CONTACT_RATE_LIMIT', '5')),
+    'BURST': 10,
+    'GLOBAL_RATE': 120,
+    'GLOBAL_BURST': 240,
+    'PERIOD': 60,
+    'BACKEND': os.environ.get('RATE_LIMIT_BACKEND', 'memory'),
+    'CACHE_ALIAS': 'shared',  # bucket state is rewritten on every request, so skip the L1
+}
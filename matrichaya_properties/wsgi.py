@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'matrichaya_properties.settings')
 
 application = get_wsgi_application()
+
+# Each worker builds its autocomplete index before serving requests
+from properties.search import warm_search_index  # noqa: E402
+
+warm_search_index()
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import CompanyInfo, NavbarImage, CarouselSlide, LandProperty, ContactMessage
+from .models import CompanyInfo, NavbarImage, CarouselSlide, LandProperty, LandPropertyImage, ContactMessage
 
 
 @admin.register(CompanyInfo)
@@ -53,8 +53,16 @@ class CarouselSlideAdmin(admin.ModelAdmin):
     )
 
 
+class LandPropertyImageInline(admin.TabularInline):
+    model = LandPropertyImage
+    fields = ['image', 'caption', 'is_cover', 'order']
+    extra = 1
+
+
 @admin.register(LandProperty)
 class LandPropertyAdmin(admin.ModelAdmin):
+    inlines = [LandPropertyImageInline]
+    prepopulated_fields = {'slug': ('name',)}
     list_display = ['name', 'area', 'division', 'district', 'project_status', 'property_type', 'is_featured', 'is_active', 'created_at']
     list_filter = ['project_status', 'property_type', 'division', 'is_featured', 'is_active', 'created_at']
     list_editable = ['is_featured', 'is_active']
@@ -63,7 +71,7 @@ class LandPropertyAdmin(admin.ModelAdmin):
     
     fieldsets = (
         ('Project Information', {
-            'fields': ('name', 'description', 'area', 'location'),
+            'fields': ('name', 'slug', 'description', 'area', 'location'),
             'description': 'Basic information about the land property project'
         }),
         ('Location Details', {
@@ -105,11 +113,11 @@ class LandPropertyAdmin(admin.ModelAdmin):
 
 @admin.register(ContactMessage)
 class ContactMessageAdmin(admin.ModelAdmin):
-    list_display = ['full_name', 'email', 'phone', 'property_type', 'status', 'created_at']
+    list_display = ['full_name', 'email', 'phone', 'property_type', 'status', 'duplicate_count', 'created_at']
     list_filter = ['status', 'property_type', 'budget', 'newsletter_subscription', 'created_at']
     list_editable = ['status']
     search_fields = ['first_name', 'last_name', 'email', 'phone', 'message']
-    readonly_fields = ['created_at', 'updated_at', 'ip_address']
+    readonly_fields = ['created_at', 'updated_at', 'ip_address', 'duplicate_count', 'last_submitted_at']
     ordering = ['-created_at']
     
     fieldsets = (
@@ -126,7 +134,7 @@ class ContactMessageAdmin(admin.ModelAdmin):
             'fields': ('newsletter_subscription',)
         }),
         ('Status & Tracking', {
-            'fields': ('status', 'ip_address', 'created_at', 'updated_at'),
+            'fields': ('status', 'ip_address', 'duplicate_count', 'last_submitted_at', 'created_at', 'updated_at'),
             'classes': ('collapse',)
         }),
     )
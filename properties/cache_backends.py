@@ -0,0 +1,297 @@
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+
+# Recent writes and deletes, as (token, L1 key) pairs, oldest first
+JOURNAL_KEY = 'two_tier:journal'
+JOURNAL_LENGTH = 256
+# Attempts to get an entry into the journal when other processes write it too
+JOURNAL_RETRIES = 3
+
+# L1 stores are shared by every thread in the process, one per cache alias
+_local_stores = {}
+_local_stores_lock = threading.Lock()
+
+
+class LocalStore:
+    """
+    Bounded LRU of pickled values tagged with their expiry time. The
+    generation is the token of the last shared journal entry this process
+    has applied; syncing drops the keys journaled after it, or the whole
+    store when that entry is no longer in the journal.
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.generation = None
+        self.checked_at = 0.0
+        self.stats = {
+            'l1_hits': 0,
+            'l2_hits': 0,
+            'misses': 0,
+            'sets': 0,
+            'evictions': 0,
+            'invalidations': 0,
+            'flushes': 0,
+        }
+
+    def count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def get(self, key, now):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] <= now:
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, pickled, expires_at, generation):
+        with self.lock:
+            # A write or delete elsewhere may have bumped the generation while
+            # the value was being fetched; caching it now could keep it stale
+            if generation != self.generation:
+                return
+            self.entries[key] = (pickled, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def sync(self, journal):
+        with self.lock:
+            generation = journal[-1][0] if journal else None
+            if generation == self.generation:
+                return
+            tokens = [token for token, _ in journal]
+            if self.generation in tokens:
+                for _, key in journal[tokens.index(self.generation) + 1:]:
+                    if self.entries.pop(key, None) is not None:
+                        self.stats['invalidations'] += 1
+            else:
+                # Too many writes since the last sync (or L2 lost the journal)
+                self.entries.clear()
+                self.stats['flushes'] += 1
+            self.generation = generation
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.stats['flushes'] += 1
+
+
+class SharedEntry:
+    """A value as stored in L2, with its wall-clock expiry so L1 copies never outlive it"""
+    __slots__ = ('value', 'expires_at')
+
+    def __init__(self, value, expires_at):
+        self.value = value
+        self.expires_at = expires_at
+
+
+class TwoTierCache(BaseCache):
+    """
+    Cache backend with a per-process LRU (L1) in front of a shared cache (L2),
+    which is any other configured alias: file-based, database or Redis.
+
+    Reads try L1 first. Every write (set, successful add, touch, incr) and
+    delete goes to L2 and also appends the key to a shared journal of the
+    last JOURNAL_LENGTH changes. Every process re-reads the journal at most
+    once per GENERATION_CHECK_INTERVAL seconds and drops just the keys added
+    since its last read, so stale L1 entries disappear across workers within
+    that interval while the rest of L1 stays warm. Only a process that fell
+    more than JOURNAL_LENGTH changes behind empties its whole L1.
+
+    L2 holds each value as a SharedEntry carrying its expiry time, so an L1
+    copy is kept for at most L1_TIMEOUT seconds and never past that expiry.
+    incr() is therefore a read and a write rather than the L2's own incr.
+
+    OPTIONS:
+        SHARED_CACHE: alias of the L2 cache (default 'shared')
+        MAX_ENTRIES: L1 capacity (default 1000)
+        L1_TIMEOUT: longest time an L1 entry is trusted (default 60)
+        GENERATION_CHECK_INTERVAL: seconds between generation reads (default 0.05)
+    """
+
+    pickle_protocol = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, name, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self.shared_alias = options.get('SHARED_CACHE', 'shared')
+        self.l1_timeout = options.get('L1_TIMEOUT', 60)
+        self.check_interval = options.get('GENERATION_CHECK_INTERVAL', 0.05)
+        with _local_stores_lock:
+            if name not in _local_stores:
+                _local_stores[name] = LocalStore(options.get('MAX_ENTRIES', 1000))
+            self.local = _local_stores[name]
+
+    @property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    def _key(self, key, version):
+        return self.make_and_validate_key(key, version=version)
+
+    def _timeout(self, timeout):
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def _wrap(self, value, timeout):
+        return SharedEntry(value, None if timeout is None else time.time() + timeout)
+
+    def _get_shared(self, key, version):
+        """The unexpired SharedEntry of a key in L2, or None"""
+        entry = self.shared.get(key, version=version)
+        if entry is None:
+            return None
+        if not isinstance(entry, SharedEntry):
+            # Stored before values carried their expiry
+            return SharedEntry(entry, None)
+        if entry.expires_at is not None and entry.expires_at <= time.time():
+            return None
+        return entry
+
+    def _l1_expiry(self, expires_at, now):
+        """Monotonic L1 expiry: at most L1_TIMEOUT away, and never after the L2 expiry"""
+        ttl = self.l1_timeout
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        return now + ttl
+
+    def _check_generation(self, now):
+        """Re-read the shared journal if the last check is older than the interval"""
+        local = self.local
+        if now - local.checked_at >= self.check_interval:
+            local.checked_at = now
+            local.sync(self.shared.get(JOURNAL_KEY) or ())
+        return local.generation
+
+    def _invalidate(self, l1_keys):
+        """Drop keys from this process's L1 and journal them for the others"""
+        entries = tuple((uuid.uuid4().hex, key) for key in l1_keys)
+        # Read-modify-write, since the file and database backends have no
+        # atomic append: re-check that a concurrent writer did not drop ours
+        for _ in range(JOURNAL_RETRIES):
+            journal = self.shared.get(JOURNAL_KEY) or ()
+            self.shared.set(JOURNAL_KEY, (tuple(journal) + entries)[-JOURNAL_LENGTH:], None)
+            if entries[-1] in (self.shared.get(JOURNAL_KEY) or ()):
+                break
+        for key in l1_keys:
+            self.local.delete(key)
+
+    def get(self, key, default=None, version=None):
+        now = time.monotonic()
+        generation = self._check_generation(now)
+        l1_key = self._key(key, version)
+        entry = self.local.get(l1_key, now)
+        if entry is not None:
+            self.local.count('l1_hits')
+            return pickle.loads(entry[0])
+
+        shared_entry = self._get_shared(key, version)
+        if shared_entry is None:
+            self.local.count('misses')
+            return default
+        self.local.count('l2_hits')
+        self._set_local(l1_key, shared_entry, generation)
+        return shared_entry.value
+
+    def _set_local(self, l1_key, shared_entry, generation):
+        now = time.monotonic()
+        expires_at = self._l1_expiry(shared_entry.expires_at, now)
+        if expires_at > now:
+            self.local.set(l1_key, pickle.dumps(shared_entry.value, self.pickle_protocol), expires_at, generation)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        generation = self._check_generation(time.monotonic())
+        self.local.count('sets')
+        shared_entry = self._wrap(value, timeout)
+        self.shared.set(key, shared_entry, timeout, version=version)
+        l1_key = self._key(key, version)
+        self._invalidate([l1_key])
+        self._set_local(l1_key, shared_entry, generation)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        generation = self._check_generation(time.monotonic())
+        shared_entry = self._wrap(value, timeout)
+        if not self.shared.add(key, shared_entry, timeout, version=version):
+            return False
+        self.local.count('sets')
+        # L2 may have evicted the key early while another process still holds a copy
+        l1_key = self._key(key, version)
+        self._invalidate([l1_key])
+        self._set_local(l1_key, shared_entry, generation)
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        timeout = self._timeout(timeout)
+        shared_entry = self._get_shared(key, version)
+        if shared_entry is None:
+            return False
+        self.shared.set(key, self._wrap(shared_entry.value, timeout), timeout, version=version)
+        self._invalidate([self._key(key, version)])
+        return True
+
+    def delete(self, key, version=None):
+        deleted = self.shared.delete(key, version=version)
+        self._invalidate([self._key(key, version)])
+        return deleted
+
+    def delete_many(self, keys, version=None):
+        keys = list(keys)
+        self.shared.delete_many(keys, version=version)
+        if keys:
+            self._invalidate([self._key(key, version) for key in keys])
+
+    def incr(self, key, delta=1, version=None):
+        shared_entry = self._get_shared(key, version)
+        if shared_entry is None:
+            raise ValueError(f"Key '{key}' not found")
+        value = shared_entry.value + delta
+        timeout = None if shared_entry.expires_at is None else max(shared_entry.expires_at - time.time(), 0.001)
+        self.shared.set(key, SharedEntry(value, shared_entry.expires_at), timeout, version=version)
+        self._invalidate([self._key(key, version)])
+        return value
+
+    def has_key(self, key, version=None):
+        now = time.monotonic()
+        self._check_generation(now)
+        if self.local.get(self._key(key, version), now) is not None:
+            return True
+        return self._get_shared(key, version) is not None
+
+    def clear(self):
+        self.shared.clear()
+        # A journal without any process's last token makes every L1 empty itself
+        self.shared.set(JOURNAL_KEY, ((uuid.uuid4().hex, None),), None)
+        self.local.clear()
+
+    def get_stats(self):
+        with self.local.lock:
+            stats = dict(self.local.stats)
+            stats['l1_entries'] = len(self.local.entries)
+        return stats
+
+
+def get_cache_stats(alias='default'):
+    """Counters of a TwoTierCache alias, or an empty dict for other backends"""
+    cache = caches[alias]
+    return cache.get_stats() if isinstance(cache, TwoTierCache) else {}
@@ -0,0 +1,127 @@
+import threading
+import urllib.request
+
+from django.conf import settings
+from django.db import transaction
+
+
+DEFAULT_CACHE_PURGE = {
+    'URL': '',                  # purge endpoint of the front cache; empty disables purging
+    'METHOD': 'PURGE',          # e.g. PURGE for Varnish, POST for the Fastly API
+    'HEADER': 'Surrogate-Key',  # request header carrying the space-separated tags
+    'TOKEN': '',                # sent as `Fastly-Key` / bearer token when set
+    'TIMEOUT': 5,
+}
+
+# Per-object tags are only listed for short pages; the list tags cover the rest
+MAX_OBJECT_TAGS = 50
+
+
+def get_cache_tag_header():
+    return getattr(settings, 'CACHE_TAG_HEADER', 'Surrogate-Key')
+
+
+def get_cache_purge_settings():
+    config = dict(DEFAULT_CACHE_PURGE)
+    config.update(getattr(settings, 'CACHE_PURGE', {}))
+    return config
+
+
+def land_property_tag(pk):
+    return f'landproperty-{pk}'
+
+
+def land_property_list_tag(division=''):
+    """Tag for listing pages filtered by a division, or for every listing ('all')"""
+    return f"landproperty-list-{division or 'all'}"
+
+
+def land_property_group_tag(division, property_type):
+    """Tag for project pages showing the similar projects of a division and type"""
+    return f'landproperty-group-{division}-{property_type}'
+
+
+def get_chrome_tags():
+    """Tags of the navbar and footer data rendered on every public page"""
+    from .models import NavbarImage
+
+    return [f'navbar-{image_type}' for image_type, _ in NavbarImage.IMAGE_TYPES] + ['company-info']
+
+
+def add_cache_tags(response, tags):
+    """Merge tags into the response's cache-tag header, keeping their order"""
+    header = get_cache_tag_header()
+    existing = response.get(header, '').split()
+    merged = existing + [tag for tag in tags if tag not in existing]
+    if merged:
+        response[header] = ' '.join(merged)
+    return response
+
+
+def get_land_property_tags(properties):
+    """Per-object tags for the properties shown on a page, if there are few enough"""
+    pks = [obj.pk for obj in properties]
+    if len(pks) > MAX_OBJECT_TAGS:
+        return []
+    return [land_property_tag(pk) for pk in pks]
+
+
+def send_purge(tags):
+    """Ask the front cache to drop every response carrying any of these tags"""
+    config = get_cache_purge_settings()
+    if not config['URL'] or not tags:
+        return
+    request = urllib.request.Request(config['URL'], method=config['METHOD'])
+    request.add_header(config['HEADER'], ' '.join(sorted(tags)))
+    if config['TOKEN']:
+        request.add_header('Fastly-Key', config['TOKEN'])
+        request.add_header('Authorization', f"Bearer {config['TOKEN']}")
+    try:
+        with urllib.request.urlopen(request, timeout=config['TIMEOUT']) as response:
+            response.read()
+    except OSError as e:
+        print(f"Error purging cache tags {' '.join(sorted(tags))}: {str(e)}")
+
+
+def purge_cache_tags_enabled():
+    return bool(get_cache_purge_settings()['URL'])
+
+
+def purge_cache_tags(tags):
+    """
+    Purge tags once the current transaction commits, from a background
+    thread so admin requests never wait on the front cache.
+    """
+    tags = set(tags)
+    if not tags or not purge_cache_tags_enabled():
+        return
+    transaction.on_commit(lambda: threading.Thread(target=send_purge, args=(tags,), daemon=True).start())
+
+
+class CacheTagMiddleware:
+    """
+    Add the navbar and footer tags to successful public GET responses (views
+    add their own object and list tags) and, with CACHE_TAG_MAX_AGE, a
+    Surrogate-Control header so the front cache can keep pages for a long
+    time and rely on purges for freshness.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.max_age = getattr(settings, 'CACHE_TAG_MAX_AGE', None)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        match = getattr(request, 'resolver_match', None)
+        if (
+            request.method in ('GET', 'HEAD')
+            and response.status_code == 200
+            and match is not None
+            and match.func.__module__ == 'properties.views'
+        ):
+            add_cache_tags(response, get_chrome_tags())
+            # Pages that vary per visitor (CSRF forms) must not be kept by a shared cache
+            cacheable = not response.cookies and 'cookie' not in response.get('Vary', '').lower()
+            if self.max_age and cacheable and not response.has_header('Surrogate-Control'):
+                response['Surrogate-Control'] = f'max-age={self.max_age}'
+        return response
@@ -0,0 +1,272 @@
+import fcntl
+import hashlib
+import math
+import os
+import random
+import threading
+import time
+import uuid
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+
+from .cache_tags import get_cache_tag_header
+
+
+def get_cache_version(name):
+    """
+    Return the current version token for a group of cached data.
+    Cache keys built from the token go stale as soon as the version is bumped.
+    """
+    key = f'cache_version:{name}'
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_cache_version(name):
+    """Invalidate every cache entry keyed on this version"""
+    cache.set(f'cache_version:{name}', time.time_ns(), None)
+
+
+def get_chrome_timeout():
+    """Timeout for cached navbar/footer data and fragments"""
+    return getattr(settings, 'CHROME_CACHE_TIMEOUT', 300)
+
+
+def get_navbar_images():
+    """Active navbar images by type, cached until a NavbarImage changes"""
+    from .models import NavbarImage
+
+    key = f"navbar_images:{get_cache_version('navbar')}"
+    images = cache.get(key)
+    if images is None:
+        images = {image_type: None for image_type, _ in NavbarImage.IMAGE_TYPES}
+        for image in NavbarImage.objects.filter(is_active=True).order_by('order', '-created_at'):
+            if images.get(image.image_type) is None:
+                images[image.image_type] = image
+        cache.set(key, images, get_chrome_timeout())
+    return images
+
+
+def get_hero_image():
+    """
+    The first active carousel slide image (the home page LCP) as the
+    {'url', 'srcset'} the carousel renders, or None. Cached until a slide changes.
+    """
+    from .models import CarouselSlide
+    from .image_cache import VARIANT_SETS, resized_url, variant_srcset
+
+    key = f"hero_image:{get_cache_version('carousel')}"
+    hero = cache.get(key)
+    if hero is None:
+        slide = CarouselSlide.objects.filter(is_active=True).exclude(image='').order_by('order', '-created_at').first()
+        # Cache an empty dict too, so a site without slides does not query every request
+        hero = {}
+        if slide:
+            width, height = VARIANT_SETS['hero'][-1]
+            hero = {'url': resized_url(slide.image, width, height), 'srcset': variant_srcset(slide.image, 'hero')}
+        cache.set(key, hero, get_chrome_timeout())
+    return hero or None
+
+
+# In-process single-flight locks, one per key being computed
+_flight_locks = {}
+_flight_locks_guard = threading.Lock()
+
+# Backends whose add() is atomic across processes. FileBasedCache.add() is a
+# has_key() then set(), so two workers can both take the same lock.
+ATOMIC_ADD_BACKENDS = (
+    'django.core.cache.backends.redis.RedisCache',
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.memcached.PyMemcacheCache',
+    'django.core.cache.backends.memcached.PyLibMCCache',
+)
+
+# Lock files in SINGLE_FLIGHT_LOCK_DIR; keys hash onto this many of them
+LOCK_FILE_STRIPES = 1024
+
+
+def get_lock_cache():
+    """
+    Cache used for cross-process single-flight locks (the shared tier,
+    bypassing L1), or None to use flock()ed files in SINGLE_FLIGHT_LOCK_DIR
+    """
+    alias = getattr(settings, 'SINGLE_FLIGHT_CACHE', 'default')
+    return caches[alias] if alias else None
+
+
+def check_single_flight_backend():
+    """Refuse to start with a SINGLE_FLIGHT_CACHE whose add() is not atomic"""
+    alias = getattr(settings, 'SINGLE_FLIGHT_CACHE', 'default')
+    if not alias:
+        return
+    backend = settings.CACHES[alias]['BACKEND']
+    if backend not in ATOMIC_ADD_BACKENDS:
+        raise ImproperlyConfigured(
+            f"SINGLE_FLIGHT_CACHE '{alias}' uses {backend}, whose add() is not atomic. "
+            "Point it at a redis, db or memcached cache, or set it to None to use file locks."
+        )
+
+
+class SingleFlight:
+    """
+    Lock on one key that is held by at most one thread per process (a
+    threading.Lock) and one process overall (an add() in the lock cache, or
+    a non-blocking flock() on a file when SINGLE_FLIGHT_CACHE is None).
+    """
+
+    def __init__(self, key, timeout):
+        self.key = key
+        self.lock_key = f'single_flight:{key}'
+        self.timeout = timeout
+        self.token = uuid.uuid4().hex
+        self.lock_file = None
+        with _flight_locks_guard:
+            self.local = _flight_locks.setdefault(key, threading.Lock())
+
+    def acquire(self, wait=0):
+        """Try to take the lock, polling for up to `wait` seconds"""
+        deadline = time.monotonic() + wait
+        acquired = self.local.acquire(timeout=wait) if wait else self.local.acquire(blocking=False)
+        if not acquired:
+            return False
+        while not self._acquire_shared():
+            if time.monotonic() >= deadline:
+                self._release_local()
+                return False
+            time.sleep(0.05)
+        return True
+
+    def release(self):
+        lock_cache = get_lock_cache()
+        if self.lock_file is not None:
+            # Closing the file drops the flock
+            self.lock_file.close()
+            self.lock_file = None
+        elif lock_cache.get(self.lock_key) == self.token:
+            lock_cache.delete(self.lock_key)
+        self._release_local()
+
+    def _acquire_shared(self):
+        lock_cache = get_lock_cache()
+        if lock_cache is not None:
+            return lock_cache.add(self.lock_key, self.token, self.timeout)
+
+        # The kernel drops a flock when its holder exits, so unlike the cache
+        # entry it needs no timeout. Lock files are never deleted: unlinking
+        # one another process has open would let a third lock a new file.
+        lock_dir = settings.SINGLE_FLIGHT_LOCK_DIR
+        os.makedirs(lock_dir, exist_ok=True)
+        stripe = int(hashlib.md5(self.lock_key.encode()).hexdigest(), 16) % LOCK_FILE_STRIPES
+        lock_file = open(os.path.join(lock_dir, f'{stripe}.lock'), 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    def _release_local(self):
+        with _flight_locks_guard:
+            if _flight_locks.get(self.key) is self.local:
+                del _flight_locks[self.key]
+        self.local.release()
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=None, beta=1.0, lock_timeout=30):
+    """
+    Return the cached value for `key`, calling `compute()` to fill it so that
+    only one thread across all workers recomputes a key at a time.
+
+    Entries are refreshed early with a probability that grows as they near
+    expiry (XFetch, scaled by how long `compute` took and `beta`). Past
+    `timeout` they stay usable for `stale_timeout` more seconds: whoever gets
+    the lock recomputes while everyone else is served the stale value. On a
+    cold miss other callers wait for the lock holder instead of piling onto
+    the database. A None result is returned but never cached.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    entry = cache.get(key)
+    if entry is not None:
+        value, refresh_at, delta = entry
+        if time.time() - delta * beta * math.log(1.0 - random.random()) < refresh_at:
+            return value
+        flight = SingleFlight(key, lock_timeout)
+        if not flight.acquire():
+            return value
+    else:
+        flight = SingleFlight(key, lock_timeout)
+        if flight.acquire(wait=lock_timeout):
+            # Another worker may have filled the key while we waited
+            entry = cache.get(key)
+            if entry is not None:
+                flight.release()
+                return entry[0]
+        else:
+            flight = None
+
+    try:
+        start = time.time()
+        value = compute()
+        delta = time.time() - start
+        if value is not None:
+            cache.set(key, (value, time.time() + timeout, delta), timeout + stale_timeout)
+        return value
+    finally:
+        if flight is not None:
+            flight.release()
+
+
+def cache_page_coalesced(versions=(), timeout=None, stale_timeout=None):
+    """
+    Cache successful GET responses of a view with get_or_compute(), so an
+    expired page is rebuilt by one request while the rest get the stale copy.
+    The key includes the named cache versions, so bumping one of them (e.g.
+    when a LandProperty is saved) switches to a fresh entry immediately.
+    Timeouts default to PAGE_CACHE_TIMEOUT and PAGE_CACHE_STALE_TIMEOUT.
+    Only use this on views whose output does not depend on the user.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            version = ':'.join(str(get_cache_version(name)) for name in versions)
+            path_hash = hashlib.md5(request.get_full_path().encode()).hexdigest()
+            key = f'page:{view_func.__module__}.{view_func.__name__}:{version}:{path_hash}'
+            uncacheable = []
+
+            def render_page():
+                response = view_func(request, *args, **kwargs)
+                if response.status_code != 200 or response.streaming or response.cookies:
+                    uncacheable.append(response)
+                    return None
+                return response.content, response['Content-Type'], response.get(get_cache_tag_header())
+
+            page = get_or_compute(
+                key,
+                render_page,
+                timeout if timeout is not None else getattr(settings, 'PAGE_CACHE_TIMEOUT', 60),
+                stale_timeout if stale_timeout is not None else getattr(settings, 'PAGE_CACHE_STALE_TIMEOUT', None),
+            )
+            if uncacheable:
+                return uncacheable[0]
+            if page is None:
+                return view_func(request, *args, **kwargs)
+            content, content_type, cache_tags = page
+            response = HttpResponse(content, content_type=content_type)
+            if cache_tags:
+                response[get_cache_tag_header()] = cache_tags
+            return response
+        return wrapper
+    return decorator
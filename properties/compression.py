@@ -0,0 +1,146 @@
+import gzip
+import re
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers, set_response_etag
+
+try:
+    import brotli
+except ImportError:  # Optional: fall back to gzip only
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+_ACCEPT_ENCODING_RE = re.compile(r'^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$')
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'skipped': 0}
+
+
+def get_compression_settings():
+    return {
+        'min_size': getattr(settings, 'COMPRESSION_MIN_SIZE', 500),
+        'cache_timeout': getattr(settings, 'COMPRESSION_CACHE_TIMEOUT', 3600),
+        'cache_max_size': getattr(settings, 'COMPRESSION_CACHE_MAX_SIZE', 512 * 1024),
+        'brotli_quality': getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 5),
+        'gzip_level': getattr(settings, 'COMPRESSION_GZIP_LEVEL', 6),
+    }
+
+
+def get_compression_stats():
+    """Return compressed-body cache counters for this process"""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def parse_accept_encoding(header):
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    encodings = {}
+    for part in header.split(','):
+        match = _ACCEPT_ENCODING_RE.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) else 1.0
+        except ValueError:
+            continue
+        encodings[match.group(1).lower()] = q
+    return encodings
+
+
+def choose_encoding(header):
+    """Pick the best encoding the client accepts: br if available, then gzip"""
+    encodings = parse_accept_encoding(header or '')
+    wildcard = encodings.get('*', 0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0
+    for encoding in candidates:
+        q = encodings.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(content, encoding, options):
+    if encoding == 'br':
+        return brotli.compress(content, quality=options['brotli_quality'])
+    # mtime=0 keeps the output deterministic, so cached copies are byte-identical
+    return gzip.compress(content, compresslevel=options['gzip_level'], mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Brotli/gzip compression for dynamic responses. Compressed bodies are
+    cached under the response ETag, so an unchanged page is compressed once
+    and then served from the cache. Streaming, small, already-encoded and
+    non-text responses pass through untouched.
+
+    Responses that vary on Cookie (CSRF tokens, per-user pages) or set the
+    CSRF cookie are sent uncompressed: compressing a secret alongside
+    attacker-influenced text leaks it through the body length (BREACH).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.options = get_compression_settings()
+
+    def __call__(self, request):
+        response = self.get_response(request)
+
+        if (
+            response.streaming
+            or response.status_code != 200
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith(COMPRESSIBLE_TYPES)
+            or len(response.content) < self.options['min_size']
+        ):
+            return response
+        if 'cookie' in response.get('Vary', '').lower() or settings.CSRF_COOKIE_NAME in response.cookies:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if not response.has_header('ETag'):
+            set_response_etag(response)
+        etag = response['ETag']
+
+        cacheable = len(response.content) <= self.options['cache_max_size']
+        key = f'compressed:{encoding}:{etag}'
+        body = cache.get(key) if cacheable else None
+        if body is not None:
+            _count('hits')
+        else:
+            body = compress(response.content, encoding, self.options)
+            if cacheable:
+                cache.set(key, body, self.options['cache_timeout'])
+                _count('misses')
+            else:
+                _count('skipped')
+
+        if len(body) >= len(response.content):
+            return response
+
+        response.content = body
+        response['Content-Length'] = str(len(body))
+        response['Content-Encoding'] = encoding
+        # The encoded body is a different representation of the same resource
+        if not etag.startswith('W/'):
+            response['ETag'] = 'W/' + etag
+        return response
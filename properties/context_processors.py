@@ -1,15 +1,19 @@
-from .models import NavbarImage, CarouselSlide
+from .models import CarouselSlide
+from .cache_utils import get_cache_version, get_chrome_timeout, get_navbar_images
 
 
 def navbar_images(request):
     """
-    Context processor to make navbar images available in all templates
+    Context processor to make navbar images available in all templates.
+    The images come from the cache, and `chrome` carries the version tokens
+    used as keys for the cached navbar and footer fragments in base.html.
     """
     return {
-        'navbar_images': {
-            'logo': NavbarImage.objects.filter(image_type='logo', is_active=True).first(),
-            'banner': NavbarImage.objects.filter(image_type='banner', is_active=True).first(),
-            'background': NavbarImage.objects.filter(image_type='background', is_active=True).first(),
+        'navbar_images': get_navbar_images(),
+        'chrome': {
+            'navbar_version': get_cache_version('navbar'),
+            'company_info_version': get_cache_version('company_info'),
+            'timeout': get_chrome_timeout(),
         },
         'carousel_slides': CarouselSlide.objects.filter(is_active=True).order_by('order', '-created_at')
     }
@@ -0,0 +1,278 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, When
+
+from .search import WorkerIndex, normalize
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - the matcher falls back to substring search
+    np = None
+
+
+# Spellings of Bangladeshi place names, each folded to the first one when
+# project text is indexed and when a visitor searches. Extend or override
+# with the SEARCH_PLACE_ALIASES setting (same shape).
+PLACE_ALIASES = {
+    'chittagong': ['chattogram', 'chottogram', 'ctg'],
+    'comilla': ['cumilla', 'kumilla'],
+    'barisal': ['barishal'],
+    'bogra': ['bogura'],
+    'jessore': ['jashore'],
+    'dhaka': ['dacca', 'dhacca'],
+    'sylhet': ['silet', 'sylet'],
+    'mymensingh': ['moymonsingh', 'mymenshingh'],
+    'narsingdi': ['narsinghdi', 'narshingdi'],
+    'gazipur': ['gajipur'],
+    'lakshmipur': ['laxmipur', 'lokkhipur'],
+    'netrokona': ['netrakona'],
+    'jhalokati': ['jhalakathi', 'jhalokathi'],
+    'khagrachhari': ['khagrachari'],
+    'moulvibazar': ['maulvibazar', 'moulvi bazar'],
+    'coxs bazar': ['coxsbazar', 'cox bazar'],
+    'bashundhara': ['basundhara', 'bosundhora'],
+    'purbachal': ['purbachol'],
+    'kaliakair': ['kaliakoir'],
+}
+
+# Spelling habits shared by many place names: -gonj/-ganj (Keranigonj, Narayangonj)
+SPELLING_FOLDS = [
+    (re.compile(r'gonj\b'), 'ganj'),
+]
+
+
+def get_search_min_similarity():
+    return getattr(settings, 'SEARCH_MIN_SIMILARITY', 0.6)
+
+
+def get_search_max_results():
+    return getattr(settings, 'SEARCH_MAX_RESULTS', 5000)
+
+
+# Matches past this many are listed in the default order (featured, then
+# newest) instead of by score, which keeps the ORDER BY CASE short
+RANKED_RESULTS = 200
+
+# pg_trgm's default word_similarity_threshold, which the %> operator filters on
+PG_WORD_SIMILARITY_THRESHOLD = 0.6
+
+
+def get_alias_patterns():
+    aliases = {**PLACE_ALIASES, **getattr(settings, 'SEARCH_PLACE_ALIASES', {})}
+    variants = {variant: canonical for canonical, spellings in aliases.items() for variant in spellings}
+    # Longest first, so 'moulvi bazar' wins over a shorter variant inside it
+    return [
+        (re.compile(rf'\b{re.escape(variant)}\b'), canonical)
+        for variant, canonical in sorted(variants.items(), key=lambda item: -len(item[0]))
+    ]
+
+
+_alias_patterns = None
+
+
+def canonicalize(text):
+    """Normalized text with every known place-name variant replaced by its canonical spelling"""
+    global _alias_patterns
+    if _alias_patterns is None:
+        _alias_patterns = get_alias_patterns()
+    text = normalize(text)
+    for pattern, replacement in SPELLING_FOLDS:
+        text = pattern.sub(replacement, text)
+    for pattern, canonical in _alias_patterns:
+        text = pattern.sub(canonical, text)
+    return text
+
+
+def build_search_text(land_property):
+    """Value of LandProperty.search_text: its name and location fields, canonicalized, each word once"""
+    text = canonicalize(' '.join([
+        land_property.name,
+        land_property.location,
+        land_property.district,
+        land_property.area_name,
+    ]))
+    return ' '.join(dict.fromkeys(text.split()))
+
+
+def trigrams(word):
+    """Trigrams of one word, padded as pg_trgm pads them"""
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramMatcher:
+    """
+    In-process stand-in for pg_trgm's word similarity. Every distinct word
+    of the projects' search_text is split into trigrams; a query word scores
+    each indexed word by the share of its own trigrams found there, and a
+    project scores the mean, over query words, of its best-matching word.
+    The trigram -> word and project -> word tables are flat NumPy arrays
+    (CSR), so a query is a few bincounts rather than a loop over projects.
+    """
+
+    def __init__(self, rows):
+        # rows: (pk, search_text), best ranked first (featured, then newest)
+        word_ids = {}
+        doc_words = []
+        pks = []
+        for pk, text in rows:
+            words = {word_ids.setdefault(word, len(word_ids)) for word in text.split()}
+            if words:
+                pks.append(pk)
+                doc_words.append(sorted(words))
+
+        trigram_ids = {}
+        trigram_words = []
+        for word, word_id in word_ids.items():
+            for gram in trigrams(word):
+                trigram_words.append((trigram_ids.setdefault(gram, len(trigram_ids)), word_id))
+
+        self.pks = np.array(pks, dtype=np.int64)
+        self.trigram_ids = trigram_ids
+        self.word_count = len(word_ids)
+        pairs = np.array(sorted(trigram_words), dtype=np.int32).reshape(-1, 2)
+        self.trigram_offsets = np.searchsorted(pairs[:, 0], np.arange(len(trigram_ids) + 1))
+        self.trigram_words = pairs[:, 1].copy()
+        self.doc_offsets = np.cumsum([0] + [len(words) for words in doc_words])
+        self.doc_words = np.array([word for words in doc_words for word in words], dtype=np.int32)
+
+    def word_scores(self, word):
+        """Share of `word`'s trigrams present in each indexed word"""
+        grams = [self.trigram_ids[gram] for gram in trigrams(word) if gram in self.trigram_ids]
+        if not grams:
+            return None
+        postings = np.concatenate([self.trigram_words[self.trigram_offsets[g]:self.trigram_offsets[g + 1]] for g in grams])
+        return np.bincount(postings, minlength=self.word_count) / len(trigrams(word))
+
+    def search(self, query, threshold, limit):
+        """pks of the projects scoring at least `threshold`, best first, ties by rank"""
+        words = query.split()
+        if not words or not len(self.pks):
+            return []
+        totals = np.zeros(len(self.pks))
+        for word in words:
+            scores = self.word_scores(word)
+            if scores is not None:
+                totals += np.maximum.reduceat(scores[self.doc_words], self.doc_offsets[:-1])
+        totals /= len(words)
+        matches = np.flatnonzero(totals >= threshold)
+        # A stable sort keeps equally scored projects in rank order
+        order = matches[np.argsort(-totals[matches], kind='stable')][:limit]
+        return self.pks[order].tolist()
+
+
+def build_matcher():
+    from .models import LandProperty
+
+    rows = (
+        LandProperty.objects.filter(is_active=True)
+        .order_by('-is_featured', '-created_at', 'pk')
+        .values_list('pk', 'search_text')
+    )
+    return TrigramMatcher(rows)
+
+
+matcher_index = WorkerIndex(build_matcher)
+
+
+class PostgresTrigramEngine:
+    """pg_trgm word similarity against the GIN-indexed search_text column"""
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        text = canonicalize(query)
+        if not text:
+            return queryset.none()
+        threshold = get_search_min_similarity()
+        # The threshold is applied to the score rather than set on the
+        # connection, which would leak into every later query on it
+        results = (
+            queryset.annotate(search_score=TrigramWordSimilarity(text, 'search_text'))
+            .filter(search_score__gte=threshold)
+        )
+        if threshold >= PG_WORD_SIMILARITY_THRESHOLD:
+            # %> (at the default threshold) only drops rows the score filter
+            # drops too, and lets the GIN index find the candidates
+            results = results.filter(search_text__trigram_word_similar=text)
+        return results.order_by('-search_score', '-is_featured', '-created_at')
+
+    def warm(self):
+        pass
+
+
+class NumpyTrigramEngine:
+    """The in-process TrigramMatcher, for databases without pg_trgm"""
+
+    def search(self, queryset, query):
+        pks = matcher_index.get().search(canonicalize(query), get_search_min_similarity(), get_search_max_results())
+        if not pks:
+            return queryset.none()
+        rank = Case(
+            *[When(pk=pk, then=position) for position, pk in enumerate(pks[:RANKED_RESULTS])],
+            default=RANKED_RESULTS,
+            output_field=IntegerField(),
+        )
+        return queryset.filter(pk__in=pks).order_by(rank, '-is_featured', '-created_at')
+
+    def warm(self):
+        matcher_index.get()
+
+
+class ContainsEngine:
+    """Plain substring matching on the canonicalized text, when NumPy is not installed"""
+
+    def search(self, queryset, query):
+        words = canonicalize(query).split()
+        if not words:
+            return queryset.none()
+        condition = Q()
+        for word in words:
+            condition &= Q(search_text__contains=word)
+        return queryset.filter(condition)
+
+    def warm(self):
+        pass
+
+
+def get_search_engine_name():
+    """
+    SEARCH_ENGINE setting: 'postgres', 'numpy', 'contains' or 'auto' (the
+    default), which picks pg_trgm on PostgreSQL and otherwise the NumPy
+    matcher when NumPy is installed
+    """
+    name = getattr(settings, 'SEARCH_ENGINE', 'auto')
+    if name == 'auto':
+        if connections['default'].vendor == 'postgresql':
+            return 'postgres'
+        name = 'numpy'
+    if name == 'numpy' and np is None:
+        return 'contains'
+    return name
+
+
+def get_search_engine():
+    return {
+        'postgres': PostgresTrigramEngine,
+        'numpy': NumpyTrigramEngine,
+        'contains': ContainsEngine,
+    }[get_search_engine_name()]()
+
+
+def search_land_properties(queryset, query):
+    """
+    Projects in `queryset` matching the visitor's search, best first. Names
+    and location fields are matched fuzzily, tolerating spelling variants;
+    when that finds nothing the old substring search (which also covers the
+    description) is used instead.
+    """
+    results = get_search_engine().search(queryset, query)
+    if results.exists():
+        return results
+    return queryset.filter(
+        Q(name__icontains=query) |
+        Q(location__icontains=query) |
+        Q(description__icontains=query)
+    )
@@ -0,0 +1,231 @@
+import os
+import threading
+import time
+
+from PIL import Image
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseForbidden
+from django.urls import reverse
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .cache_utils import SingleFlight
+from .image_utils import ENCODERS, FIT_MODES, available_formats, get_image_encoder, render_variant, sniff_image_format
+
+
+SIGNING_SALT = 'properties.image_cache'
+MAX_DIMENSION = 4000
+# Hits refresh the file mtime (the LRU clock) at most this often
+TOUCH_INTERVAL = 60 * 60
+# Workers rescan the cache directory at least this often, to account for other workers' writes
+RESCAN_INTERVAL = 5 * 60
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+def get_resize_cache_dir():
+    return str(getattr(settings, 'RESIZE_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'cache', 'resized')))
+
+
+def get_resize_cache_max_bytes():
+    return getattr(settings, 'RESIZE_CACHE_MAX_BYTES', 256 * 1024 * 1024)
+
+
+def sign_variant(width, height, fit, path, version=''):
+    return salted_hmac(SIGNING_SALT, f'{width}x{height}/{fit}/{path}/{version}').hexdigest()[:16]
+
+
+def get_source_version(path):
+    """
+    Version of an original image: its modification time. It is part of
+    variant URLs and cache paths, so replacing a file under the same name
+    gets new URLs rather than the immutable-cached old renditions.
+    """
+    try:
+        return format(os.stat(os.path.join(settings.MEDIA_ROOT, path)).st_mtime_ns, 'x')
+    except OSError:
+        return '0'
+
+
+def resized_url(image, width, height, fit='cover'):
+    """Signed URL of a resized variant of an ImageField file (or a path relative to MEDIA_ROOT)"""
+    path = getattr(image, 'name', image)
+    version = get_source_version(path)
+    url = reverse('resized_image', args=[width, height, fit, path])
+    return f'{url}?v={version}&s={sign_variant(width, height, fit, path, version)}'
+
+
+# Cover-fit renditions used in templates, smallest first: (width, height)
+VARIANT_SETS = {
+    'hero': [(640, 347), (1200, 650)],  # carousel slides, stored at 1200x650
+    'card': [(400, 240), (640, 384)],   # property cards, shown about 400x192 CSS px
+    'gallery': [(320, 240), (640, 480)],  # detail page gallery thumbnails
+}
+
+
+def variant_srcset(image, name):
+    """srcset attribute value for a named set of renditions"""
+    return ', '.join(f'{resized_url(image, width, height)} {width}w' for width, height in VARIANT_SETS[name])
+
+
+def get_accepted_formats(request):
+    """
+    Encoders this client can display, by its Accept header. JPEG is always
+    allowed; AVIF and WebP only when advertised, as browsers do for images.
+    """
+    if get_image_encoder() != 'perceptual':
+        return ('jpeg',)
+    accept = request.headers.get('Accept', '')
+    return tuple(
+        name for name in available_formats()
+        if name == 'jpeg' or ENCODERS[name]['content_type'] in accept
+    )
+
+
+def get_variant_path(width, height, fit, path, formats=('jpeg',), version='0'):
+    """
+    Location of a variant in the cache. Each set of accepted formats gets
+    its own tree, since the smallest encoding differs between them, and
+    each source version its own file (older ones age out of the LRU).
+    """
+    return os.path.join(get_resize_cache_dir(), '+'.join(formats), f'{width}x{height}', fit, f'v{version}', path)
+
+
+class DiskLRU:
+    """
+    Size-bounded directory of variants. File mtimes act as the LRU clock:
+    hits refresh them and, once the directory grows past `max_bytes`, the
+    oldest files are removed until it is back under 90% of the limit.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.size = None
+        self.scanned_at = 0.0
+        self.evictions = 0
+
+    def touch(self, path):
+        try:
+            if time.time() - os.stat(path).st_mtime > TOUCH_INTERVAL:
+                os.utime(path)
+        except OSError:
+            pass
+
+    def scan(self):
+        files = []
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        return files
+
+    def added(self, nbytes):
+        """Account for a newly written file and evict if the directory is over budget"""
+        with self.lock:
+            if self.size is None or time.monotonic() - self.scanned_at > RESCAN_INTERVAL:
+                self.size = sum(size for _, size, _ in self.scan())
+                self.scanned_at = time.monotonic()
+            else:
+                self.size += nbytes
+            if self.size > self.max_bytes:
+                self.evict()
+
+    def evict(self):
+        files = sorted(self.scan())
+        self.size = sum(size for _, size, _ in files)
+        self.scanned_at = time.monotonic()
+        target = self.max_bytes * 0.9
+        for _, size, path in files:
+            if self.size <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+            self.evictions += 1
+
+
+_lru = None
+_lru_lock = threading.Lock()
+
+
+def get_lru():
+    global _lru
+    with _lru_lock:
+        if _lru is None:
+            _lru = DiskLRU(get_resize_cache_dir(), get_resize_cache_max_bytes())
+        return _lru
+
+
+def get_source_path(path):
+    """Resolve an original image under MEDIA_ROOT, refusing anything outside it or inside the cache"""
+    media_root = os.path.realpath(settings.MEDIA_ROOT)
+    source = os.path.realpath(os.path.join(media_root, path))
+    cache_dir = os.path.realpath(get_resize_cache_dir())
+    if not source.startswith(media_root + os.sep) or source.startswith(cache_dir + os.sep):
+        return None
+    return source if os.path.isfile(source) else None
+
+
+def get_or_render_variant(width, height, fit, path, formats=('jpeg',), version='0'):
+    """
+    Return the cached variant file, rendering it first if needed. Concurrent
+    requests for the same missing variant wait for a single render. Versions
+    other than the source's current one are not rendered.
+    """
+    variant = get_variant_path(width, height, fit, path, formats, version)
+    if os.path.isfile(variant):
+        get_lru().touch(variant)
+        return variant
+
+    source = get_source_path(path)
+    if source is None or get_source_version(path) != version:
+        return None
+
+    flight = SingleFlight(f"resize:{'+'.join(formats)}:{width}x{height}:{fit}:{version}:{path}", 60)
+    acquired = flight.acquire(wait=30)
+    try:
+        # Another request may have rendered it while we waited
+        if os.path.isfile(variant):
+            return variant
+        try:
+            content, _ = render_variant(source, width, height, fit, formats)
+        except (OSError, ValueError, SyntaxError, Image.DecompressionBombError) as e:
+            # Unreadable, truncated or oversized sources are a 404, not a 500
+            print(f"Error resizing image {source}: {str(e)}")
+            return None
+        os.makedirs(os.path.dirname(variant), exist_ok=True)
+        tmp_path = f'{variant}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(content)
+        os.replace(tmp_path, variant)
+        get_lru().added(len(content))
+        return variant
+    finally:
+        if acquired:
+            flight.release()
+
+
+def resize_view(request, width, height, fit, path):
+    """Serve a signed, resized variant of a media image in the smallest format the client accepts"""
+    version = request.GET.get('v', '')
+    if not constant_time_compare(request.GET.get('s', ''), sign_variant(width, height, fit, path, version)):
+        return HttpResponseForbidden('Invalid signature')
+    if fit not in FIT_MODES or not (0 < width <= MAX_DIMENSION and 0 < height <= MAX_DIMENSION):
+        raise Http404('Unsupported size')
+
+    variant = get_or_render_variant(width, height, fit, path, get_accepted_formats(request), version)
+    if variant is None:
+        raise Http404('Image not found')
+    f = open(variant, 'rb')
+    content_type = ENCODERS[(sniff_image_format(f.read(32)) or 'jpeg').lower()]['content_type']
+    f.seek(0)
+    response = FileResponse(f, content_type=content_type)
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response['Vary'] = 'Accept'
+    return response
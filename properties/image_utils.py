@@ -1,9 +1,252 @@
+import mmap
 import os
-from PIL import Image
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from PIL import Image, features
+from django.conf import settings
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
 from io import BytesIO
 
+try:
+    import numpy as np
+except ImportError:  # Optional: without NumPy the perceptual encoder falls back to fixed quality
+    np = None
+
+
+FIT_MODES = ('cover', 'contain')
+
+
+def to_rgb(img):
+    """Convert an image to RGB, flattening any transparency onto white"""
+    if img.mode in ('RGBA', 'LA', 'P'):
+        # Create a white background
+        background = Image.new('RGB', img.size, (255, 255, 255))
+        if img.mode == 'P':
+            img = img.convert('RGBA')
+        background.paste(img, mask=img.split()[-1] if img.mode in ('RGBA', 'LA') else None)
+        return background
+    if img.mode != 'RGB':
+        return img.convert('RGB')
+    return img
+
+
+def fit_image(img, target_width, target_height, fit='cover'):
+    """
+    Scale an image to the target box.
+
+    'cover' fills the box and crops the overflow around the centre, giving
+    exactly target_width x target_height. 'contain' fits the whole image
+    inside the box without cropping or upscaling.
+    """
+    width_ratio = target_width / img.width
+    height_ratio = target_height / img.height
+
+    if fit == 'contain':
+        scale_ratio = min(width_ratio, height_ratio, 1)
+        new_size = (max(1, round(img.width * scale_ratio)), max(1, round(img.height * scale_ratio)))
+        return img.resize(new_size, Image.Resampling.LANCZOS) if new_size != img.size else img
+
+    # Use the larger ratio to ensure the image covers the entire target area
+    scale_ratio = max(width_ratio, height_ratio)
+    new_width = int(img.width * scale_ratio)
+    new_height = int(img.height * scale_ratio)
+    img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
+
+    # Crop around the centre to the exact target dimensions
+    left = (new_width - target_width) // 2
+    top = (new_height - target_height) // 2
+    return img_resized.crop((left, top, left + target_width, top + target_height))
+
+
+# Encoder formats: Pillow format name, content type and the quality range searched
+ENCODERS = {
+    'jpeg': {'format': 'JPEG', 'content_type': 'image/jpeg', 'min_quality': 40, 'max_quality': 95},
+    'webp': {'format': 'WEBP', 'content_type': 'image/webp', 'min_quality': 40, 'max_quality': 95},
+    'avif': {'format': 'AVIF', 'content_type': 'image/avif', 'min_quality': 30, 'max_quality': 90},
+}
+
+SSIM_BLOCK = 8
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+
+def get_ssim_target():
+    return getattr(settings, 'IMAGE_SSIM_TARGET', 0.98)
+
+
+def get_image_encoder():
+    """'perceptual' (SSIM-targeted) or 'fixed' (JPEG at a fixed quality)"""
+    return getattr(settings, 'IMAGE_ENCODER', 'fixed') if np is not None else 'fixed'
+
+
+def available_formats():
+    """Encoders supported by this Pillow build, JPEG first"""
+    return [name for name in ENCODERS if name == 'jpeg' or features.check(name)]
+
+
+def luma(img):
+    """Rec. 601 luma of an RGB image as a float array"""
+    return np.asarray(img.convert('L'), dtype=np.float64)
+
+
+def ssim(reference, candidate):
+    """
+    Mean structural similarity of two luma arrays, computed over
+    non-overlapping 8x8 blocks (1.0 means identical).
+    """
+    height = reference.shape[0] // SSIM_BLOCK * SSIM_BLOCK
+    width = reference.shape[1] // SSIM_BLOCK * SSIM_BLOCK
+    if not height or not width:
+        return 1.0
+    shape = (height // SSIM_BLOCK, SSIM_BLOCK, width // SSIM_BLOCK, SSIM_BLOCK)
+    x = reference[:height, :width].reshape(shape)
+    y = candidate[:height, :width].reshape(shape)
+
+    mean_x = x.mean(axis=(1, 3), keepdims=True)
+    mean_y = y.mean(axis=(1, 3), keepdims=True)
+    var_x = ((x - mean_x) ** 2).mean(axis=(1, 3))
+    var_y = ((y - mean_y) ** 2).mean(axis=(1, 3))
+    cov = ((x - mean_x) * (y - mean_y)).mean(axis=(1, 3))
+    mean_x, mean_y = mean_x[:, 0, :, 0], mean_y[:, 0, :, 0]
+
+    scores = ((2 * mean_x * mean_y + SSIM_C1) * (2 * cov + SSIM_C2)) / (
+        (mean_x ** 2 + mean_y ** 2 + SSIM_C1) * (var_x + var_y + SSIM_C2)
+    )
+    return float(scores.mean())
+
+
+def encode(img, name, quality):
+    """Encode an RGB image without metadata (no EXIF, ICC or comments)"""
+    output = BytesIO()
+    options = {'quality': quality}
+    if name == 'jpeg':
+        options.update(optimize=True, progressive=True)
+    elif name == 'webp':
+        options.update(method=4)
+    elif name == 'avif':
+        # Speed 8 encodes about 2.5x faster than the default for ~2% larger files
+        options.update(speed=8)
+    img.save(output, format=ENCODERS[name]['format'], **options)
+    return output.getvalue()
+
+
+def encode_to_target(img, name, target, reference=None):
+    """
+    Binary-search the lowest quality whose decoded result reaches the SSIM
+    target. Returns (bytes, quality, score); falls back to the highest
+    quality tried if the target is out of reach.
+    """
+    reference = luma(img) if reference is None else reference
+    low, high = ENCODERS[name]['min_quality'], ENCODERS[name]['max_quality']
+    best = None
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(img, name, quality)
+        with Image.open(BytesIO(data)) as decoded:
+            score = ssim(reference, luma(decoded))
+        if score >= target:
+            best = (data, quality, score)
+            high = quality - 1
+        else:
+            low = quality + 1
+    if best is None:
+        quality = ENCODERS[name]['max_quality']
+        data = encode(img, name, quality)
+        with Image.open(BytesIO(data)) as decoded:
+            best = (data, quality, ssim(reference, luma(decoded)))
+    return best
+
+
+def encode_image(img, formats=('jpeg',), quality=85):
+    """
+    Encode an RGB image in the smallest of `formats`. With the perceptual
+    encoder each format is tuned to IMAGE_SSIM_TARGET first; otherwise this
+    is a plain JPEG at `quality`, as it is when none of `formats` can be
+    encoded here. Returns (bytes, format name).
+    """
+    if get_image_encoder() != 'perceptual':
+        return encode(img, 'jpeg', quality), 'jpeg'
+
+    reference = luma(img)
+    target = get_ssim_target()
+    candidates = []
+    for name in formats:
+        if name in available_formats():
+            data, _, _ = encode_to_target(img, name, target, reference)
+            candidates.append((len(data), name, data))
+    if not candidates:
+        return encode(img, 'jpeg', quality), 'jpeg'
+    _, name, data = min(candidates)
+    return data, name
+
+
+# Leading bytes of the formats accepted for upload, by Pillow format name
+IMAGE_SIGNATURES = (
+    (b'\xff\xd8\xff', 'JPEG'),
+    (b'\x89PNG\r\n\x1a\n', 'PNG'),
+    (b'GIF87a', 'GIF'),
+    (b'GIF89a', 'GIF'),
+)
+
+
+def sniff_image_format(header):
+    """Pillow format name of an image from its first bytes, or None"""
+    for signature, image_format in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'WEBP'
+    if header[4:8] == b'ftyp' and b'avif' in header[8:32]:
+        return 'AVIF'
+    return None
+
+
+def read_image_size(header, image_format):
+    """
+    (width, height) from the leading bytes of an image, or None if they do
+    not reach the dimensions yet. WebP and AVIF are parsed by hand because
+    Pillow only opens those once the whole file is there.
+    """
+    try:
+        if image_format == 'WEBP':
+            chunk = header[12:16]
+            if chunk == b'VP8 ' and len(header) >= 30:
+                width, height = struct.unpack('<HH', header[26:30])
+                return width & 0x3fff, height & 0x3fff
+            if chunk == b'VP8L' and len(header) >= 25:
+                bits = int.from_bytes(header[21:25], 'little')
+                return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+            if chunk == b'VP8X' and len(header) >= 30:
+                return int.from_bytes(header[24:27], 'little') + 1, int.from_bytes(header[27:30], 'little') + 1
+            return None
+        if image_format == 'AVIF':
+            # Image spatial extents box: size, 'ispe', version/flags, width, height
+            index = header.find(b'ispe')
+            if index < 0 or len(header) < index + 12:
+                return None
+            return struct.unpack('>II', header[index + 8:index + 16])
+        return Image.open(BytesIO(header), formats=[image_format]).size
+    except (OSError, SyntaxError, struct.error, Image.DecompressionBombError):
+        return None
+
+
+@contextmanager
+def image_buffer(image_file):
+    """
+    Readable buffer for Image.open(): a read-only memory map of uploads that
+    were streamed to disk, so the pipeline never copies them into memory,
+    otherwise the file itself.
+    """
+    if hasattr(image_file, 'temporary_file_path'):
+        with open(image_file.temporary_file_path(), 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                yield buffer
+    else:
+        image_file.seek(0)
+        yield image_file
+
 
 def resize_image(image_file, target_width=1200, target_height=650, quality=85):
     """
@@ -14,56 +257,22 @@ def resize_image(image_file, target_width=1200, target_height=650, quality=85):
         image_file: Django uploaded file object
         target_width: Target width in pixels (default: 1200)
         target_height: Target height in pixels (default: 650)
-        quality: JPEG quality (default: 85)
+        quality: JPEG quality when the perceptual encoder is off (default: 85)
     
     Returns:
         ContentFile: Processed image as ContentFile
     """
     try:
-        # Open the image
-        img = Image.open(image_file)
-        
-        # Convert to RGB if necessary (handles RGBA, P, etc.)
-        if img.mode in ('RGBA', 'LA', 'P'):
-            # Create a white background
-            background = Image.new('RGB', img.size, (255, 255, 255))
-            if img.mode == 'P':
-                img = img.convert('RGBA')
-            background.paste(img, mask=img.split()[-1] if img.mode == 'RGBA' else None)
-            img = background
-        elif img.mode != 'RGB':
-            img = img.convert('RGB')
-        
-        # Calculate the scaling factor to fit the image within target dimensions
-        width_ratio = target_width / img.width
-        height_ratio = target_height / img.height
-        
-        # Use the larger ratio to ensure the image covers the entire target area
-        scale_ratio = max(width_ratio, height_ratio)
-        
-        # Calculate new dimensions
-        new_width = int(img.width * scale_ratio)
-        new_height = int(img.height * scale_ratio)
+        with image_buffer(image_file) as buffer:
+            img = Image.open(buffer)
+            img.load()
+        img_cropped = fit_image(to_rgb(img), target_width, target_height, 'cover')
         
-        # Resize the image
-        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Calculate crop box to center the image
-        left = (new_width - target_width) // 2
-        top = (new_height - target_height) // 2
-        right = left + target_width
-        bottom = top + target_height
-        
-        # Crop the image to exact target dimensions
-        img_cropped = img_resized.crop((left, top, right, bottom))
-        
-        # Save to BytesIO
-        output = BytesIO()
-        img_cropped.save(output, format='JPEG', quality=quality, optimize=True)
-        output.seek(0)
+        # Stored uploads stay JPEG so every browser can show them
+        data, _ = encode_image(img_cropped, ('jpeg',), quality)
         
         # Create ContentFile
-        return ContentFile(output.getvalue(), name=image_file.name)
+        return ContentFile(data, name=image_file.name)
         
     except Exception as e:
         print(f"Error processing image: {str(e)}")
@@ -71,6 +280,85 @@ def resize_image(image_file, target_width=1200, target_height=650, quality=85):
         return image_file
 
 
+def get_image_workers():
+    return getattr(settings, 'IMAGE_WORKERS', None) or os.cpu_count() or 1
+
+
+def init_image_worker():
+    """Pool initializer: workers that were not forked need Django settings loaded"""
+    import django
+    django.setup()
+
+
+def resize_image_source(source, target_width, target_height, quality=85, fit='cover'):
+    """
+    Pool worker for resize_images(): crop and encode an image given as the
+    path of an upload streamed to disk (memory-mapped, not copied) or as
+    bytes. Returns the JPEG bytes.
+    """
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                img = Image.open(buffer)
+                # Decode while the map is open; 'contain' may not resize at all
+                img.load()
+    else:
+        img = Image.open(BytesIO(source))
+    img = fit_image(to_rgb(img), target_width, target_height, fit)
+    data, _ = encode_image(img, ('jpeg',), quality)
+    return data
+
+
+def resize_images(image_files, target_width=1200, target_height=650, quality=85, fit='cover'):
+    """
+    Crop and encode many uploads at once, in parallel worker processes.
+    
+    Args:
+        image_files: Django uploaded file objects
+        target_width, target_height: Target size in pixels
+        quality: JPEG quality when the perceptual encoder is off
+        fit: 'cover' (crop to exact size) or 'contain' (fit inside)
+    
+    Returns:
+        list: (ContentFile, None) or (None, error message) per file, in order
+    """
+    if not image_files:
+        return []
+    # Workers open uploads streamed to disk themselves; only small in-memory ones are pickled
+    sources = [
+        f.temporary_file_path() if hasattr(f, 'temporary_file_path') else f.read()
+        for f in image_files
+    ]
+    results = []
+    workers = min(len(sources), get_image_workers())
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_image_worker) as pool:
+        futures = [pool.submit(resize_image_source, source, target_width, target_height, quality, fit) for source in sources]
+        for image_file, future in zip(image_files, futures):
+            try:
+                results.append((ContentFile(future.result(), name=image_file.name), None))
+            except Exception as e:
+                results.append((None, str(e) or e.__class__.__name__))
+    return results
+
+
+def render_variant(source_path, width, height, fit='cover', formats=('jpeg',)):
+    """
+    Render a resized variant of an image file for the resize endpoint.
+
+    Args:
+        source_path: Path of the original image
+        width, height: Target box in pixels
+        fit: 'cover' (crop to exact size) or 'contain' (fit inside)
+        formats: Encoders the client accepts; the smallest result wins
+
+    Returns:
+        tuple: (encoded bytes, format name)
+    """
+    with Image.open(source_path) as img:
+        img = fit_image(to_rgb(img), width, height, fit)
+        return encode_image(img, formats)
+
+
 def delete_image_file(image_path):
     """
     Delete an image file from storage.
@@ -96,6 +384,9 @@ def get_image_dimensions(image_file):
     Returns:
         tuple: (width, height) or (None, None) if error
     """
+    # Uploads checked by ImageUploadHandler already know their size
+    if getattr(image_file, 'image_size', None):
+        return image_file.image_size
     try:
         img = Image.open(image_file)
         return img.size
@@ -104,4 +395,27 @@ def get_image_dimensions(image_file):
         return None, None
 
 
-
+def create_placeholder_image(width, height, color, label='', quality=80):
+    """
+    Create a solid-colour JPEG with an optional label, for sample and seed data.
+    
+    Args:
+        width: Image width in pixels
+        height: Image height in pixels
+        color: RGB tuple or colour name for the background
+        label: Text drawn in the top-left corner
+        quality: JPEG quality (default: 80)
+    
+    Returns:
+        bytes: Encoded JPEG data
+    """
+    from PIL import ImageDraw
+    
+    img = Image.new('RGB', (width, height), color)
+    if label:
+        draw = ImageDraw.Draw(img)
+        draw.rectangle((0, 0, width, height // 6), fill=(0, 0, 0))
+        draw.text((width // 40, height // 30), label, fill=(255, 255, 255))
+    output = BytesIO()
+    img.save(output, format='JPEG', quality=quality)
+    return output.getvalue()
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
+from django.core.files.base import ContentFile
 from properties.models import CarouselSlide
+from properties.image_utils import create_placeholder_image
 
 
 class Command(BaseCommand):
@@ -13,55 +15,45 @@ class Command(BaseCommand):
         slides_data = [
             {
                 'title': 'Welcome to Matrichaya Properties',
-                'subtitle': 'Your Trusted Real Estate Partner',
                 'description': 'Discover premium land properties and residential projects across Bangladesh with Matrichaya Properties Ltd.',
                 'button_text': 'Explore Properties',
                 'button_url': '/land-properties/',
-                'slide_type': 'hero',
                 'background_color': '#22c55e',
                 'is_active': True,
                 'order': 1
             },
             {
                 'title': 'Premium Land Projects',
-                'subtitle': 'Invest in Your Future',
                 'description': 'Choose from our carefully selected land properties in prime locations with modern amenities and infrastructure.',
                 'button_text': 'View Projects',
                 'button_url': '/land-properties/',
-                'slide_type': 'feature',
                 'background_color': '#3b82f6',
                 'is_active': True,
                 'order': 2
             },
             {
                 'title': 'Expert Real Estate Services',
-                'subtitle': 'Professional Guidance',
                 'description': 'Get expert advice and support throughout your property investment journey with our experienced team.',
                 'button_text': 'Contact Us',
                 'button_url': '/contact/',
-                'slide_type': 'service',
                 'background_color': '#8b5cf6',
                 'is_active': True,
                 'order': 3
             },
             {
                 'title': 'Prime Locations',
-                'subtitle': 'Strategic Investment Opportunities',
                 'description': 'Invest in land properties located in developing areas with excellent growth potential and connectivity.',
                 'button_text': 'Learn More',
                 'button_url': '/land-properties/',
-                'slide_type': 'location',
                 'background_color': '#f59e0b',
                 'is_active': True,
                 'order': 4
             },
             {
                 'title': 'Customer Satisfaction',
-                'subtitle': 'Your Success is Our Priority',
                 'description': 'Join hundreds of satisfied customers who have successfully invested in properties through Matrichaya Properties.',
                 'button_text': 'Get Started',
                 'button_url': '/contact/',
-                'slide_type': 'testimonial',
                 'background_color': '#ef4444',
                 'is_active': True,
                 'order': 5
@@ -69,7 +61,14 @@ class Command(BaseCommand):
         ]
         
         for slide_data in slides_data:
-            CarouselSlide.objects.create(**slide_data)
+            # CarouselSlide has no colour field; the colour is used for the placeholder image
+            background_color = slide_data.pop('background_color')
+            slide = CarouselSlide(**slide_data)
+            slide.image.save(
+                f"sample_slide_{slide_data['order']}.jpg",
+                ContentFile(create_placeholder_image(1200, 650, background_color, slide_data['title'])),
+                save=True
+            )
         
         self.stdout.write(
             self.style.SUCCESS(f'Successfully created {len(slides_data)} carousel slides')
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from properties.snapshot import export_snapshot, get_snapshot_dir, regenerate_for_divisions
+
+
+class Command(BaseCommand):
+    help = 'Render the public pages, including the non-empty listing facet combinations, to static HTML in SNAPSHOT_DIR'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--division',
+            action='append',
+            dest='divisions',
+            help='Only re-render the pages that can list this division (repeatable)',
+        )
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        if options['divisions']:
+            written = regenerate_for_divisions(set(options['divisions']))
+        else:
+            written = export_snapshot(stdout=self.stdout)
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} pages to {get_snapshot_dir()} in {elapsed:.1f}s'
+        ))
@@ -0,0 +1,83 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.test import Client
+import tracemalloc
+
+from properties.memory import get_rss, get_worker_rss, format_stats, take_filtered_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Drive requests through the app under tracemalloc and report the top allocation sites and growth'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url',
+            action='append',
+            dest='urls',
+            help='URL to request (repeatable, default: / and /land-properties/)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Requests per URL between snapshots',
+        )
+        parser.add_argument(
+            '--snapshots',
+            type=int,
+            default=3,
+            help='Number of snapshots to take after the baseline',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=15,
+            help='Number of allocation sites to show',
+        )
+        parser.add_argument(
+            '--staff-user',
+            type=str,
+            help='Log in as this staff user (needed for custom admin URLs)',
+        )
+        parser.add_argument(
+            '--gunicorn-pid',
+            type=int,
+            help='Also report RSS for every worker of this gunicorn master',
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls'] or ['/', '/land-properties/']
+        client = Client(SERVER_NAME='localhost')
+        if options['staff_user']:
+            client.force_login(User.objects.get(username=options['staff_user'], is_staff=True))
+
+        # Warm up caches and imports so the baseline excludes one-off allocations
+        for url in urls:
+            client.get(url)
+
+        tracemalloc.start()
+        baseline = previous = take_filtered_snapshot()
+        self.stdout.write(f'Baseline RSS: {get_rss() // 1024} KiB')
+
+        for index in range(1, options['snapshots'] + 1):
+            for url in urls:
+                for _ in range(options['requests']):
+                    client.get(url)
+            snapshot = take_filtered_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            self.stdout.write(self.style.SUCCESS(
+                f'\nSnapshot {index}: traced {current // 1024} KiB (peak {peak // 1024} KiB), RSS {get_rss() // 1024} KiB'
+            ))
+            for row in format_stats(snapshot.compare_to(previous, 'lineno'), options['limit']):
+                self.stdout.write(f"  {row['size_diff'] / 1024:+10.1f} KiB {row['count_diff']:+8d} blocks  {row['location']}")
+            previous = snapshot
+
+        self.stdout.write(self.style.SUCCESS('\nTotal growth since baseline:'))
+        for row in format_stats(previous.compare_to(baseline, 'lineno'), options['limit']):
+            self.stdout.write(f"  {row['size_diff'] / 1024:+10.1f} KiB {row['count_diff']:+8d} blocks  {row['location']}")
+        tracemalloc.stop()
+
+        if options['gunicorn_pid']:
+            self.stdout.write(self.style.SUCCESS(f"\nWorkers of gunicorn master {options['gunicorn_pid']}:"))
+            for pid, rss in get_worker_rss(options['gunicorn_pid']).items():
+                self.stdout.write(f'  pid {pid}: {rss // 1024} KiB')
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from properties.cache_utils import bump_cache_version
+from properties.fuzzy_search import build_search_text
+from properties.models import LandProperty
+from properties.search import INDEX_VERSION
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the search text of every land property, e.g. after changing SEARCH_PLACE_ALIASES'
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        changed = []
+        for land_property in LandProperty.objects.only('pk', 'name', 'location', 'district', 'area_name', 'search_text'):
+            search_text = build_search_text(land_property)
+            if search_text != land_property.search_text:
+                land_property.search_text = search_text
+                changed.append(land_property)
+        LandProperty.objects.bulk_update(changed, ['search_text'], batch_size=1000)
+        # bulk_update() sends no signals, so have the workers rebuild their matchers
+        bump_cache_version(INDEX_VERSION)
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(self.style.SUCCESS(f'Updated the search text of {len(changed)} land properties in {elapsed:.1f}s'))
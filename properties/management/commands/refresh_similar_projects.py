@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from properties.models import refresh_all_similar_projects
+
+
+class Command(BaseCommand):
+    help = 'Recompute the similar-projects list of every division and type'
+
+    def handle(self, *args, **options):
+        start = timezone.now()
+        refresh_all_similar_projects()
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(self.style.SUCCESS(f'Refreshed similar projects in {elapsed:.1f}s'))
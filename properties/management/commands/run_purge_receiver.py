@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+
+from properties.cache_tags import get_cache_purge_settings
+
+
+class Command(BaseCommand):
+    help = 'Run a local stand-in for a front cache that accepts and logs tag purge requests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+        parser.add_argument('--port', type=int, default=8099, help='Port to listen on')
+        parser.add_argument('--log', help='Also append each purge as a JSON line to this file')
+
+    def handle(self, *args, **options):
+        header = get_cache_purge_settings()['HEADER']
+        stdout = self.stdout
+        log_path = options['log']
+
+        class PurgeHandler(BaseHTTPRequestHandler):
+            def handle_purge(self):
+                tags = self.headers.get(header, '').split()
+                record = {'method': self.command, 'path': self.path, 'tags': tags}
+                stdout.write(f"{self.command} {self.path} {' '.join(tags)}")
+                if log_path:
+                    with open(log_path, 'a') as f:
+                        f.write(json.dumps(record) + '\n')
+                body = json.dumps({'status': 'ok', 'purged': tags}).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_PURGE = do_POST = handle_purge
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((options['host'], options['port']), PurgeHandler)
+        self.stdout.write(self.style.SUCCESS(
+            f"Listening for purges on http://{options['host']}:{options['port']}/ (tags in {header})"
+        ))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,294 @@
+from django.core.management.base import BaseCommand
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from decimal import Decimal
+import os
+import random
+import uuid
+
+from properties.models import LandProperty, LandPropertyImage, ContactMessage, CarouselSlide, SimilarProjectGroup, refresh_all_similar_projects, unique_slug
+from properties.image_utils import create_placeholder_image
+from properties.cache_utils import bump_cache_version
+from properties.search import INDEX_VERSION
+from properties.fuzzy_search import build_search_text
+from custom_admin.models import AdminActivity
+
+
+# Districts and upazilas per division, used for realistic location values
+LOCATIONS = {
+    'dhaka': {
+        'Dhaka': ['Keraniganj', 'Savar', 'Dhamrai', 'Dohar', 'Nawabganj', 'Uttara', 'Mirpur'],
+        'Gazipur': ['Gazipur Sadar', 'Kaliakair', 'Kapasia', 'Sreepur', 'Tongi'],
+        'Narayanganj': ['Rupganj', 'Sonargaon', 'Araihazar', 'Bandar', 'Siddhirganj'],
+        'Munshiganj': ['Sreenagar', 'Louhajang', 'Tongibari', 'Sirajdikhan'],
+        'Manikganj': ['Singair', 'Saturia', 'Ghior', 'Harirampur'],
+        'Narsingdi': ['Palash', 'Shibpur', 'Raipura', 'Belabo'],
+    },
+    'chittagong': {
+        'Chattogram': ['Patiya', 'Sitakunda', 'Hathazari', 'Mirsharai', 'Anwara', 'Boalkhali'],
+        'Cumilla': ['Cumilla Sadar', 'Chandina', 'Daudkandi', 'Laksam', 'Burichang'],
+        "Cox's Bazar": ['Ramu', 'Ukhia', 'Teknaf', 'Chakaria'],
+        'Feni': ['Feni Sadar', 'Chhagalnaiya', 'Sonagazi'],
+        'Noakhali': ['Begumganj', 'Companiganj', 'Senbagh'],
+    },
+    'rajshahi': {
+        'Rajshahi': ['Paba', 'Godagari', 'Puthia', 'Bagha'],
+        'Bogura': ['Bogura Sadar', 'Sherpur', 'Shibganj', 'Gabtali'],
+        'Pabna': ['Ishwardi', 'Pabna Sadar', 'Bera'],
+        'Natore': ['Natore Sadar', 'Baraigram', 'Singra'],
+    },
+    'khulna': {
+        'Khulna': ['Dumuria', 'Rupsa', 'Batiaghata', 'Phultala'],
+        'Jashore': ['Jashore Sadar', 'Abhaynagar', 'Jhikargachha'],
+        'Kushtia': ['Kushtia Sadar', 'Kumarkhali', 'Bheramara'],
+        'Satkhira': ['Satkhira Sadar', 'Kalaroa', 'Shyamnagar'],
+    },
+    'barisal': {
+        'Barishal': ['Barishal Sadar', 'Bakerganj', 'Babuganj'],
+        'Patuakhali': ['Kalapara', 'Patuakhali Sadar', 'Galachipa'],
+        'Bhola': ['Bhola Sadar', 'Char Fasson', 'Lalmohan'],
+    },
+    'sylhet': {
+        'Sylhet': ['Sylhet Sadar', 'Jaintiapur', 'Companiganj', 'Golapganj'],
+        'Moulvibazar': ['Sreemangal', 'Kulaura', 'Moulvibazar Sadar'],
+        'Habiganj': ['Habiganj Sadar', 'Madhabpur', 'Chunarughat'],
+    },
+    'rangpur': {
+        'Rangpur': ['Rangpur Sadar', 'Mithapukur', 'Pirganj'],
+        'Dinajpur': ['Dinajpur Sadar', 'Birampur', 'Parbatipur'],
+        'Thakurgaon': ['Thakurgaon Sadar', 'Pirganj', 'Ranisankail'],
+    },
+    'mymensingh': {
+        'Mymensingh': ['Mymensingh Sadar', 'Trishal', 'Bhaluka', 'Muktagachha'],
+        'Jamalpur': ['Jamalpur Sadar', 'Sarishabari', 'Melandaha'],
+        'Netrokona': ['Netrokona Sadar', 'Mohanganj', 'Durgapur'],
+    },
+}
+
+# Most projects are around the capital and the port city
+DIVISION_WEIGHTS = {
+    'dhaka': 40, 'chittagong': 20, 'rajshahi': 8, 'khulna': 8,
+    'barisal': 5, 'sylhet': 8, 'rangpur': 5, 'mymensingh': 6,
+}
+
+# Typical price per katha (BDT) by division; individual projects vary around it
+BASE_PRICE = {
+    'dhaka': 2500000, 'chittagong': 1800000, 'rajshahi': 700000, 'khulna': 800000,
+    'barisal': 500000, 'sylhet': 1000000, 'rangpur': 450000, 'mymensingh': 550000,
+}
+
+NAME_PREFIXES = ['Green', 'River', 'Lake', 'Sunrise', 'Golden', 'Silver', 'Royal', 'Shanti', 'Nirob', 'Sobuj', 'Purbachal', 'Padma', 'Meghna', 'Jamuna', 'Bashundhara']
+NAME_SUFFIXES = ['Valley', 'View', 'City', 'Town', 'Nagar', 'Housing', 'Residency', 'Garden', 'Abashon', 'Model Town', 'Plots', 'Project']
+AMENITIES = ['Road Access', 'Electricity', 'Water Supply', 'Gas Connection', 'Security', 'Park', 'Mosque', 'School Nearby', 'Hospital Nearby', 'Drainage', 'Community Center', 'Playground']
+FIRST_NAMES = ['Rahim', 'Karim', 'Fatema', 'Ayesha', 'Hasan', 'Nusrat', 'Tanvir', 'Sadia', 'Arif', 'Mitu', 'Sumon', 'Rina', 'Jamal', 'Farhana', 'Imran', 'Tania']
+LAST_NAMES = ['Ahmed', 'Hossain', 'Rahman', 'Islam', 'Khan', 'Chowdhury', 'Akter', 'Begum', 'Sarkar', 'Das', 'Uddin', 'Mia']
+MESSAGE_TEMPLATES = [
+    'I am interested in plots in {area}. Please share the price list and payment plan.',
+    'Do you have any {size} katha plots available near {area}?',
+    'Please call me about your project in {area}. I would like to visit the site.',
+    'What documents are needed to book a plot in {area}? Is there an installment option?',
+    'Looking for a commercial plot around {area}. Please send details.',
+]
+SLIDE_COLORS = ['#22c55e', '#3b82f6', '#8b5cf6', '#f59e0b', '#ef4444', '#14b8a6', '#0ea5e9', '#84cc16']
+
+
+def render_placeholder(args):
+    """Process-pool task: render one placeholder image and write it under MEDIA_ROOT"""
+    media_root, relative_path, width, height, color, label = args
+    path = os.path.join(media_root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(create_placeholder_image(width, height, color, label))
+    return relative_path
+
+
+class Command(BaseCommand):
+    help = 'Generate large volumes of realistic sample data with bulk_create for benchmarking'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--land-properties', type=int, default=200, help='Number of LandProperty rows')
+        parser.add_argument('--contact-messages', type=int, default=500, help='Number of ContactMessage rows')
+        parser.add_argument('--activities', type=int, default=1000, help='Number of AdminActivity rows')
+        parser.add_argument('--carousel-slides', type=int, default=5, help='Number of CarouselSlide rows')
+        parser.add_argument('--images', type=int, default=24, help='Distinct placeholder images to generate and reuse')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create batch')
+        parser.add_argument('--workers', type=int, default=None, help='Processes used to render images')
+        parser.add_argument('--seed', type=int, default=None, help='Random seed for reproducible data')
+        parser.add_argument('--clear', action='store_true', help='Delete existing rows of the seeded models first')
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        # Not drawn from rng: reruns with the same --seed must not repeat contact fingerprints
+        self.run_id = uuid.uuid4().hex[:8]
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+
+        if options['clear']:
+            with transaction.atomic():
+                LandPropertyImage.objects.all().delete()
+                # Raw delete so every deleted project doesn't refresh its group's similar projects
+                LandProperty.objects.all()._raw_delete(LandProperty.objects.db)
+                SimilarProjectGroup.objects.all().delete()
+                ContactMessage.objects.all().delete()
+                AdminActivity.objects.all().delete()
+                # Raw delete so the pre_delete signal doesn't remove images one by one
+                CarouselSlide.objects.all()._raw_delete(CarouselSlide.objects.db)
+            self.stdout.write(self.style.WARNING('Cleared existing data'))
+
+        property_images, slide_images = self.render_images(options)
+        self.taken_slugs = set(LandProperty.objects.values_list('slug', flat=True))
+
+        self.create_in_batches(LandProperty, options['land_properties'], lambda i: self.build_land_property(i, property_images))
+        self.create_in_batches(ContactMessage, options['contact_messages'], self.build_contact_message)
+        self.create_in_batches(CarouselSlide, options['carousel_slides'], lambda i: self.build_carousel_slide(i, slide_images))
+        # bulk_create and _raw_delete skip the signals that normally expire cached pages
+        bump_cache_version('carousel')
+        bump_cache_version('land_properties')
+        bump_cache_version(INDEX_VERSION)
+        refresh_all_similar_projects()
+
+        if options['activities']:
+            self.admin_user = self.get_admin_user()
+            self.create_in_batches(AdminActivity, options['activities'], self.build_activity)
+
+    def render_images(self, options):
+        """Render the placeholder image pool in parallel and return relative paths"""
+        count = max(1, options['images'])
+        seed_id = self.rng.randrange(16 ** 6)
+        tasks = []
+        for i in range(count):
+            color = tuple(self.rng.randrange(40, 200) for _ in range(3))
+            tasks.append((str(settings.MEDIA_ROOT), f'land_properties/seed_{seed_id:06x}_{i}.jpg', 800, 600, color, f'Project {i + 1}'))
+        slide_count = min(count, max(options['carousel_slides'], 1))
+        for i in range(slide_count):
+            color = SLIDE_COLORS[i % len(SLIDE_COLORS)]
+            tasks.append((str(settings.MEDIA_ROOT), f'carousel/seed_{seed_id:06x}_{i}.jpg', 1200, 650, color, f'Slide {i + 1}'))
+
+        start = timezone.now()
+        with ProcessPoolExecutor(max_workers=options['workers']) as executor:
+            paths = list(executor.map(render_placeholder, tasks))
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(f'Rendered {len(paths)} placeholder images in {elapsed:.1f}s')
+        return paths[:count], paths[count:]
+
+    def create_in_batches(self, model, total, build):
+        """bulk_create `total` rows in batches inside one transaction"""
+        if total <= 0:
+            return
+        start = timezone.now()
+        with transaction.atomic():
+            for offset in range(0, total, self.batch_size):
+                batch = [build(i) for i in range(offset, min(offset + self.batch_size, total))]
+                model.objects.bulk_create(batch, batch_size=self.batch_size)
+        elapsed = (timezone.now() - start).total_seconds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {total} {model._meta.verbose_name_plural} in {elapsed:.1f}s'
+        ))
+
+    def random_past(self, days):
+        return self.now - timedelta(seconds=self.rng.randrange(days * 24 * 60 * 60))
+
+    def build_land_property(self, i, images):
+        rng = self.rng
+        division = rng.choices(list(DIVISION_WEIGHTS), weights=list(DIVISION_WEIGHTS.values()))[0]
+        district = rng.choice(list(LOCATIONS[division]))
+        area_name = rng.choice(LOCATIONS[division][district])
+        total_plots = int(rng.lognormvariate(4, 0.7)) + 5
+        project_status = rng.choices(['ongoing', 'completed', 'upcoming'], weights=[55, 25, 20])[0]
+        if project_status == 'completed':
+            available_plots = rng.randint(0, max(1, total_plots // 10))
+        elif project_status == 'upcoming':
+            available_plots = total_plots
+        else:
+            available_plots = rng.randint(1, total_plots)
+        price = BASE_PRICE[division] * rng.lognormvariate(0, 0.35)
+        created_at = self.random_past(3 * 365)
+        name = f'{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {area_name} {i + 1}'
+        land_property = LandProperty(
+            name=name,
+            slug=unique_slug(name, self.taken_slugs),
+            area=f'{total_plots * rng.choice([3, 5, 10])} katha',
+            location=f'{area_name}, {district}, {division.title()}',
+            division=division,
+            district=district,
+            area_name=area_name,
+            description=f'A {project_status} land project in {area_name}, {district} with {total_plots} plots and easy access to the main road.',
+            image=images[i % len(images)],
+            project_status=project_status,
+            property_type=rng.choices(['residential', 'commercial', 'mixed'], weights=[70, 15, 15])[0],
+            price_per_katha=Decimal(int(price / 1000) * 1000),
+            total_plots=total_plots,
+            available_plots=available_plots,
+            amenities=', '.join(rng.sample(AMENITIES, rng.randint(3, 8))),
+            is_featured=rng.random() < 0.05,
+            is_active=rng.random() < 0.92,
+            created_at=created_at,
+        )
+        # bulk_create() skips save(), which normally fills it
+        land_property.search_text = build_search_text(land_property)
+        return land_property
+
+    def build_contact_message(self, i):
+        rng = self.rng
+        first_name = rng.choice(FIRST_NAMES)
+        last_name = rng.choice(LAST_NAMES)
+        division = rng.choices(list(DIVISION_WEIGHTS), weights=list(DIVISION_WEIGHTS.values()))[0]
+        district = rng.choice(list(LOCATIONS[division]))
+        email = f'{first_name.lower()}.{last_name.lower()}{i}@example.com'
+        phone = f'01{rng.choice("3456789")}{rng.randrange(10 ** 8):08d}'
+        message = rng.choice(MESSAGE_TEMPLATES).format(area=district, size=rng.choice([3, 5, 10])) + f' (ref {self.run_id}-{i})'
+        submitted_at = self.random_past(365)
+        return ContactMessage(
+            first_name=first_name,
+            last_name=last_name,
+            email=email,
+            phone=phone,
+            property_type=rng.choices(['land', 'apartment', 'house', 'commercial', 'other', ''], weights=[50, 15, 10, 10, 5, 10])[0],
+            budget=rng.choices(['under-50', '50-100', '100-200', '200-500', 'above-500', ''], weights=[30, 30, 20, 8, 2, 10])[0],
+            message=message,
+            newsletter_subscription=rng.random() < 0.3,
+            status=rng.choices(['new', 'read', 'replied', 'closed'], weights=[20, 30, 35, 15])[0],
+            ip_address=f'103.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+            fingerprint=ContactMessage.compute_fingerprint(email, phone, message, submitted_at),
+            last_submitted_at=submitted_at,
+        )
+
+    def build_carousel_slide(self, i, images):
+        return CarouselSlide(
+            title=f'Featured Projects {i + 1}',
+            description='Discover premium land properties across Bangladesh with Matrichaya Properties Ltd.',
+            image=images[i % len(images)],
+            button_text='Explore Properties',
+            button_url='/land-properties/',
+            is_active=i < 5,
+            order=i,
+        )
+
+    def get_admin_user(self):
+        admin_user, created = User.objects.get_or_create(
+            username='admin',
+            defaults={'email': 'admin@matrichaya.com', 'is_staff': True, 'is_superuser': True},
+        )
+        if created:
+            admin_user.set_password('admin123')
+            admin_user.save()
+        return admin_user
+
+    def build_activity(self, i):
+        rng = self.rng
+        action = rng.choices(['view', 'update', 'create', 'delete', 'login', 'logout'], weights=[55, 20, 10, 5, 6, 4])[0]
+        model_name = rng.choice(['LandProperty', 'CarouselSlide', 'NavbarImage', 'ContactMessage', 'Dashboard', 'AdminActivity'])
+        return AdminActivity(
+            admin=self.admin_user,
+            action=action,
+            model_name=model_name,
+            object_id=rng.randint(1, 1000) if action in ('update', 'delete', 'create') else None,
+            description=f'{action.title()} {model_name}',
+            ip_address=f'103.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(1, 255)}',
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 Chrome/120.0 Safari/537.36',
+            timestamp=self.random_past(180),
+        )
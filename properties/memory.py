@@ -0,0 +1,208 @@
+import os
+import resource
+import threading
+import tracemalloc
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse
+from django.utils import timezone
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_http_methods
+
+from .metrics import has_metrics_token, is_metrics_request_allowed
+
+
+# Accepted ranges of the interval (seconds) and limit (rows) parameters
+SNAPSHOT_INTERVAL_RANGE = (1, 60 * 60)
+REPORT_LIMIT_RANGE = (1, 100)
+
+
+def get_rss(pid='self'):
+    """Resident set size of a process in bytes, or None if unavailable"""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if pid == 'self':
+        # ru_maxrss is the peak, in kilobytes on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return None
+
+
+def get_worker_rss(parent=None):
+    """
+    RSS of the children of `parent` (e.g. the gunicorn master). By default
+    this is this process's parent, so a worker reports itself and its siblings.
+    """
+    include_self = parent is None
+    parent = parent or os.getppid()
+    workers = {}
+    try:
+        pids = [int(name) for name in os.listdir('/proc') if name.isdigit()]
+    except OSError:
+        pids = []
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat') as f:
+                # The command name may contain spaces, so split after the closing parenthesis
+                fields = f.read().rsplit(')', 1)[1].split()
+            if int(fields[1]) == parent:
+                rss = get_rss(pid)
+                if rss is not None:
+                    workers[pid] = rss
+        except (OSError, IndexError, ValueError):
+            continue
+    if include_self:
+        workers[os.getpid()] = get_rss()
+    return dict(sorted(workers.items()))
+
+
+def take_filtered_snapshot():
+    """tracemalloc snapshot without tracemalloc's own and import machinery allocations"""
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    ))
+
+
+def format_stats(stats, limit=15):
+    """Turn tracemalloc statistics (or differences) into JSON-friendly dicts"""
+    rows = []
+    for stat in stats[:limit]:
+        frame = stat.traceback[0]
+        rows.append({
+            'location': f'{frame.filename}:{frame.lineno}',
+            'size': stat.size,
+            'size_diff': getattr(stat, 'size_diff', 0),
+            'count': stat.count,
+            'count_diff': getattr(stat, 'count_diff', 0),
+        })
+    return rows
+
+
+class MemoryTracker:
+    """
+    Controls tracemalloc for one worker. While running, a helper thread takes
+    a snapshot every `interval` seconds and keeps only the baseline and the
+    latest, so the diff shows what grew since tracing started.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.baseline = None
+        self.latest = None
+        self.started_at = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    @property
+    def running(self):
+        return tracemalloc.is_tracing()
+
+    def start(self, interval=60, frames=1):
+        with self.lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            self.baseline = take_filtered_snapshot()
+            self.latest = None
+            self.started_at = timezone.now()
+            self.stopped.clear()
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, args=(interval,), daemon=True)
+                self.thread.start()
+
+    def stop(self):
+        with self.lock:
+            self.stopped.set()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
+            self.baseline = self.latest = None
+
+    def run(self, interval):
+        while not self.stopped.wait(interval):
+            self.snapshot()
+
+    def snapshot(self):
+        if not tracemalloc.is_tracing():
+            return
+        latest = take_filtered_snapshot()
+        with self.lock:
+            self.latest = latest
+
+    def report(self, limit=15):
+        report = {
+            'pid': os.getpid(),
+            'tracing': self.running,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'workers_rss': get_worker_rss(),
+        }
+        if self.running:
+            current, peak = tracemalloc.get_traced_memory()
+            report['traced_current'] = current
+            report['traced_peak'] = peak
+            with self.lock:
+                baseline, latest = self.baseline, self.latest
+            if latest is not None:
+                report['top'] = format_stats(latest.statistics('lineno'), limit)
+                if baseline is not None:
+                    report['growth'] = format_stats(latest.compare_to(baseline, 'lineno'), limit)
+        return report
+
+
+tracker = MemoryTracker()
+
+
+def get_int_param(params, name, default, bounds):
+    """Integer parameter clamped to `bounds`, or None if it is not a number"""
+    try:
+        value = int(params.get(name, default))
+    except (TypeError, ValueError):
+        return None
+    low, high = bounds
+    return min(max(value, low), high)
+
+
+def memory_report(request):
+    limit = get_int_param(request.GET, 'limit', 15, REPORT_LIMIT_RANGE)
+    if limit is None:
+        return HttpResponseBadRequest('limit must be an integer', content_type='text/plain')
+    return JsonResponse(tracker.report(limit), json_dumps_params={'indent': 2})
+
+
+def memory_action(request):
+    action = request.POST.get('action', '')
+    if action == 'start':
+        interval = get_int_param(request.POST, 'interval', getattr(settings, 'MEMORY_SNAPSHOT_INTERVAL', 60), SNAPSHOT_INTERVAL_RANGE)
+        if interval is None:
+            return HttpResponseBadRequest('interval must be an integer', content_type='text/plain')
+        tracker.start(interval=interval)
+    elif action == 'snapshot':
+        tracker.snapshot()
+    elif action == 'stop':
+        tracker.stop()
+    else:
+        return HttpResponseBadRequest('action must be start, snapshot or stop', content_type='text/plain')
+    return memory_report(request)
+
+
+@csrf_exempt
+@require_http_methods(['GET', 'POST'])
+def memory_view(request):
+    """
+    Per-worker memory diagnostics. GET returns the current report; POST
+    `action=start` enables tracemalloc with periodic snapshots,
+    `action=snapshot` takes one immediately and `action=stop` disables
+    tracing. Staff sessions must send a CSRF token with the POST; bearer
+    token clients need not, as browsers never attach that header by themselves.
+    """
+    if not is_metrics_request_allowed(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    if request.method == 'GET':
+        return memory_report(request)
+    if has_metrics_token(request):
+        return memory_action(request)
+    return csrf_protect(memory_action)(request)
@@ -0,0 +1,343 @@
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Only views from these modules are recorded
+INSTRUMENTED_MODULES = ('properties.views', 'custom_admin.views')
+
+# Snapshots not rewritten for this many flush intervals belong to workers that are gone
+STALE_FLUSH_INTERVALS = 6
+# Counts of retired workers, kept so the totals never go down when workers are recycled
+RETIRED_FILE = 'retired.json'
+LOCK_FILE = '.lock'
+
+
+@contextmanager
+def metrics_dir_lock(metrics_dir):
+    """Serialize snapshot writes and retirements across the workers of this host"""
+    os.makedirs(metrics_dir, exist_ok=True)
+    with open(os.path.join(metrics_dir, LOCK_FILE), 'a') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def write_json(path, data):
+    tmp_path = f'{path}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def merge_views(merged, views):
+    """Add one snapshot's per-view counters into `merged`, in place"""
+    for view_name, data in views.items():
+        total = merged.setdefault(view_name, registry.new_view())
+        for key in ('count', 'latency_sum', 'db_queries', 'db_time', 'response_bytes'):
+            total[key] += data[key]
+        for index, value in enumerate(data['latency_buckets']):
+            total['latency_buckets'][index] += value
+        for status, value in data['status'].items():
+            total['status'][status] = total['status'].get(status, 0) + value
+    return merged
+
+
+class MetricsRegistry:
+    """
+    Per-process store of request metrics. Each worker periodically writes a
+    snapshot to METRICS_DIR so any worker can serve totals for all of them.
+    Once it has recorded a request, a background thread keeps rewriting the
+    snapshot while the worker is idle, so only dead workers' files go stale.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.views = {}
+        self.last_flush = 0.0
+        self.flusher_pid = None
+        self.flushed_pid = None
+
+    def new_view(self):
+        return {
+            'count': 0,
+            'latency_sum': 0.0,
+            'latency_buckets': [0] * (len(LATENCY_BUCKETS) + 1),
+            'db_queries': 0,
+            'db_time': 0.0,
+            'response_bytes': 0,
+            'status': {},
+        }
+
+    def record(self, view_name, duration, queries, query_time, size, status):
+        bucket = bisect_left(LATENCY_BUCKETS, duration)
+        status = str(status)
+        with self.lock:
+            data = self.views.get(view_name)
+            if data is None:
+                data = self.views[view_name] = self.new_view()
+            data['count'] += 1
+            data['latency_sum'] += duration
+            data['latency_buckets'][bucket] += 1
+            data['db_queries'] += queries
+            data['db_time'] += query_time
+            data['response_bytes'] += size
+            data['status'][status] = data['status'].get(status, 0) + 1
+
+    def snapshot(self):
+        with self.lock:
+            return json.loads(json.dumps(self.views))
+
+    def maybe_flush(self):
+        """Write this worker's snapshot to disk at most once per METRICS_FLUSH_INTERVAL"""
+        metrics_dir = getattr(settings, 'METRICS_DIR', None)
+        interval = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5)
+        now = time.monotonic()
+        if not metrics_dir or now - self.last_flush < interval:
+            return
+        self.last_flush = now
+        self.flush(metrics_dir)
+        self.start_flusher()
+
+    def start_flusher(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        with self.lock:
+            if self.flusher_pid == os.getpid():
+                return
+            self.flusher_pid = os.getpid()
+        threading.Thread(target=self.flush_while_idle, daemon=True).start()
+
+    def flush_while_idle(self):
+        while True:
+            time.sleep(getattr(settings, 'METRICS_FLUSH_INTERVAL', 5))
+            self.maybe_flush()
+
+    def flush(self, metrics_dir):
+        try:
+            with metrics_dir_lock(metrics_dir):
+                path = os.path.join(metrics_dir, f'worker-{os.getpid()}.json')
+                if self.flushed_pid == os.getpid() and not os.path.exists(path):
+                    # Retired as stale while this worker was stuck: its counts
+                    # so far are in RETIRED_FILE, so only newer ones may be written
+                    with self.lock:
+                        self.views = {}
+                self.flushed_pid = os.getpid()
+                write_json(path, self.snapshot())
+        except OSError as e:
+            print(f"Error writing metrics snapshot: {str(e)}")
+
+
+registry = MetricsRegistry()
+
+
+class QueryCounter:
+    """Connection execute wrapper that counts queries and their total time"""
+    __slots__ = ('count', 'elapsed')
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.count += 1
+
+
+class MetricsMiddleware:
+    """Record latency, DB queries, response size and status for every instrumented view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        start = time.perf_counter()
+        with connection.execute_wrapper(counter):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.func.__module__ in INSTRUMENTED_MODULES:
+            view_name = f'{match.func.__module__}.{match.func.__name__}'
+            if response.streaming:
+                size = 0
+            else:
+                size = len(response.content)
+            registry.record(view_name, duration, counter.count, counter.elapsed, size, response.status_code)
+            registry.maybe_flush()
+        return response
+
+
+def is_process_running(pid):
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def is_stale_snapshot(path, pid):
+    """A snapshot left by a worker that exited: its process is gone or it stopped being rewritten"""
+    stale_after = getattr(settings, 'METRICS_FLUSH_INTERVAL', 5) * STALE_FLUSH_INTERVALS
+    return not is_process_running(pid) or time.time() - os.stat(path).st_mtime > stale_after
+
+
+def retire_snapshot(metrics_dir, path):
+    """Fold an exited worker's counters into RETIRED_FILE and delete its snapshot"""
+    with metrics_dir_lock(metrics_dir):
+        try:
+            with open(path) as f:
+                views = json.load(f)
+        except FileNotFoundError:
+            # Another worker retired it first
+            return
+        retired = read_retired(metrics_dir)
+        write_json(os.path.join(metrics_dir, RETIRED_FILE), merge_views(retired, views))
+        os.remove(path)
+
+
+def read_retired(metrics_dir):
+    try:
+        with open(os.path.join(metrics_dir, RETIRED_FILE)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def collect_metrics():
+    """
+    Merge the snapshots of every worker (and this process) into one dict.
+    Snapshots of workers that are gone are folded into RETIRED_FILE, which
+    is counted too, so recycling workers never makes a counter go down.
+    """
+    metrics_dir = getattr(settings, 'METRICS_DIR', None)
+    snapshots = {os.getpid(): registry.snapshot()}
+    merged = {}
+    if metrics_dir:
+        for path in glob.glob(os.path.join(metrics_dir, 'worker-*.json')):
+            try:
+                pid = int(os.path.basename(path)[len('worker-'):-len('.json')])
+                if pid == os.getpid():
+                    continue
+                if is_stale_snapshot(path, pid):
+                    retire_snapshot(metrics_dir, path)
+                    continue
+                with open(path) as f:
+                    snapshots[pid] = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error reading metrics snapshot {path}: {str(e)}")
+        try:
+            merge_views(merged, read_retired(metrics_dir))
+        except (OSError, ValueError) as e:
+            print(f"Error reading retired metrics: {str(e)}")
+
+    for views in snapshots.values():
+        merge_views(merged, views)
+    return merged, len(snapshots)
+
+
+def render_metrics(merged, workers):
+    """Render merged metrics in the Prometheus text exposition format"""
+    lines = [
+        '# HELP django_view_latency_seconds View latency',
+        '# TYPE django_view_latency_seconds histogram',
+    ]
+    for view_name, data in sorted(merged.items()):
+        cumulative = 0
+        for bound, value in zip(LATENCY_BUCKETS + ('+Inf',), data['latency_buckets']):
+            cumulative += value
+            lines.append(f'django_view_latency_seconds_bucket{{view="{view_name}",le="{bound}"}} {cumulative}')
+        lines.append(f'django_view_latency_seconds_sum{{view="{view_name}"}} {data["latency_sum"]:.6f}')
+        lines.append(f'django_view_latency_seconds_count{{view="{view_name}"}} {data["count"]}')
+
+    counters = [
+        ('django_view_db_queries_total', 'DB queries executed by the view', 'db_queries', '{}'),
+        ('django_view_db_seconds_total', 'Time spent in DB queries', 'db_time', '{:.6f}'),
+        ('django_view_response_bytes_total', 'Response body bytes', 'response_bytes', '{}'),
+    ]
+    for metric, help_text, key, fmt in counters:
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for view_name, data in sorted(merged.items()):
+            lines.append(f'{metric}{{view="{view_name}"}} {fmt.format(data[key])}')
+
+    lines.append('# HELP django_view_responses_total Responses by status code')
+    lines.append('# TYPE django_view_responses_total counter')
+    for view_name, data in sorted(merged.items()):
+        for status, value in sorted(data['status'].items()):
+            lines.append(f'django_view_responses_total{{view="{view_name}",status="{status}"}} {value}')
+
+    from .ratelimit import get_rate_limit_stats
+    lines.append('# HELP contact_rate_limit_total Rate limiter decisions in the serving worker')
+    lines.append('# TYPE contact_rate_limit_total counter')
+    for name, value in get_rate_limit_stats().items():
+        if name in ('allowed', 'rejected_client', 'rejected_global'):
+            lines.append(f'contact_rate_limit_total{{result="{name}"}} {value}')
+
+    from .compression import get_compression_stats
+    lines.append('# HELP response_compression_total Compressed-body cache results in the serving worker')
+    lines.append('# TYPE response_compression_total counter')
+    for name, value in get_compression_stats().items():
+        lines.append(f'response_compression_total{{result="{name}"}} {value}')
+
+    from .cache_backends import get_cache_stats
+    cache_stats = get_cache_stats()
+    l1_entries = cache_stats.pop('l1_entries', 0)
+    lines.append('# HELP two_tier_cache_total Two-tier cache counters in the serving worker')
+    lines.append('# TYPE two_tier_cache_total counter')
+    for name, value in cache_stats.items():
+        lines.append(f'two_tier_cache_total{{event="{name}"}} {value}')
+    lines.append('# HELP two_tier_cache_l1_entries Entries in the serving worker L1 cache')
+    lines.append('# TYPE two_tier_cache_l1_entries gauge')
+    lines.append(f'two_tier_cache_l1_entries {l1_entries}')
+
+    lines.append('# HELP django_metrics_workers Worker snapshots included')
+    lines.append('# TYPE django_metrics_workers gauge')
+    lines.append(f'django_metrics_workers {workers}')
+    return '\n'.join(lines) + '\n'
+
+
+def has_metrics_token(request):
+    """Whether the request carries a bearer token matching METRICS_TOKEN"""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    header = request.META.get('HTTP_AUTHORIZATION', '')
+    return bool(token) and constant_time_compare(header, f'Bearer {token}')
+
+
+def is_metrics_request_allowed(request):
+    """Allow staff sessions, or a bearer token matching METRICS_TOKEN"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated and user.is_staff:
+        return True
+    return has_metrics_token(request)
+
+
+def metrics_view(request):
+    """Prometheus text endpoint aggregated across workers"""
+    if not is_metrics_request_allowed(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    merged, workers = collect_metrics()
+    return HttpResponse(render_metrics(merged, workers), content_type='text/plain; version=0.0.4')
@@ -0,0 +1,85 @@
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse, JsonResponse
+
+
+class HealthCheckMiddleware:
+    """
+    Answer /healthz and /readyz before any other middleware runs, so health
+    probes skip sessions, messages, CSRF, URL resolution and templates.
+
+    /healthz only proves the worker is serving requests.
+    /readyz pings the database and checks MEDIA_ROOT, caching the result for
+    HEALTH_CHECK_CACHE_SECONDS so frequent probes don't hit the database.
+    The ping fails after HEALTH_CHECK_TIMEOUT seconds, connecting included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.cache_seconds = getattr(settings, 'HEALTH_CHECK_CACHE_SECONDS', 5)
+        self.timeout = getattr(settings, 'HEALTH_CHECK_TIMEOUT', 2)
+        self.database_ping = None
+        self.lock = threading.Lock()
+        self.checked_at = 0.0
+        self.checks = None
+
+    def __call__(self, request):
+        path = request.path_info
+        if path == '/healthz':
+            return HttpResponse('ok', content_type='text/plain')
+        if path == '/readyz':
+            return self.readiness()
+        return self.get_response(request)
+
+    def readiness(self):
+        now = time.monotonic()
+        if self.checks is None or now - self.checked_at > self.cache_seconds:
+            with self.lock:
+                if self.checks is None or now - self.checked_at > self.cache_seconds:
+                    self.checks = {
+                        'database': self.check_database(),
+                        'media': self.check_media(),
+                    }
+                    self.checked_at = time.monotonic()
+        checks = self.checks
+        ready = all(checks.values())
+        return JsonResponse(
+            {'status': 'ok' if ready else 'unavailable', 'checks': checks},
+            status=200 if ready else 503,
+        )
+
+    def check_database(self):
+        """
+        Ping the database from a separate thread, which has its own
+        connection, so a hanging connect or query cannot block the probe
+        """
+        if self.database_ping is not None and self.database_ping.is_alive():
+            # The previous ping is still stuck
+            return False
+        result = {}
+        self.database_ping = threading.Thread(target=self.ping_database, args=(result,), daemon=True)
+        self.database_ping.start()
+        self.database_ping.join(self.timeout)
+        return result.get('ok', False)
+
+    def ping_database(self, result):
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                if connection.vendor == 'postgresql':
+                    # Also bound the query on the server, so it does not run on after the probe gave up
+                    cursor.execute(f'SET LOCAL statement_timeout = {int(self.timeout * 1000)}')
+                cursor.execute('SELECT 1')
+                cursor.fetchone()
+            result['ok'] = True
+        except Exception as e:
+            print(f"Readiness database check failed: {str(e)}")
+        finally:
+            connection.close()
+
+    def check_media(self):
+        media_root = str(settings.MEDIA_ROOT)
+        return os.path.isdir(media_root) and os.access(media_root, os.W_OK)
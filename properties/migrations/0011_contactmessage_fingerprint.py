@@ -0,0 +1,32 @@
+# Generated by Django 5.2.6 on 2026-10-19 02:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_auto_20250920_2003'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='contactmessage',
+            name='duplicate_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of identical resubmissions collapsed into this message'),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of normalized email, phone, message and time window', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='contactmessage',
+            name='last_submitted_at',
+            field=models.DateTimeField(blank=True, help_text='Time of the most recent identical submission', null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='contactmessage',
+            constraint=models.UniqueConstraint(condition=models.Q(('fingerprint', ''), _negated=True), fields=('fingerprint',), name='unique_contact_message_fingerprint'),
+        ),
+    ]
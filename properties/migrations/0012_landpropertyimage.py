@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-19 03:01
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_contactmessage_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LandPropertyImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('image', models.ImageField(help_text='Gallery image', upload_to='land_properties/gallery/')),
+                ('caption', models.CharField(blank=True, help_text='Optional caption', max_length=200)),
+                ('is_cover', models.BooleanField(default=False, help_text='Show on listing cards instead of the project image')),
+                ('order', models.PositiveIntegerField(default=0, help_text='Display order (lower numbers first)')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('land_property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='images', to='properties.landproperty')),
+            ],
+            options={
+                'verbose_name': 'Land Property Image',
+                'verbose_name_plural': 'Land Property Images',
+                'ordering': ['order', 'created_at'],
+                'indexes': [models.Index(fields=['land_property', 'is_cover'], name='properties__land_pr_de62f0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+# Paths under land-properties/ that would shadow a project page (as
+# properties.models.RESERVED_SLUGS was when this migration was written)
+RESERVED_SLUGS = {'autocomplete'}
+
+
+def fill_slugs(apps, schema_editor):
+    LandProperty = apps.get_model('properties', 'LandProperty')
+    taken = set()
+    changed = []
+    for land_property in LandProperty.objects.order_by('created_at', 'pk').only('pk', 'name'):
+        base = slugify(land_property.name)[:200] or 'project'
+        slug, number = base, 2
+        while slug in RESERVED_SLUGS or slug in taken:
+            slug = f'{base}-{number}'
+            number += 1
+        taken.add(slug)
+        land_property.slug = slug
+        changed.append(land_property)
+    LandProperty.objects.bulk_update(changed, ['slug'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_landpropertyimage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landproperty',
+            name='slug',
+            field=models.SlugField(max_length=220, null=True, help_text='URL of the project page, set from the name'),
+        ),
+        migrations.RunPython(fill_slugs, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='landproperty',
+            name='slug',
+            field=models.SlugField(max_length=220, unique=True, help_text='URL of the project page, set from the name'),
+        ),
+    ]
@@ -0,0 +1,109 @@
+import re
+import unicodedata
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+# Copied from properties.search and properties.fuzzy_search as they were
+# when this migration was written, so later changes there cannot break it
+WORD_RE = re.compile(r'[^\W_]+')
+
+PLACE_ALIASES = {
+    'chittagong': ['chattogram', 'chottogram', 'ctg'],
+    'comilla': ['cumilla', 'kumilla'],
+    'barisal': ['barishal'],
+    'bogra': ['bogura'],
+    'jessore': ['jashore'],
+    'dhaka': ['dacca', 'dhacca'],
+    'sylhet': ['silet', 'sylet'],
+    'mymensingh': ['moymonsingh', 'mymenshingh'],
+    'narsingdi': ['narsinghdi', 'narshingdi'],
+    'gazipur': ['gajipur'],
+    'lakshmipur': ['laxmipur', 'lokkhipur'],
+    'netrokona': ['netrakona'],
+    'jhalokati': ['jhalakathi', 'jhalokathi'],
+    'khagrachhari': ['khagrachari'],
+    'moulvibazar': ['maulvibazar', 'moulvi bazar'],
+    'coxs bazar': ['coxsbazar', 'cox bazar'],
+    'bashundhara': ['basundhara', 'bosundhora'],
+    'purbachal': ['purbachol'],
+    'kaliakair': ['kaliakoir'],
+}
+
+SPELLING_FOLDS = [
+    (re.compile(r'gonj\b'), 'ganj'),
+]
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text).replace("'", '').replace('\u2019', '')
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+
+def get_alias_patterns():
+    aliases = {**PLACE_ALIASES, **getattr(settings, 'SEARCH_PLACE_ALIASES', {})}
+    variants = {variant: canonical for canonical, spellings in aliases.items() for variant in spellings}
+    return [
+        (re.compile(rf'\b{re.escape(variant)}\b'), canonical)
+        for variant, canonical in sorted(variants.items(), key=lambda item: -len(item[0]))
+    ]
+
+
+def build_search_text(land_property, alias_patterns):
+    text = normalize(' '.join([
+        land_property.name,
+        land_property.location,
+        land_property.district,
+        land_property.area_name,
+    ]))
+    for pattern, replacement in SPELLING_FOLDS:
+        text = pattern.sub(replacement, text)
+    for pattern, canonical in alias_patterns:
+        text = pattern.sub(canonical, text)
+    return ' '.join(dict.fromkeys(text.split()))
+
+
+def fill_search_text(apps, schema_editor):
+    LandProperty = apps.get_model('properties', 'LandProperty')
+    alias_patterns = get_alias_patterns()
+    changed = []
+    for land_property in LandProperty.objects.only('pk', 'name', 'location', 'district', 'area_name'):
+        land_property.search_text = build_search_text(land_property, alias_patterns)
+        changed.append(land_property)
+    LandProperty.objects.bulk_update(changed, ['search_text'], batch_size=1000)
+
+
+def create_trigram_index(apps, schema_editor):
+    # pg_trgm and its GIN operator class only exist on PostgreSQL; elsewhere
+    # the in-process matcher reads the column directly
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS properties_landproperty_search_trgm '
+        'ON properties_landproperty USING gin (search_text gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS properties_landproperty_search_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0013_landproperty_slug'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landproperty',
+            name='search_text',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(fill_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
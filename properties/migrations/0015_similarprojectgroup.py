@@ -0,0 +1,25 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0014_landproperty_search_text'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarProjectGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('division', models.CharField(choices=[('dhaka', 'Dhaka'), ('chittagong', 'Chittagong'), ('rajshahi', 'Rajshahi'), ('khulna', 'Khulna'), ('barisal', 'Barisal'), ('sylhet', 'Sylhet'), ('rangpur', 'Rangpur'), ('mymensingh', 'Mymensingh')], max_length=20)),
+                ('property_type', models.CharField(choices=[('residential', 'Residential'), ('commercial', 'Commercial'), ('mixed', 'Mixed Use')], max_length=20)),
+                ('projects', models.JSONField(default=list)),
+            ],
+            options={
+                'verbose_name': 'Similar Project Group',
+                'verbose_name_plural': 'Similar Project Groups',
+                'constraints': [models.UniqueConstraint(fields=('division', 'property_type'), name='unique_similar_project_group')],
+            },
+        ),
+    ]
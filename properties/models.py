@@ -1,8 +1,19 @@
-from django.db import models
+import hashlib
+import re
+
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, OuterRef, Prefetch, Q, Subquery
+from django.urls import reverse
 from django.utils import timezone
-from django.db.models.signals import pre_delete
+from django.utils.text import slugify
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
 from django.dispatch import receiver
 from .image_utils import delete_image_file
+from .cache_utils import bump_cache_version
+from .cache_tags import land_property_group_tag, land_property_list_tag, land_property_tag, purge_cache_tags
+from . import search, snapshot
+from .fuzzy_search import build_search_text
 
 
 class CompanyInfo(models.Model):
@@ -53,6 +64,22 @@ class NavbarImage(models.Model):
         super().save(*args, **kwargs)
 
 
+@receiver(post_save, sender=CompanyInfo)
+@receiver(post_delete, sender=CompanyInfo)
+def invalidate_company_info_cache(sender, **kwargs):
+    """Expire cached footer fragments when company information changes"""
+    bump_cache_version('company_info')
+    purge_cache_tags(['company-info'])
+
+
+@receiver(post_save, sender=NavbarImage)
+@receiver(post_delete, sender=NavbarImage)
+def invalidate_navbar_cache(sender, instance, **kwargs):
+    """Expire cached navbar images and fragments when a navbar image changes"""
+    bump_cache_version('navbar')
+    purge_cache_tags([f'navbar-{instance.image_type}'])
+
+
 class CarouselSlide(models.Model):
     title = models.CharField(max_length=200, help_text="Main title of the slide")
     description = models.TextField(help_text="Detailed description")
@@ -84,6 +111,14 @@ def delete_carousel_slide_image(sender, instance, **kwargs):
         delete_image_file(instance.image.path)
 
 
+@receiver(post_save, sender=CarouselSlide)
+@receiver(post_delete, sender=CarouselSlide)
+def invalidate_carousel_cache(sender, **kwargs):
+    """Expire the cached hero image used for preload hints when a slide changes"""
+    bump_cache_version('carousel')
+    purge_cache_tags(['carousel'])
+
+
 class LandProperty(models.Model):
     PROJECT_STATUS = [
         ('ongoing', 'On Going'),
@@ -109,6 +144,7 @@ class LandProperty(models.Model):
     ]
     
     name = models.CharField(max_length=200, help_text="Project name")
+    slug = models.SlugField(max_length=220, unique=True, help_text="URL of the project page, set from the name")
     area = models.CharField(max_length=100, help_text="Area in katha/bigha")
     location = models.CharField(max_length=300, help_text="Full location address")
     division = models.CharField(max_length=20, choices=DIVISIONS, default='dhaka')
@@ -124,6 +160,9 @@ class LandProperty(models.Model):
     amenities = models.TextField(blank=True, help_text="Available amenities")
     is_featured = models.BooleanField(default=False, help_text="Featured project")
     is_active = models.BooleanField(default=True, help_text="Active project")
+    # Name and location fields with place-name variants folded (see fuzzy_search.py),
+    # matched by the public search; GIN trigram-indexed on PostgreSQL
+    search_text = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -131,6 +170,295 @@ class LandProperty(models.Model):
         ordering = ['-created_at']
         verbose_name = "Land Property"
         verbose_name_plural = "Land Properties"
+    
+    def __str__(self):
+        return self.name
+    
+    def save(self, *args, **kwargs):
+        # Slugs are kept when a project is renamed so links keep working
+        if not self.slug:
+            self.slug = unique_slug(self.name)
+        self.search_text = build_search_text(self)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & {'name', 'location', 'district', 'area_name'}:
+            kwargs['update_fields'] = {*update_fields, 'search_text'}
+        super().save(*args, **kwargs)
+    
+    def get_absolute_url(self):
+        return reverse('land_property_detail', args=[self.slug])
+    
+    @property
+    def cover_image(self):
+        """
+        Image shown on listing cards: the gallery cover when one was loaded
+        with cover_image_prefetch(), otherwise the project image
+        """
+        covers = getattr(self, 'cover_images', None)
+        if covers:
+            return covers[0].image
+        return self.image
+
+
+class LandPropertyImage(models.Model):
+    """Additional photo of a land project, shown in its gallery"""
+    land_property = models.ForeignKey(LandProperty, on_delete=models.CASCADE, related_name='images')
+    image = models.ImageField(upload_to='land_properties/gallery/', help_text="Gallery image")
+    caption = models.CharField(max_length=200, blank=True, help_text="Optional caption")
+    is_cover = models.BooleanField(default=False, help_text="Show on listing cards instead of the project image")
+    order = models.PositiveIntegerField(default=0, help_text="Display order (lower numbers first)")
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['order', 'created_at']
+        indexes = [models.Index(fields=['land_property', 'is_cover'])]
+        verbose_name = "Land Property Image"
+        verbose_name_plural = "Land Property Images"
+    
+    def __str__(self):
+        return f"{self.land_property} image {self.order}"
+    
+    def save(self, *args, **kwargs):
+        # A project has at most one cover
+        if self.is_cover:
+            LandPropertyImage.objects.filter(
+                land_property_id=self.land_property_id,
+                is_cover=True
+            ).exclude(pk=self.pk).update(is_cover=False)
+        super().save(*args, **kwargs)
+
+
+class SimilarProjectGroup(models.Model):
+    """
+    Summaries of the first active projects (featured, then newest) of one
+    division and type, stored once for the similar-project cards of every
+    project in the group. Kept up to date by refresh_similar_projects().
+    """
+    division = models.CharField(max_length=20, choices=LandProperty.DIVISIONS)
+    property_type = models.CharField(max_length=20, choices=LandProperty.PROPERTY_TYPE)
+    projects = models.JSONField(default=list)
+    
+    class Meta:
+        verbose_name = "Similar Project Group"
+        verbose_name_plural = "Similar Project Groups"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['division', 'property_type'],
+                name='unique_similar_project_group',
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.division} {self.property_type}"
+
+
+# Paths under land-properties/ that would shadow a project page
+RESERVED_SLUGS = {'autocomplete'}
+
+
+def unique_slug(name, taken=None):
+    """
+    Slug for a new project, numbered when another project already has it.
+    `taken` is an optional set of slugs in use, updated in place, so bulk
+    imports can avoid a query per row.
+    """
+    base = slugify(name)[:200] or 'project'
+    slug, number = base, 2
+    while slug in RESERVED_SLUGS or ((slug in taken) if taken is not None else LandProperty.objects.filter(slug=slug).exists()):
+        slug = f'{base}-{number}'
+        number += 1
+    if taken is not None:
+        taken.add(slug)
+    return slug
+
+
+def cover_image_prefetch():
+    """
+    Prefetch only the cover photo of each project into `cover_images`, so
+    listings cost one extra query however large the galleries are
+    """
+    return Prefetch(
+        'images',
+        queryset=LandPropertyImage.objects.filter(is_cover=True),
+        to_attr='cover_images',
+    )
+
+
+SIMILAR_PROJECTS_COUNT = 4
+
+
+def similar_project_summary(land_property):
+    """What a similar-project card shows, so detail pages need no query for it"""
+    image = land_property.cover_image
+    return {
+        'pk': land_property.pk,
+        'slug': land_property.slug,
+        'name': land_property.name,
+        'image': image.name if image else '',
+        'area': land_property.area,
+        'area_name': land_property.area_name,
+        'district': land_property.district,
+    }
+
+
+def refresh_similar_projects(division, property_type):
+    """
+    Recompute the similar projects of one division and type: the group's
+    first active projects (featured, then newest), one more than a card
+    list shows so every project still has a full list once it leaves
+    itself out. A single row is written however large the group is, and
+    the group's project pages are purged from the front cache.
+    """
+    top = (
+        LandProperty.objects.filter(division=division, property_type=property_type, is_active=True)
+        .order_by('-is_featured', '-created_at')
+        .prefetch_related(cover_image_prefetch())[:SIMILAR_PROJECTS_COUNT + 1]
+    )
+    projects = [similar_project_summary(land_property) for land_property in top]
+    SimilarProjectGroup.objects.update_or_create(
+        division=division, property_type=property_type, defaults={'projects': projects}
+    )
+    purge_cache_tags([land_property_group_tag(division, property_type)])
+    return projects
+
+
+def similar_projects_subquery():
+    """Annotation loading a project's group list along with the project itself"""
+    return Subquery(
+        SimilarProjectGroup.objects.filter(division=OuterRef('division'), property_type=OuterRef('property_type'))
+        .values('projects')[:1]
+    )
+
+
+def get_similar_projects(land_property, projects=None):
+    """
+    Similar-project cards of a project, from its group's stored list
+    (`projects` when loaded with similar_projects_subquery()). Groups never computed, e.g. after a
+    bulk import that sent no signals, are computed on first use.
+    """
+    if projects is None:
+        projects = (
+            SimilarProjectGroup.objects.filter(division=land_property.division, property_type=land_property.property_type)
+            .values_list('projects', flat=True).first()
+        )
+    if projects is None:
+        projects = refresh_similar_projects(land_property.division, land_property.property_type)
+    return [item for item in projects if item['pk'] != land_property.pk][:SIMILAR_PROJECTS_COUNT]
+
+
+def refresh_all_similar_projects():
+    """Recompute every group, e.g. after bulk imports that sent no signals"""
+    groups = LandProperty.objects.values_list('division', 'property_type').distinct()
+    for division, property_type in list(groups):
+        refresh_similar_projects(division, property_type)
+
+
+@receiver(post_save, sender=LandProperty)
+@receiver(post_delete, sender=LandProperty)
+def invalidate_land_property_cache(sender, instance, **kwargs):
+    """Expire cached pages that list land properties"""
+    bump_cache_version('land_properties')
+    purge_cache_tags([
+        land_property_tag(instance.pk),
+        land_property_list_tag(),
+        land_property_list_tag(instance.division),
+        land_property_list_tag(getattr(instance, '_previous_division', None)),
+    ])
+
+
+@receiver(pre_save, sender=LandProperty)
+def remember_land_property_division(sender, instance, **kwargs):
+    """
+    Keep the stored listing fields so the pages it was listed on get
+    rebuilt and purged, and its old group's similar projects refreshed, too
+    """
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).only(*snapshot.LISTING_FIELDS.values()).first()
+        if previous:
+            instance._previous_division, instance._previous_property_type = previous.division, previous.property_type
+            instance._previous_listing = snapshot.listing_values(previous)
+
+
+@receiver(post_save, sender=LandProperty)
+@receiver(post_delete, sender=LandProperty)
+def refresh_land_property_similar_projects(sender, instance, **kwargs):
+    """Recompute the similar-project lists of the project's group (and its old group after a move)"""
+    groups = {
+        (instance.division, instance.property_type),
+        (getattr(instance, '_previous_division', instance.division), getattr(instance, '_previous_property_type', instance.property_type)),
+    }
+    for division, property_type in groups:
+        refresh_similar_projects(division, property_type)
+
+
+@receiver(post_save, sender=LandProperty)
+@receiver(post_delete, sender=LandProperty)
+def invalidate_search_index(sender, **kwargs):
+    """Have every worker rebuild its autocomplete index once the change is committed"""
+    transaction.on_commit(lambda: bump_cache_version(search.INDEX_VERSION))
+
+
+@receiver(post_save, sender=LandProperty)
+@receiver(post_delete, sender=LandProperty)
+def regenerate_land_property_snapshot(sender, instance, **kwargs):
+    """Re-render only the static snapshot pages that can list this property, before or after the change"""
+    rows = [snapshot.listing_values(instance)]
+    previous = getattr(instance, '_previous_listing', None)
+    if previous and previous != rows[0]:
+        rows.append(previous)
+    snapshot.schedule_regeneration(rows)
+
+
+@receiver(post_save, sender=CompanyInfo)
+@receiver(post_delete, sender=CompanyInfo)
+@receiver(post_save, sender=NavbarImage)
+@receiver(post_delete, sender=NavbarImage)
+@receiver(post_save, sender=CarouselSlide)
+@receiver(post_delete, sender=CarouselSlide)
+def regenerate_snapshot(sender, **kwargs):
+    """The navbar, footer and carousel appear on every page, so rebuild the whole snapshot"""
+    snapshot.schedule_regeneration()
+
+
+@receiver(pre_delete, sender=LandPropertyImage)
+def delete_land_property_image_file(sender, instance, **kwargs):
+    """Delete the image file when a gallery image is deleted"""
+    if instance.image:
+        delete_image_file(instance.image.path)
+
+
+@receiver(post_save, sender=LandPropertyImage)
+@receiver(post_delete, sender=LandPropertyImage)
+def invalidate_land_property_gallery(sender, instance, **kwargs):
+    """A gallery change can change the listing cover, so expire the project as an edit would"""
+    origin = kwargs.get('origin')
+    if isinstance(origin, LandProperty) or getattr(origin, 'model', None) is LandProperty:
+        # The images are cascading from a deleted project, whose own receivers expire it once
+        return
+    land_property = LandProperty.objects.filter(pk=instance.land_property_id).first()
+    if land_property is not None:
+        land_property_gallery_changed(land_property)
+
+
+def land_property_gallery_changed(land_property):
+    """
+    Expire everything showing the project's photos. updated_at is bumped
+    without save() so the cached detail fragment (keyed on it) is rebuilt.
+    """
+    LandProperty.objects.filter(pk=land_property.pk).update(updated_at=timezone.now())
+    invalidate_land_property_cache(LandProperty, land_property)
+    regenerate_land_property_snapshot(LandProperty, land_property)
+    refresh_similar_projects(land_property.division, land_property.property_type)
+
+
+def land_property_images_bulk_created(land_property):
+    """bulk_create() sends no post_save, so expire what the LandPropertyImage receivers would"""
+    land_property_gallery_changed(land_property)
+
+
+def carousel_slides_bulk_created():
+    """bulk_create() sends no post_save, so expire what the CarouselSlide receivers would"""
+    invalidate_carousel_cache(CarouselSlide)
+    regenerate_snapshot(CarouselSlide)
 
 
 class ContactMessage(models.Model):
@@ -168,6 +496,9 @@ class ContactMessage(models.Model):
     newsletter_subscription = models.BooleanField(default=False)
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='new')
     ip_address = models.GenericIPAddressField(blank=True, null=True)
+    fingerprint = models.CharField(max_length=64, blank=True, editable=False, help_text="Hash of normalized email, phone, message and time window")
+    duplicate_count = models.PositiveIntegerField(default=0, help_text="Number of identical resubmissions collapsed into this message")
+    last_submitted_at = models.DateTimeField(blank=True, null=True, help_text="Time of the most recent identical submission")
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -175,10 +506,57 @@ class ContactMessage(models.Model):
         ordering = ['-created_at']
         verbose_name = "Contact Message"
         verbose_name_plural = "Contact Messages"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['fingerprint'],
+                condition=~Q(fingerprint=''),
+                name='unique_contact_message_fingerprint',
+            ),
+        ]
     
     def __str__(self):
         return f"{self.first_name} {self.last_name} - {self.email}"
     
+    @staticmethod
+    def compute_fingerprint(email, phone, message, when=None):
+        """
+        Build the duplicate-detection fingerprint for a submission.
+        The time window index is part of the hash, so identical submissions
+        only collide within the same CONTACT_DUPLICATE_WINDOW.
+        """
+        window = getattr(settings, 'CONTACT_DUPLICATE_WINDOW', 60 * 60 * 24)
+        when = when or timezone.now()
+        normalized = '\x1f'.join([
+            email.strip().lower(),
+            re.sub(r'\D', '', phone),
+            ' '.join(message.lower().split()),
+            str(int(when.timestamp()) // window),
+        ])
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    @classmethod
+    def record_submission(cls, **fields):
+        """
+        Save a contact form submission, collapsing repeats of the same
+        fingerprint into a counter on the original row.
+        
+        Returns:
+            tuple: (ContactMessage or None, created)
+        """
+        now = timezone.now()
+        fingerprint = cls.compute_fingerprint(
+            fields.get('email', ''), fields.get('phone', ''), fields.get('message', ''), now
+        )
+        try:
+            with transaction.atomic():
+                return cls.objects.create(fingerprint=fingerprint, last_submitted_at=now, **fields), True
+        except IntegrityError:
+            cls.objects.filter(fingerprint=fingerprint).update(
+                duplicate_count=F('duplicate_count') + 1,
+                last_submitted_at=now,
+            )
+            return None, False
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
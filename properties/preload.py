@@ -0,0 +1,97 @@
+from asgiref.sync import sync_to_async
+from django.urls import Resolver404, resolve
+
+from .cache_utils import get_hero_image, get_navbar_images
+from .image_cache import resized_url
+
+
+# Public pages rendered from base.html (and so showing the navbar logo)
+PRELOAD_VIEW_MODULE = 'properties.views'
+# Pages whose largest contentful paint is the first carousel slide
+HERO_VIEWS = ('home',)
+
+
+def get_preload_links(match):
+    """
+    Link header values for the critical images of a resolved view: the
+    navbar logo on every public page plus the first carousel slide on the
+    home page. Image URLs come from the cached chrome data, so this costs no
+    queries on a warm cache. The URLs and srcset are exactly the ones the
+    templates use, otherwise the browser would fetch the image twice.
+    """
+    if match is None or match.func.__module__ != PRELOAD_VIEW_MODULE:
+        return []
+
+    links = []
+    if match.url_name in HERO_VIEWS:
+        hero = get_hero_image()
+        if hero:
+            links.append(
+                f'<{hero["url"]}>; rel=preload; as=image; fetchpriority=high; '
+                f'imagesrcset="{hero["srcset"]}"; imagesizes="100vw"'
+            )
+    logo = get_navbar_images().get('logo')
+    if logo:
+        links.append(f"<{resized_url(logo.image, 128, 128, 'contain')}>; rel=preload; as=image")
+    return links
+
+
+def get_preload_links_for_path(path):
+    try:
+        match = resolve(path)
+    except Resolver404:
+        return []
+    return get_preload_links(match)
+
+
+class PreloadMiddleware:
+    """
+    Add `Link: rel=preload` headers for critical images to successful HTML
+    responses. CDNs such as Cloudflare also turn these headers into 103 Early
+    Hints for later requests, which covers WSGI servers like gunicorn that
+    cannot send informational responses themselves.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            request.method != 'GET'
+            or response.status_code != 200
+            or not response.get('Content-Type', '').startswith('text/html')
+        ):
+            return response
+
+        links = get_preload_links(getattr(request, 'resolver_match', None))
+        if links:
+            existing = response.get('Link')
+            response['Link'] = ', '.join([existing, *links] if existing else links)
+        return response
+
+
+class EarlyHintsMiddleware:
+    """
+    ASGI middleware that sends a 103 Early Hints response with the same
+    preload links before Django starts rendering. Only servers advertising
+    the `http.response.early_hint` ASGI extension (e.g. Hypercorn) get hints;
+    everywhere else this is a pass-through.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope['type'] == 'http'
+            and scope['method'] == 'GET'
+            and 'http.response.early_hint' in scope.get('extensions', {})
+        ):
+            links = await sync_to_async(get_preload_links_for_path)(scope['path'])
+            if links:
+                await send({
+                    'type': 'http.response.early_hint',
+                    'links': [link.encode('latin-1') for link in links],
+                })
+        await self.app(scope, receive, send)
@@ -0,0 +1,204 @@
+import cProfile
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+PROFILE_SIGNING_SALT = 'properties.profiling'
+
+
+def get_profile_dir():
+    return str(getattr(settings, 'PROFILE_DIR', os.path.join(settings.BASE_DIR, 'profiles')))
+
+
+def get_profile_max_files():
+    return getattr(settings, 'PROFILE_MAX_FILES', 500)
+
+
+def make_profile_token():
+    """Signed value for the X-Profile header that forces a request to be profiled"""
+    return signing.TimestampSigner(salt=PROFILE_SIGNING_SALT).sign('profile')
+
+
+def is_valid_profile_token(token):
+    max_age = getattr(settings, 'PROFILE_TOKEN_MAX_AGE', 60 * 60 * 24)
+    try:
+        return signing.TimestampSigner(salt=PROFILE_SIGNING_SALT).unsign(token, max_age=max_age) == 'profile'
+    except signing.BadSignature:
+        return False
+
+
+def format_frame(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})'
+
+
+class StackSampler:
+    """
+    Sample the stack of one thread at a fixed interval from a helper thread
+    and count identical stacks, producing collapsed-stack (flamegraph) data.
+    """
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(format_frame(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return ''.join(f'{stack} {count}\n' for stack, count in self.stacks.most_common())
+
+
+def cprofile_collapsed(profiler):
+    """
+    Approximate collapsed stacks from cProfile caller/callee data: each
+    caller;callee edge is weighted by the callee's inline time in
+    milliseconds when called from that caller, so a function called from
+    several places is counted once in total.
+    """
+    profiler.create_stats()
+    lines = []
+    for (filename, lineno, name), (cc, nc, tt, ct, callers) in profiler.stats.items():
+        callee = f'{name} ({os.path.basename(filename)}:{lineno})'
+        if not callers:
+            weight = int(tt * 1000)
+            if weight:
+                lines.append(f'{callee} {weight}')
+        for (c_filename, c_lineno, c_name), edge in callers.items():
+            # edge is (cc, nc, tt, ct) of the calls from this caller
+            weight = int(edge[2] * 1000)
+            if weight:
+                lines.append(f'{c_name} ({os.path.basename(c_filename)}:{c_lineno});{callee} {weight}')
+    return '\n'.join(lines) + '\n'
+
+
+def write_profile(view_name, mode, duration, collapsed):
+    """Write collapsed-stack output to PROFILE_DIR/<view_name>/"""
+    directory = os.path.join(get_profile_dir(), view_name)
+    os.makedirs(directory, exist_ok=True)
+    stamp = timezone.now().strftime('%Y%m%d-%H%M%S-%f')
+    filename = f'{stamp}-{os.getpid()}-{mode}-{int(duration * 1000)}ms.collapsed'
+    with open(os.path.join(directory, filename), 'w') as f:
+        f.write(collapsed)
+    prune_profiles()
+
+
+def prune_profiles():
+    """Delete all but the newest PROFILE_MAX_FILES profiles"""
+    for profile in list_profiles()[get_profile_max_files():]:
+        try:
+            os.remove(os.path.join(get_profile_dir(), profile['view_name'], profile['filename']))
+        except OSError:
+            # Another worker pruned it first
+            pass
+
+
+def list_profiles():
+    """Return saved profiles, newest first"""
+    profile_dir = get_profile_dir()
+    profiles = []
+    if not os.path.isdir(profile_dir):
+        return profiles
+    for view_name in os.listdir(profile_dir):
+        directory = os.path.join(profile_dir, view_name)
+        if not os.path.isdir(directory):
+            continue
+        for filename in os.listdir(directory):
+            if not filename.endswith('.collapsed'):
+                continue
+            path = os.path.join(directory, filename)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                # Pruned by another worker since the listing
+                continue
+            profiles.append({
+                'view_name': view_name,
+                'filename': filename,
+                'size': stat.st_size,
+                'modified': datetime.fromtimestamp(stat.st_mtime, tz=timezone.get_current_timezone()),
+            })
+    return sorted(profiles, key=lambda profile: profile['modified'], reverse=True)
+
+
+def get_profile_path(view_name, filename):
+    """Resolve a saved profile path, refusing anything outside PROFILE_DIR"""
+    profile_dir = os.path.realpath(get_profile_dir())
+    path = os.path.realpath(os.path.join(profile_dir, view_name, filename))
+    if not path.startswith(profile_dir + os.sep) or not path.endswith('.collapsed') or not os.path.isfile(path):
+        return None
+    return path
+
+
+class ProfilingMiddleware:
+    """
+    Profile a PROFILE_SAMPLE_RATE fraction of requests, plus any request with
+    a valid signed X-Profile header. Requests that are not sampled only pay
+    for one random() call and a header lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'PROFILE_SAMPLE_RATE', 0.0)
+        self.mode = getattr(settings, 'PROFILE_MODE', 'sampler')
+        self.interval = getattr(settings, 'PROFILE_SAMPLER_INTERVAL', 0.005)
+
+    def __call__(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        sampled = (self.sample_rate and random.random() < self.sample_rate) or (token and is_valid_profile_token(token))
+        if not sampled:
+            return self.get_response(request)
+
+        start = time.perf_counter()
+        if self.mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profiler.disable()
+            collapsed = cprofile_collapsed(profiler)
+        else:
+            sampler = StackSampler(threading.get_ident(), self.interval)
+            sampler.start()
+            try:
+                response = self.get_response(request)
+            finally:
+                sampler.stop()
+            collapsed = sampler.collapsed()
+        duration = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        view_name = f'{match.func.__module__}.{match.func.__name__}' if match else 'unresolved'
+        try:
+            write_profile(view_name, self.mode, duration, collapsed)
+        except OSError as e:
+            print(f"Error writing profile: {str(e)}")
+        return response
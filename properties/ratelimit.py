@@ -0,0 +1,233 @@
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+from .cache_utils import SingleFlight
+
+
+DEFAULT_RATE_LIMIT = {
+    'RATE': 5,              # tokens refilled per PERIOD for a single client IP
+    'BURST': 10,            # bucket capacity for a single client IP
+    'GLOBAL_RATE': 120,     # tokens refilled per PERIOD across all clients
+    'GLOBAL_BURST': 240,    # bucket capacity across all clients
+    'PERIOD': 60,           # seconds
+    'SHARDS': 16,           # number of independently locked shards
+    'MAX_BUCKETS': 10000,   # idle buckets beyond this are evicted (LRU)
+    'BACKEND': 'memory',    # 'memory' (per process) or 'cache' (shared across workers)
+    'CACHE_ALIAS': 'default',
+}
+
+# How long a cache-backed consume() waits for its bucket's lock, and how long
+# a lock left by a dead worker lasts (seconds)
+BUCKET_LOCK_WAIT = 1
+BUCKET_LOCK_TIMEOUT = 5
+
+
+def get_rate_limit_settings():
+    """Return the rate limit settings merged over the defaults"""
+    config = dict(DEFAULT_RATE_LIMIT)
+    config.update(getattr(settings, 'RATE_LIMIT', {}))
+    return config
+
+
+class TokenBucket:
+    """A token bucket that refills continuously at `rate` tokens per second"""
+    __slots__ = ('tokens', 'updated')
+
+    def __init__(self, capacity, now):
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def consume(self, rate, capacity, now):
+        self.tokens = min(capacity, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class MemoryBucketTable:
+    """
+    In-process bucket table split into shards so concurrent threads only
+    contend on the lock of the shard their key hashes to. Each shard is an
+    OrderedDict kept in least-recently-used order so idle buckets are evicted
+    once the shard is full.
+    """
+
+    def __init__(self, shards=16, max_buckets=10000):
+        self.shard_count = max(1, shards)
+        self.shard_size = max(1, max_buckets // self.shard_count)
+        self.shards = [OrderedDict() for _ in range(self.shard_count)]
+        self.locks = [threading.Lock() for _ in range(self.shard_count)]
+        self.evictions = 0
+
+    def consume(self, key, rate, capacity):
+        index = zlib.crc32(key.encode()) % self.shard_count
+        shard = self.shards[index]
+        now = time.monotonic()
+        with self.locks[index]:
+            bucket = shard.get(key)
+            if bucket is None:
+                bucket = TokenBucket(capacity, now)
+                shard[key] = bucket
+                if len(shard) > self.shard_size:
+                    shard.popitem(last=False)
+                    self.evictions += 1
+            else:
+                shard.move_to_end(key)
+            return bucket.consume(rate, capacity, now)
+
+    def __len__(self):
+        return sum(len(shard) for shard in self.shards)
+
+    def clear(self):
+        for index, shard in enumerate(self.shards):
+            with self.locks[index]:
+                shard.clear()
+
+
+class CacheBucketTable:
+    """
+    Bucket table stored in a Django cache so every gunicorn worker shares the
+    same limits. Buckets expire from the cache once they would be full again,
+    which keeps idle clients from occupying space.
+
+    Reading and rewriting a bucket is not atomic, so each consume() holds a
+    SingleFlight lock on the bucket; otherwise concurrent requests in
+    different workers could all read the same token count and all pass.
+    """
+
+    def __init__(self, alias='default'):
+        self.cache = caches[alias]
+        self.evictions = 0
+
+    def consume(self, key, rate, capacity):
+        cache_key = f'ratelimit:{key}'
+        flight = SingleFlight(cache_key, BUCKET_LOCK_TIMEOUT)
+        if not flight.acquire(wait=BUCKET_LOCK_WAIT):
+            # Only a flood of requests for this bucket keeps it locked this long
+            return False
+        try:
+            now = time.time()
+            tokens, updated = self.cache.get(cache_key, (float(capacity), now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            timeout = int((capacity - tokens) / rate) + 1 if rate else None
+            self.cache.set(cache_key, (tokens, now), timeout)
+            return allowed
+        finally:
+            flight.release()
+
+    def __len__(self):
+        return 0
+
+    def clear(self):
+        pass
+
+
+class RateLimiter:
+    """Per-client and global token bucket limiter"""
+
+    def __init__(self, config=None):
+        self.config = config or get_rate_limit_settings()
+        period = float(self.config['PERIOD'])
+        self.rate = self.config['RATE'] / period
+        self.burst = self.config['BURST']
+        self.global_rate = self.config['GLOBAL_RATE'] / period
+        self.global_burst = self.config['GLOBAL_BURST']
+        if self.config['BACKEND'] == 'cache':
+            self.table = CacheBucketTable(self.config['CACHE_ALIAS'])
+        else:
+            self.table = MemoryBucketTable(self.config['SHARDS'], self.config['MAX_BUCKETS'])
+        self.stats_lock = threading.Lock()
+        self.stats = {'allowed': 0, 'rejected_client': 0, 'rejected_global': 0}
+
+    def allow(self, scope, client_key):
+        """Consume a token for the client and the scope; return the reason if rejected"""
+        if not self.table.consume(f'{scope}:ip:{client_key}', self.rate, self.burst):
+            self._count('rejected_client')
+            return 'client'
+        if not self.table.consume(f'{scope}:global', self.global_rate, self.global_burst):
+            self._count('rejected_global')
+            return 'global'
+        self._count('allowed')
+        return None
+
+    def _count(self, name):
+        with self.stats_lock:
+            self.stats[name] += 1
+
+    def get_stats(self):
+        with self.stats_lock:
+            stats = dict(self.stats)
+        stats['buckets'] = len(self.table)
+        stats['evictions'] = self.table.evictions
+        return stats
+
+    def reset(self):
+        self.table.clear()
+        with self.stats_lock:
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter():
+    """Return the process-wide rate limiter, creating it on first use"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
+
+
+def get_rate_limit_stats():
+    """Return counters for allowed and rejected requests in this process"""
+    return get_limiter().get_stats()
+
+
+def rate_limit(key_func, scope=None, methods=('POST',), json_response=False):
+    """
+    Decorator that rejects requests with a 429 once the client IP or the
+    global bucket for the view is empty. The check runs before the view,
+    so rejected requests never touch the database.
+
+    Args:
+        key_func: Callable returning the client key (IP) for a request
+        scope: Bucket namespace (default: the view function name)
+        methods: HTTP methods that consume tokens
+        json_response: Return the 429 in the JSON shape used by AJAX views
+    """
+    def decorator(view_func):
+        bucket_scope = scope or view_func.__name__
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method in methods:
+                limiter = get_limiter()
+                reason = limiter.allow(bucket_scope, key_func(request) or 'unknown')
+                if reason:
+                    retry_after = str(int(limiter.config['PERIOD'] / max(limiter.config['RATE'], 1)) or 1)
+                    message = 'Too many requests. Please try again later.'
+                    if json_response:
+                        response = JsonResponse({'success': False, 'errors': [message]}, status=429)
+                    else:
+                        response = HttpResponse(message, status=429, content_type='text/plain')
+                    response['Retry-After'] = retry_after
+                    return response
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+import heapq
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.urls import reverse
+
+from .cache_utils import get_cache_version
+
+
+# Bumped (on commit) whenever a LandProperty is saved or deleted
+INDEX_VERSION = 'search_index'
+# Indexed text is cut to this many characters, and queries with it
+MAX_KEY_LENGTH = 48
+# Prefixes matching more keys than this get their top suggestions precomputed,
+# so a lookup never ranks more than this many keys
+SCAN_LIMIT = 64
+MAX_LIMIT = 10
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+
+def get_autocomplete_limit():
+    return min(getattr(settings, 'AUTOCOMPLETE_LIMIT', 8), MAX_LIMIT)
+
+
+def normalize(text):
+    """Lowercase words of `text` separated by single spaces ("Cox's Bazar" -> "coxs bazar")"""
+    text = unicodedata.normalize('NFKC', text).replace("'", '').replace('’', '')
+    return ' '.join(WORD_RE.findall(text.casefold()))
+
+
+def word_suffixes(text):
+    """Keys for `text`: every tail starting at a word, so any word (or run of words) can be typed first"""
+    words = normalize(text).split(' ')
+    return {' '.join(words[i:])[:MAX_KEY_LENGTH] for i in range(len(words)) if words[i]}
+
+
+class PrefixIndex:
+    """
+    Immutable autocomplete index: a sorted array of keys, each pointing to
+    a suggestion. Suggestion ids are their rank (featured projects first,
+    then newest), so the best matches for a prefix are the smallest ids in
+    its bisected key range. Prefixes too common to scan quickly map straight
+    to their top ids.
+    """
+
+    def __init__(self, suggestions):
+        self.suggestions = suggestions
+        pairs = sorted({(key, i) for i, (label, _, _) in enumerate(suggestions) for key in word_suffixes(label)})
+        self.keys = [key for key, _ in pairs]
+        self.ids = [i for _, i in pairs]
+        self.popular = {}
+        self.precompute()
+
+    def precompute(self):
+        """
+        Walk the implicit trie over the sorted keys, recording the top ids
+        of every prefix whose range is wider than SCAN_LIMIT. Each stack
+        entry is a range of keys sharing their first `depth` characters.
+        """
+        stack = [(0, len(self.keys), 0)]
+        while stack:
+            lo, hi, depth = stack.pop()
+            if hi - lo <= SCAN_LIMIT:
+                continue
+            if depth:
+                self.popular[self.keys[lo][:depth]] = tuple(heapq.nsmallest(MAX_LIMIT, set(self.ids[lo:hi])))
+            # Keys ending here sort first and have no longer prefixes
+            start = lo
+            while start < hi and len(self.keys[start]) == depth:
+                start += 1
+            while start < hi:
+                char = self.keys[start][depth]
+                end = bisect_left(self.keys, self.keys[start][:depth] + chr(ord(char) + 1), start, hi)
+                stack.append((start, end, depth + 1))
+                start = end
+
+    def lookup(self, query, limit):
+        prefix = normalize(query)[:MAX_KEY_LENGTH]
+        if not prefix:
+            return []
+        top = self.popular.get(prefix)
+        if top is None:
+            lo = bisect_left(self.keys, prefix)
+            hi = bisect_left(self.keys, prefix + '\U0010ffff', lo)
+            top = heapq.nsmallest(limit, set(self.ids[lo:hi]))
+        return [self.suggestions[i] for i in top[:limit]]
+
+    def __len__(self):
+        return len(self.suggestions)
+
+
+def build_suggestions():
+    """
+    Suggestions for every active project: the project itself plus its
+    location, district and area, each place listed once and ranked by the
+    best project found there. Items are (label, type, url).
+    """
+    from .models import LandProperty
+
+    listing_url = reverse('land_properties')
+    # Reversed once; resolving the URL for every project dominated the build
+    detail_url = reverse('land_property_detail', args=['__slug__'])
+    rows = (
+        LandProperty.objects.filter(is_active=True)
+        .order_by('-is_featured', '-created_at', 'pk')
+        .values_list('name', 'slug', 'location', 'district', 'area_name')
+    )
+    suggestions = []
+    seen = set()
+    for name, slug, location, district, area_name in rows:
+        # Rows arrive best first, so each suggestion is ranked by its best project
+        suggestions.append((name.strip(), 'project', detail_url.replace('__slug__', slug)))
+        for label, kind, param in ((area_name, 'area', 'area'), (district, 'district', 'district'), (location, 'location', 'search')):
+            label = label.strip()
+            identity = (kind, normalize(label))
+            if not label or identity in seen:
+                continue
+            seen.add(identity)
+            suggestions.append((label, kind, f'{listing_url}?{urlencode({param: label})}'))
+    return suggestions
+
+
+class WorkerIndex:
+    """
+    An index built from the database and kept in this worker's memory. The
+    first call to get() builds it; after a project changes (and
+    INDEX_VERSION moves) the old index keeps answering while a background
+    thread builds the new one.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.index = None
+        self.version = None
+        self.lock = threading.Lock()
+        self.rebuilding = False
+
+    def get(self):
+        version = get_cache_version(INDEX_VERSION)
+        if self.index is None:
+            with self.lock:
+                if self.index is None:
+                    self.index, self.version = self.build(), version
+                return self.index
+        if self.version != version and not self.rebuilding:
+            with self.lock:
+                if not self.rebuilding and self.version != version:
+                    self.rebuilding = True
+                    threading.Thread(target=self.rebuild, args=(version,), daemon=True).start()
+        return self.index
+
+    def rebuild(self, version):
+        try:
+            self.index, self.version = self.build(), version
+        except Exception as e:
+            print(f"Error rebuilding search index: {str(e)}")
+        finally:
+            self.rebuilding = False
+            connections.close_all()
+
+
+def build_index():
+    return PrefixIndex(build_suggestions())
+
+
+autocomplete_index = WorkerIndex(build_index)
+
+
+def get_search_index():
+    return autocomplete_index.get()
+
+
+def warm_search_index():
+    """Build the in-memory indexes as the worker starts, unless the database is not ready yet"""
+    from .fuzzy_search import get_search_engine
+
+    try:
+        get_search_index()
+        get_search_engine().warm()
+    except DatabaseError as e:
+        print(f"Search index not built at startup: {str(e)}")
+
+
+def autocomplete(query, limit=None):
+    return get_search_index().lookup(query, limit or get_autocomplete_limit())
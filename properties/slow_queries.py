@@ -0,0 +1,304 @@
+import glob
+import json
+import os
+import re
+import threading
+import time
+import traceback
+from collections import OrderedDict, deque
+from datetime import datetime
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .metrics import is_process_running, write_json
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:\?|%s)\s*,?)+\)', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# Instrumentation modules that wrap queries and should never be reported as call sites
+_IGNORED_FILES = tuple(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+    for name in ('slow_queries.py', 'metrics.py', 'middleware.py')
+)
+
+# Written by clear(): logs of other workers recorded before it are dropped
+CLEARED_FILE = 'cleared'
+
+
+def normalize_sql(sql):
+    """Replace literals and parameter lists so equivalent queries share a fingerprint"""
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def find_call_site():
+    """Return 'path:line in function' for the innermost frame of project code"""
+    base_dir = str(settings.BASE_DIR)
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        filename = os.path.abspath(frame.filename)
+        if filename.startswith(base_dir) and filename not in _IGNORED_FILES and 'site-packages' not in filename:
+            return f'{os.path.relpath(filename, base_dir)}:{frame.lineno} in {frame.name}'
+    return 'unknown'
+
+
+def get_slow_query_dir():
+    return getattr(settings, 'SLOW_QUERY_DIR', None)
+
+
+class SlowQueryLog:
+    """
+    Bounded, per-process log of queries slower than SLOW_QUERY_THRESHOLD_MS.
+
+    `entries` keeps one aggregate per normalized SQL fingerprint (least recently
+    seen evicted first) and `recent` is a ring buffer of individual occurrences.
+    Each worker writes its log to SLOW_QUERY_DIR at most once per
+    SLOW_QUERY_FLUSH_INTERVAL, and collect_slow_queries() merges them.
+    """
+
+    def __init__(self, size=200):
+        self.size = size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+        self.recent = deque(maxlen=size)
+        self.cleared_at = time.time()
+        self.last_flush = 0.0
+        self.flush_pending_pid = None
+
+    def record(self, sql, params, duration, explain=True):
+        fingerprint = normalize_sql(sql)
+        call_site = find_call_site()
+        now = timezone.now()
+        self.sync_cleared()
+        with self.lock:
+            entry = self.entries.get(fingerprint)
+            is_new = entry is None
+            if is_new:
+                entry = self.entries[fingerprint] = {
+                    'fingerprint': fingerprint,
+                    'sample_sql': sql,
+                    'count': 0,
+                    'total_time': 0.0,
+                    'max_time': 0.0,
+                    'call_sites': {},
+                    'explain': '',
+                    'first_seen': now,
+                }
+                if len(self.entries) > self.size:
+                    self.entries.popitem(last=False)
+            else:
+                self.entries.move_to_end(fingerprint)
+            entry['count'] += 1
+            entry['total_time'] += duration
+            entry['max_time'] = max(entry['max_time'], duration)
+            entry['last_seen'] = now
+            entry['call_sites'][call_site] = entry['call_sites'].get(call_site, 0) + 1
+            self.recent.append({
+                'fingerprint': fingerprint,
+                'duration': duration,
+                'call_site': call_site,
+                'timestamp': now,
+            })
+        if is_new and explain:
+            # Capture the plan outside the lock; only the first occurrence pays for it
+            entry['explain'] = explain_query(sql, params)
+        self.schedule_flush()
+
+    def clear(self):
+        """Empty the log of every worker"""
+        self.clear_local(time.time())
+        slow_query_dir = get_slow_query_dir()
+        if slow_query_dir:
+            try:
+                write_json(os.path.join(slow_query_dir, CLEARED_FILE), self.cleared_at)
+                for path in glob.glob(os.path.join(slow_query_dir, 'worker-*.json')):
+                    os.remove(path)
+            except OSError as e:
+                print(f"Error clearing slow query logs: {str(e)}")
+
+    def clear_local(self, cleared_at):
+        with self.lock:
+            self.entries.clear()
+            self.recent.clear()
+            self.cleared_at = cleared_at
+
+    def sync_cleared(self):
+        """Apply a clear() made by another worker since this one last checked"""
+        cleared_at = read_cleared_at()
+        if cleared_at > self.cleared_at:
+            self.clear_local(cleared_at)
+
+    def schedule_flush(self):
+        """Write the log to SLOW_QUERY_DIR soon, at most once per SLOW_QUERY_FLUSH_INTERVAL"""
+        if not get_slow_query_dir():
+            return
+        with self.lock:
+            # Timers do not survive a fork, so a pending flush only counts in its own process
+            if self.flush_pending_pid == os.getpid():
+                return
+            self.flush_pending_pid = os.getpid()
+            delay = self.last_flush + getattr(settings, 'SLOW_QUERY_FLUSH_INTERVAL', 1) - time.monotonic()
+        timer = threading.Timer(max(delay, 0.0), self.flush)
+        timer.daemon = True
+        timer.start()
+
+    def flush(self):
+        with self.lock:
+            self.flush_pending_pid = None
+            self.last_flush = time.monotonic()
+            data = {
+                'cleared_at': self.cleared_at,
+                'entries': [dump_times(entry, ('first_seen', 'last_seen')) for entry in self.entries.values()],
+                'recent': [dump_times(query, ('timestamp',)) for query in self.recent],
+            }
+        slow_query_dir = get_slow_query_dir()
+        try:
+            os.makedirs(slow_query_dir, exist_ok=True)
+            write_json(os.path.join(slow_query_dir, f'worker-{os.getpid()}.json'), data)
+        except OSError as e:
+            print(f"Error writing slow query log: {str(e)}")
+
+
+def dump_times(item, fields):
+    return dict(item, **{field: item[field].isoformat() for field in fields if field in item})
+
+
+def load_times(item, fields):
+    return dict(item, **{field: datetime.fromisoformat(item[field]) for field in fields if field in item})
+
+
+def read_cleared_at():
+    slow_query_dir = get_slow_query_dir()
+    if not slow_query_dir:
+        return 0.0
+    try:
+        with open(os.path.join(slow_query_dir, CLEARED_FILE)) as f:
+            return float(json.load(f))
+    except (OSError, ValueError):
+        return 0.0
+
+
+def merge_entry(merged, entry):
+    """Add one worker's aggregate for a fingerprint into `merged`, in place"""
+    total = merged.get(entry['fingerprint'])
+    if total is None:
+        merged[entry['fingerprint']] = dict(entry, call_sites=dict(entry['call_sites']))
+        return
+    total['count'] += entry['count']
+    total['total_time'] += entry['total_time']
+    total['max_time'] = max(total['max_time'], entry['max_time'])
+    total['first_seen'] = min(total['first_seen'], entry['first_seen'])
+    total['last_seen'] = max(total['last_seen'], entry['last_seen'])
+    total['explain'] = total['explain'] or entry['explain']
+    for call_site, count in entry['call_sites'].items():
+        total['call_sites'][call_site] = total['call_sites'].get(call_site, 0) + count
+
+
+def collect_slow_queries():
+    """
+    Merge the logs of every worker (and this process), like /metrics.
+    Returns (entries by total time, recent queries newest first, workers).
+    Logs of workers that exited are deleted.
+    """
+    slow_query_log.sync_cleared()
+    with slow_query_log.lock:
+        logs = {os.getpid(): {
+            'entries': [dict(entry) for entry in slow_query_log.entries.values()],
+            'recent': list(slow_query_log.recent),
+        }}
+    slow_query_dir = get_slow_query_dir()
+    cleared_at = read_cleared_at()
+    for path in glob.glob(os.path.join(slow_query_dir, 'worker-*.json')) if slow_query_dir else []:
+        try:
+            pid = int(os.path.basename(path)[len('worker-'):-len('.json')])
+            if pid == os.getpid():
+                continue
+            if not is_process_running(pid):
+                os.remove(path)
+                continue
+            with open(path) as f:
+                data = json.load(f)
+            if data['cleared_at'] < cleared_at:
+                # Written before the last clear(); the worker drops it on its next slow query
+                continue
+            logs[pid] = {
+                'entries': [load_times(entry, ('first_seen', 'last_seen')) for entry in data['entries']],
+                'recent': [load_times(query, ('timestamp',)) for query in data['recent']],
+            }
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error reading slow query log {path}: {str(e)}")
+
+    merged = {}
+    recent = []
+    for log in logs.values():
+        for entry in log['entries']:
+            merge_entry(merged, entry)
+        recent += log['recent']
+    entries = list(merged.values())
+    for entry in entries:
+        entry['avg_time'] = entry['total_time'] / entry['count']
+        entry['call_sites'] = sorted(entry['call_sites'].items(), key=lambda item: -item[1])
+    entries.sort(key=lambda entry: -entry['total_time'])
+    recent.sort(key=lambda query: query['timestamp'], reverse=True)
+    return entries, recent, len(logs)
+
+
+slow_query_log = SlowQueryLog(getattr(settings, 'SLOW_QUERY_LOG_SIZE', 200))
+_local = threading.local()
+
+
+def explain_query(sql, params):
+    """Run EXPLAIN for a SELECT and return the plan as text"""
+    if not sql.lstrip().upper().startswith('SELECT'):
+        return ''
+    prefix = 'EXPLAIN QUERY PLAN' if connection.vendor == 'sqlite' else 'EXPLAIN'
+    _local.explaining = True
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f'{prefix} {sql}', params)
+            return '\n'.join(' '.join(str(col) for col in row) for row in cursor.fetchall())
+    except Exception as e:
+        return f'EXPLAIN failed: {str(e)}'
+    finally:
+        _local.explaining = False
+
+
+class SlowQueryRecorder:
+    """Connection execute wrapper that feeds queries over the threshold into the log"""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, 'explaining', False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        failed = True
+        try:
+            result = execute(sql, params, many, context)
+            failed = False
+            return result
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold:
+                # After an error the transaction may be aborted, so no EXPLAIN on this connection
+                slow_query_log.record(sql, None if many else params, duration, explain=not (many or failed))
+
+
+class SlowQueryMiddleware:
+    """Wrap every request's queries with the slow query recorder"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.recorder = SlowQueryRecorder(getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100) / 1000.0)
+
+    def __call__(self, request):
+        with connection.execute_wrapper(self.recorder):
+            return self.get_response(request)
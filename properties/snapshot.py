@@ -0,0 +1,577 @@
+import fcntl
+import hashlib
+import json
+import math
+import os
+import shutil
+import socket
+import threading
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import Resolver404, resolve, reverse
+from django.utils import timezone
+
+from .cache_tags import add_cache_tags, get_cache_tag_header
+
+
+# Query parameters the listing facets produce; any other parameter (including
+# the free-text search) means the request is served live
+LISTING_PARAMS = ('status', 'type', 'division', 'district', 'area', 'view', 'page')
+LISTING_PAGE_SIZE = 6
+
+# Cookies that mean the visitor may see something personal (flash messages, admin session)
+LIVE_COOKIES = ('sessionid', 'messages')
+
+# Each page's cache tags are kept next to it, in a file with this suffix
+TAGS_SUFFIX = '.tags'
+
+# Shared cache key naming the one host allowed to serve snapshots
+SNAPSHOT_HOST_KEY = 'snapshot_host'
+
+
+def is_enabled():
+    return getattr(settings, 'SNAPSHOT_ENABLED', False)
+
+
+def get_snapshot_dir():
+    return str(getattr(settings, 'SNAPSHOT_DIR', os.path.join(settings.BASE_DIR, 'snapshot')))
+
+
+def normalize_query(params):
+    """
+    Canonical query for a listing URL: empty values and defaults dropped,
+    keys sorted. Returns None if the query cannot have a snapshot.
+    """
+    items = {}
+    for key, value in params.items():
+        if not value:
+            # e.g. the search box submitted empty along with a facet
+            continue
+        if key not in LISTING_PARAMS:
+            return None
+        if not (key == 'view' and value == 'paginated') and not (key == 'page' and value == '1'):
+            items[key] = value
+    return urlencode(sorted(items.items()))
+
+
+def get_snapshot_file(path, query=''):
+    """Relative file name of the snapshot for a URL path and normalized query"""
+    directory = path.strip('/')
+    if not query:
+        filename = 'index.html'
+    elif len(query) > 200:
+        filename = f'index@{hashlib.md5(query.encode()).hexdigest()}.html'
+    else:
+        filename = f'index@{query}.html'
+    return os.path.join(directory, filename)
+
+
+def parse_snapshot_query(filename):
+    """Inverse of get_snapshot_file() for listing pages; None for hashed names"""
+    if filename == 'index.html':
+        return {}
+    if filename.startswith('index@') and filename.endswith('.html') and len(filename) < 220:
+        return dict(parse_qsl(filename[len('index@'):-len('.html')]))
+    return None
+
+
+def get_snapshot_max_pages():
+    """Upper bound on the listing pages one export renders"""
+    return getattr(settings, 'SNAPSHOT_MAX_PAGES', 2000)
+
+
+def get_snapshot_pages_per_listing():
+    """Pages rendered per facet combination; deeper pages are served live"""
+    return getattr(settings, 'SNAPSHOT_PAGES_PER_LISTING', 5)
+
+
+def listing_counts(location):
+    """Active properties in a location by (status, type), with '' counting any value"""
+    counts = Counter()
+    rows = filter_listing(location).values_list('project_status', 'property_type').annotate(total=Count('pk')).order_by()
+    for status, property_type, total in rows:
+        for status_filter in ('', status):
+            for type_filter in ('', property_type):
+                counts[status_filter, type_filter] += total
+    return counts
+
+
+def get_location_urls(locations, max_pages=None, combinations=None):
+    """
+    Listing URLs for each location (a dict of division/district/area
+    filters) combined with every status and type that has results (or only
+    the (status, type) pairs in `combinations`), up to
+    SNAPSHOT_PAGES_PER_LISTING pages each and `max_pages` overall. Empty
+    combinations and the view-all variant are served live.
+    """
+    path = reverse('land_properties')
+    pages_per_listing = get_snapshot_pages_per_listing()
+    urls = []
+    for location in locations:
+        counts = listing_counts(location)
+        for (status, property_type), count in sorted(counts.items()):
+            if combinations is not None and (status, property_type) not in combinations:
+                continue
+            filters = dict(location, status=status, type=property_type)
+            for page in range(1, min(math.ceil(count / LISTING_PAGE_SIZE), pages_per_listing) + 1):
+                if max_pages is not None and len(urls) >= max_pages:
+                    return urls
+                urls.append((path, normalize_query(dict(filters, page=str(page)))))
+    return urls
+
+
+def get_listing_urls(divisions=None):
+    """
+    Snapshot URLs of the listing facets: each status and type combined with
+    no location, every division, and every district and area that active
+    properties use, broadest first so SNAPSHOT_MAX_PAGES keeps the busiest
+    pages. With `divisions`, only combinations without a division filter
+    or with one of those divisions.
+    """
+    from .models import LandProperty
+
+    locations = [{}]
+    all_divisions = [code for code, _ in LandProperty.DIVISIONS]
+    divisions = all_divisions if divisions is None else [code for code in all_divisions if code in divisions]
+    districts = set()
+    areas = set()
+    rows = LandProperty.objects.filter(is_active=True, division__in=divisions).values_list('division', 'district', 'area_name')
+    for row_division, district, area in rows.distinct():
+        if district:
+            districts.add((row_division, district))
+            if area:
+                areas.add((row_division, district, area))
+    locations += [{'division': code} for code in divisions]
+    locations += [{'division': d, 'district': dist} for d, dist in sorted(districts)]
+    locations += [{'division': d, 'district': dist, 'area': area} for d, dist, area in sorted(areas)]
+    return get_location_urls(locations, get_snapshot_max_pages())
+
+
+def filter_listing(filters):
+    """The queryset the land_properties view shows for a set of facet filters"""
+    from .models import LandProperty
+
+    queryset = LandProperty.objects.filter(is_active=True)
+    if filters.get('status'):
+        queryset = queryset.filter(project_status=filters['status'])
+    if filters.get('type'):
+        queryset = queryset.filter(property_type=filters['type'])
+    if filters.get('division'):
+        queryset = queryset.filter(division=filters['division'])
+    if filters.get('district'):
+        queryset = queryset.filter(district__icontains=filters['district'])
+    if filters.get('area'):
+        queryset = queryset.filter(area_name__icontains=filters['area'])
+    return queryset
+
+
+def get_public_urls():
+    """Public pages other than the listing"""
+    return [(reverse('home'), ''), (reverse('contact'), '')]
+
+
+def render_url(path, query):
+    """
+    Render a public URL without middleware, as an anonymous visitor would
+    see it. Returns (content, cache tags), or None if it is not a 200.
+    """
+    request = RequestFactory().get(path, QUERY_STRING=query)
+    request.user = AnonymousUser()
+    request.static_snapshot = True
+    match = resolve(path)
+    request.resolver_match = match
+    # Skip the page cache so the snapshot never captures a stale copy
+    view = getattr(match.func, '__wrapped__', match.func)
+    response = view(request, *match.args, **match.kwargs)
+    if response.status_code != 200:
+        return None
+    return response.content, response.get(get_cache_tag_header(), '')
+
+
+def write_atomic(root, relative_path, content):
+    """Write a file via a temporary name and rename, so readers never see a partial page"""
+    path = os.path.join(root, relative_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def render_pages(root, urls, stdout=None):
+    written = 0
+    for path, query in urls:
+        page = render_url(path, query)
+        if page is None:
+            continue
+        content, tags = page
+        relative_path = get_snapshot_file(path, query)
+        write_atomic(root, relative_path + TAGS_SUFFIX, tags.encode())
+        write_atomic(root, relative_path, content)
+        written += 1
+        if stdout is not None and written % 500 == 0:
+            stdout.write(f'  {written} pages rendered')
+    return written
+
+
+def export_snapshot(stdout=None):
+    """
+    Render every public URL into a new directory, then atomically point the
+    SNAPSHOT_DIR symlink at it and remove the previous build.
+    """
+    snapshot_dir = os.path.abspath(get_snapshot_dir())
+    parent = os.path.dirname(snapshot_dir)
+    build_dir = f"{snapshot_dir}-{timezone.now().strftime('%Y%m%d%H%M%S%f')}"
+    os.makedirs(build_dir)
+    try:
+        written = render_pages(build_dir, get_public_urls() + get_listing_urls(), stdout)
+    except Exception:
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    previous = os.path.realpath(snapshot_dir) if os.path.islink(snapshot_dir) else None
+    if os.path.isdir(snapshot_dir) and not os.path.islink(snapshot_dir):
+        shutil.rmtree(snapshot_dir)
+    link_tmp = f'{snapshot_dir}.{os.getpid()}.link'
+    os.symlink(os.path.basename(build_dir), link_tmp)
+    os.replace(link_tmp, snapshot_dir)
+    if previous and previous != build_dir and os.path.dirname(previous) == parent:
+        shutil.rmtree(previous, ignore_errors=True)
+    return written
+
+
+def regenerate_for_divisions(divisions):
+    """
+    Re-render home, contact and the listing pages that can include a
+    property from these divisions, leaving every other page untouched.
+    """
+    root = get_snapshot_dir()
+    if not os.path.isdir(root):
+        return 0
+    listing_urls = get_listing_urls(divisions)
+    written = render_pages(root, get_public_urls() + listing_urls)
+
+    # Remove affected pages that no longer exist (e.g. past the new last
+    # page), so they are served live instead of from an outdated snapshot
+    listing_path = reverse('land_properties')
+    current = {get_snapshot_file(path, query) for path, query in listing_urls}
+    listing_dir = os.path.join(root, listing_path.strip('/'))
+    for filename in os.listdir(listing_dir) if os.path.isdir(listing_dir) else []:
+        query = parse_snapshot_query(filename)
+        relative_path = get_snapshot_file(listing_path, normalize_query(query)) if query is not None else None
+        if relative_path and relative_path not in current and query.get('division', '') in ('', *divisions):
+            remove_page(os.path.join(listing_dir, filename))
+    return written
+
+
+def remove_page(path):
+    """Delete a snapshot page and its cache tags, if they exist"""
+    for page_path in (path, path + TAGS_SUFFIX):
+        try:
+            os.remove(page_path)
+        except OSError:
+            pass
+
+
+# Listing query parameters and the LandProperty fields they filter on
+LISTING_FIELDS = {
+    'division': 'division',
+    'district': 'district',
+    'area': 'area_name',
+    'status': 'project_status',
+    'type': 'property_type',
+}
+
+
+def get_snapshot_queue_dir():
+    """Where web workers leave regeneration jobs for the SnapshotRegenerator"""
+    return str(getattr(settings, 'SNAPSHOT_QUEUE_DIR', f'{get_snapshot_dir().rstrip(os.sep)}-queue'))
+
+
+def listing_values(land_property):
+    """The facet values a property is listed under, by query parameter"""
+    return {param: getattr(land_property, field) or '' for param, field in LISTING_FIELDS.items()}
+
+
+def listing_includes(query, row):
+    """Whether the listing for these facet filters can show a property with these listing_values()"""
+    for param, value in query.items():
+        if param in ('division', 'status', 'type') and value != row[param]:
+            return False
+        # district and area are icontains filters in the view
+        if param in ('district', 'area') and value.lower() not in row[param].lower():
+            return False
+    return True
+
+
+def get_row_urls(rows):
+    """
+    Listing URLs that can show any of these properties: the four locations
+    containing each one (none, division, district, area), each with any
+    or its own status and any or its own type
+    """
+    urls = []
+    for row in rows:
+        locations = [
+            {},
+            {'division': row['division']},
+            {'division': row['division'], 'district': row['district']},
+            {'division': row['division'], 'district': row['district'], 'area': row['area']},
+        ]
+        combinations = {(status, property_type) for status in ('', row['status']) for property_type in ('', row['type'])}
+        urls += get_location_urls(locations, combinations=combinations)
+    return list(dict.fromkeys(urls))
+
+
+def expire_pages(rows):
+    """
+    Delete the home page and every listing snapshot that can show these
+    properties, so they are served live until the SnapshotRegenerator has
+    re-rendered them. Only file names are read, so this is cheap enough for
+    the request that saved the property.
+    """
+    root = get_snapshot_dir()
+    listing_dir = os.path.join(root, reverse('land_properties').strip('/'))
+    paths = [os.path.join(root, get_snapshot_file(reverse('home')))]
+    for filename in os.listdir(listing_dir) if os.path.isdir(listing_dir) else []:
+        query = parse_snapshot_query(filename)
+        if query is not None and any(listing_includes(query, row) for row in rows):
+            paths.append(os.path.join(listing_dir, filename))
+    for path in paths:
+        remove_page(path)
+
+
+def regenerate_for_rows(rows):
+    """Re-render home, contact and the listing pages that can show these properties"""
+    root = get_snapshot_dir()
+    if not os.path.isdir(root):
+        return 0
+    return render_pages(root, get_public_urls() + get_row_urls(rows))
+
+
+def schedule_regeneration(rows=None):
+    """
+    Once the current transaction commits, expire the snapshot pages that
+    can show these properties (listing_values() dicts, before and after the
+    change) and queue their re-rendering by the SnapshotRegenerator. None
+    queues a full rebuild; pages are not expired then, since only the
+    shared navbar, footer or carousel changed.
+    """
+    if not is_enabled():
+        return
+
+    def enqueue():
+        if rows is not None:
+            expire_pages(rows)
+        job = json.dumps({'full': rows is None, 'rows': rows or []}).encode()
+        write_atomic(get_snapshot_queue_dir(), f'{time.time_ns()}-{uuid.uuid4().hex}.json', job)
+        regenerator.wakeup.set()
+
+    transaction.on_commit(enqueue)
+
+
+def process_queue():
+    """
+    Run every queued job, merged: one full export if any job asks for it,
+    otherwise one pass over the affected pages. Returns the pages written,
+    or None if the queue was empty.
+    """
+    queue_dir = get_snapshot_queue_dir()
+    names = sorted(name for name in os.listdir(queue_dir) if name.endswith('.json')) if os.path.isdir(queue_dir) else []
+    if not names:
+        return None
+
+    full = False
+    rows = {}
+    for name in names:
+        try:
+            with open(os.path.join(queue_dir, name)) as f:
+                job = json.load(f)
+        except (OSError, ValueError):
+            continue
+        full = full or job['full']
+        for row in job['rows']:
+            rows[tuple(sorted(row.items()))] = row
+
+    written = export_snapshot() if full else regenerate_for_rows(list(rows.values()))
+    # Jobs queued while rendering stay for the next pass
+    for name in names:
+        try:
+            os.remove(os.path.join(queue_dir, name))
+        except OSError:
+            pass
+    return written
+
+
+def get_poll_interval():
+    """Seconds between checks of the queue by each worker's SnapshotRegenerator"""
+    return getattr(settings, 'SNAPSHOT_POLL_INTERVAL', 2)
+
+
+def get_host_lease():
+    """Seconds the serving host keeps its claim after its last refresh"""
+    return getattr(settings, 'SNAPSHOT_HOST_LEASE', 60)
+
+
+def claim_snapshot_host():
+    """
+    Whether this host may serve and regenerate snapshots. SNAPSHOT_DIR and
+    the queue are on local disk, so an edit made on one host cannot expire
+    the pages of another: the first host to take the lease in the shared
+    cache keeps it while it runs, and every other host serves pages live.
+    """
+    shared = getattr(cache, 'shared', cache)
+    host = socket.gethostname()
+    lease = get_host_lease()
+    if shared.add(SNAPSHOT_HOST_KEY, host, lease) or shared.get(SNAPSHOT_HOST_KEY) == host:
+        shared.set(SNAPSHOT_HOST_KEY, host, lease)
+        return True
+    return False
+
+
+def discard_snapshot():
+    """
+    Remove the whole snapshot and queue a full rebuild, for a host that lost
+    the lease: edits made elsewhere meanwhile never expired its pages.
+    """
+    snapshot_dir = os.path.abspath(get_snapshot_dir())
+    if os.path.islink(snapshot_dir):
+        target = os.path.realpath(snapshot_dir)
+        try:
+            os.remove(snapshot_dir)
+        except OSError:
+            return
+        shutil.rmtree(target, ignore_errors=True)
+    elif os.path.isdir(snapshot_dir):
+        shutil.rmtree(snapshot_dir, ignore_errors=True)
+    else:
+        return
+    write_atomic(get_snapshot_queue_dir(), f'{time.time_ns()}-{uuid.uuid4().hex}.json', json.dumps({'full': True, 'rows': []}).encode())
+
+
+class SnapshotRegenerator:
+    """
+    Background thread in every web worker that re-renders the queued pages,
+    woken by schedule_regeneration() and otherwise polling every
+    SNAPSHOT_POLL_INTERVAL seconds for jobs queued by other workers. An
+    flock() on the queue directory lets one worker per host render at a time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pid = None
+        self.is_host = False
+        self.claimed_at = 0.0
+
+    def start(self):
+        # Threads do not survive a fork, so each worker process starts its own
+        with self.lock:
+            if self.pid == os.getpid():
+                return
+            self.pid = os.getpid()
+        self.check_host()
+        threading.Thread(target=self.run, daemon=True).start()
+
+    def check_host(self):
+        """Refresh the lease about three times per SNAPSHOT_HOST_LEASE"""
+        now = time.monotonic()
+        if now - self.claimed_at < get_host_lease() / 3:
+            return
+        self.claimed_at = now
+        self.is_host = claim_snapshot_host()
+        if not self.is_host:
+            discard_snapshot()
+
+    def run(self):
+        while True:
+            self.wakeup.wait(get_poll_interval())
+            self.wakeup.clear()
+            try:
+                self.check_host()
+                if self.is_host:
+                    self.process()
+            except Exception as e:
+                print(f"Error regenerating snapshot: {str(e)}")
+            finally:
+                # This thread's connections, never reused between passes
+                connections.close_all()
+
+    def process(self):
+        queue_dir = get_snapshot_queue_dir()
+        os.makedirs(queue_dir, exist_ok=True)
+        with open(os.path.join(queue_dir, '.lock'), 'a') as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                # Another worker is rendering and will see these jobs on its next pass
+                return
+            start = time.monotonic()
+            written = process_queue()
+            if written is not None:
+                print(f'Wrote {written} snapshot pages in {time.monotonic() - start:.1f}s')
+
+
+regenerator = SnapshotRegenerator()
+
+
+class SnapshotMiddleware:
+    """
+    Serve pre-rendered public pages from SNAPSHOT_DIR to anonymous GET
+    requests. Anything without a snapshot (free-text search, admin pages,
+    visitors with a session or pending messages) falls through to Django,
+    as does everything on a host that does not hold the snapshot lease.
+    A front proxy can serve the same files directly for unfiltered URLs.
+
+    Hits are resolved like any request, so the metrics, preload and cache
+    tag middleware above treat them as the view they were rendered from.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = is_enabled()
+        self.root = get_snapshot_dir()
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+        regenerator.start()
+        if (
+            regenerator.is_host
+            and request.method in ('GET', 'HEAD')
+            and not any(name in request.COOKIES for name in LIVE_COOKIES)
+        ):
+            response = self.serve(request)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request):
+        query = normalize_query(request.GET)
+        if query is None or '..' in request.path_info:
+            return None
+        path = os.path.join(self.root, get_snapshot_file(request.path_info, query))
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+            request.resolver_match = resolve(request.path_info)
+        except (OSError, Resolver404):
+            return None
+        response = HttpResponse(content, content_type='text/html; charset=utf-8')
+        response['X-Snapshot'] = 'hit'
+        try:
+            with open(path + TAGS_SUFFIX) as f:
+                add_cache_tags(response, f.read().split())
+        except OSError:
+            pass
+        return response
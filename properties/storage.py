@@ -0,0 +1,57 @@
+import re
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+# Only the project's own bundles are minified; vendored files (e.g. Django admin) are left untouched
+MINIFY_PREFIXES = ('js/', 'css/')
+
+_CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.S)
+_CSS_WHITESPACE_RE = re.compile(r'\s+')
+_CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+
+
+def minify_js(source):
+    """
+    Conservative JS minification: drop indentation, blank lines and
+    whole-line // comments. Line breaks are kept so automatic semicolon
+    insertion behaves exactly as in the source.
+    """
+    lines = []
+    for line in source.splitlines():
+        line = line.strip()
+        if line and not line.startswith('//'):
+            lines.append(line)
+    return '\n'.join(lines) + '\n'
+
+
+def minify_css(source):
+    """Strip comments and collapse whitespace around CSS punctuation"""
+    source = _CSS_COMMENT_RE.sub('', source)
+    source = _CSS_WHITESPACE_RE.sub(' ', source)
+    source = _CSS_PUNCTUATION_RE.sub(r'\1', source)
+    return source.replace(';}', '}').strip() + '\n'
+
+
+class MinifiedCompressedManifestStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed, gzip/brotli-compressed storage, with the project's
+    JS and CSS bundles minified in place before they are hashed.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name in paths:
+                if name.startswith(MINIFY_PREFIXES) and name.endswith(('.js', '.css')):
+                    self.minify(name)
+                    # Hash the minified copy in STATIC_ROOT rather than the source file
+                    paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def minify(self, name):
+        path = self.path(name)
+        with open(path, encoding='utf-8') as f:
+            source = f.read()
+        minified = minify_js(source) if name.endswith('.js') else minify_css(source)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(minified)
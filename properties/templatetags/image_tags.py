@@ -0,0 +1,34 @@
+from django import template
+
+from properties.image_cache import VARIANT_SETS, resized_url, variant_srcset
+
+
+register = template.Library()
+
+
+@register.simple_tag
+def resized(image, width, height, fit='cover'):
+    """
+    Signed URL of a resized variant, e.g.
+    {% resized land_property.image 640 384 %} or {% resized logo.image 128 128 'contain' %}
+    """
+    if not image:
+        return ''
+    return resized_url(image, width, height, fit)
+
+
+@register.simple_tag
+def resized_variant(image, name):
+    """URL of the largest rendition in a named set, for use as the <img> src"""
+    if not image:
+        return ''
+    width, height = VARIANT_SETS[name][-1]
+    return resized_url(image, width, height)
+
+
+@register.simple_tag
+def srcset(image, name):
+    """srcset of every rendition in a named set, e.g. {% srcset slide.image 'hero' %}"""
+    if not image:
+        return ''
+    return variant_srcset(image, name)
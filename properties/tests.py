@@ -0,0 +1,483 @@
+import cProfile
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from datetime import timedelta
+from unittest import mock, skipIf, skipUnless
+
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from . import fuzzy_search, image_cache, ratelimit
+from .cache_backends import TwoTierCache
+from .cache_utils import SingleFlight, check_single_flight_backend, get_or_compute
+from .fuzzy_search import PostgresTrigramEngine, TrigramMatcher, canonicalize, np
+from .models import ContactMessage, LandProperty
+from .profiling import cprofile_collapsed
+from .search import SCAN_LIMIT, PrefixIndex, normalize, word_suffixes
+from .uploads import get_upload_errors, image_uploads
+
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-default'},
+    'shared': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-shared'},
+}
+
+
+def image_bytes(width, height, image_format='PNG'):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), 'teal').save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def create_land_property(name, **fields):
+    fields = {
+        'area': '5 katha',
+        'location': 'Dhaka',
+        'district': 'Dhaka',
+        'area_name': 'Savar',
+        'description': 'A test project',
+        'image': 'land_properties/test.jpg',
+        **fields,
+    }
+    return LandProperty.objects.create(name=name, **fields)
+
+
+class RateLimiterTests(SimpleTestCase):
+    def make_limiter(self, **config):
+        return ratelimit.RateLimiter(dict(ratelimit.DEFAULT_RATE_LIMIT, **config))
+
+    def test_client_bucket_empties_after_burst(self):
+        limiter = self.make_limiter(RATE=1, BURST=3)
+        results = [limiter.allow('contact', '203.0.113.1') for _ in range(4)]
+        self.assertEqual(results, [None, None, None, 'client'])
+        # Other clients have their own bucket
+        self.assertIsNone(limiter.allow('contact', '203.0.113.2'))
+
+    def test_global_bucket_limits_all_clients(self):
+        limiter = self.make_limiter(GLOBAL_RATE=1, GLOBAL_BURST=2)
+        results = [limiter.allow('contact', f'203.0.113.{i}') for i in range(3)]
+        self.assertEqual(results, [None, None, 'global'])
+        self.assertEqual(limiter.get_stats()['rejected_global'], 1)
+
+    def test_idle_buckets_are_evicted(self):
+        table = ratelimit.MemoryBucketTable(shards=1, max_buckets=2)
+        for i in range(3):
+            table.consume(f'ip:{i}', 1, 1)
+        self.assertEqual(len(table), 2)
+        self.assertEqual(table.evictions, 1)
+
+    @override_settings(CACHES=LOCMEM_CACHES, SINGLE_FLIGHT_CACHE='shared')
+    def test_cache_buckets_admit_burst_under_concurrency(self):
+        table = ratelimit.CacheBucketTable('shared')
+        key = f'test:{uuid.uuid4().hex}'
+        results = []
+
+        def consume():
+            for _ in range(5):
+                results.append(table.consume(key, 0.0001, 10))
+
+        threads = [threading.Thread(target=consume) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sum(results), 10)
+
+    def test_decorator_answers_429_with_retry_after(self):
+        limiter = self.make_limiter(RATE=1, BURST=1)
+        view = ratelimit.rate_limit(lambda request: '203.0.113.1')(lambda request: HttpResponse('ok'))
+        factory = RequestFactory()
+        with mock.patch.object(ratelimit, '_limiter', limiter):
+            self.assertEqual(view(factory.post('/contact/')).status_code, 200)
+            response = view(factory.post('/contact/'))
+            # GETs never consume tokens
+            self.assertEqual(view(factory.get('/contact/')).status_code, 200)
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.has_header('Retry-After'))
+
+
+class ContactFingerprintTests(TestCase):
+    fields = {
+        'first_name': 'Rahim',
+        'last_name': 'Uddin',
+        'email': 'rahim@example.com',
+        'phone': '01711-000000',
+        'message': 'Interested in a 5 katha plot',
+    }
+
+    def setUp(self):
+        ratelimit.get_limiter().reset()
+
+    def test_repeated_submission_is_collapsed(self):
+        first, created = ContactMessage.record_submission(**self.fields)
+        self.assertTrue(created)
+        # Case, spacing and phone punctuation do not make a new submission
+        repeat = dict(self.fields, email='RAHIM@example.com ', phone='01711000000', message='interested in a 5  katha plot')
+        second, created = ContactMessage.record_submission(**repeat)
+        self.assertIsNone(second)
+        self.assertFalse(created)
+        first.refresh_from_db()
+        self.assertEqual(first.duplicate_count, 1)
+        self.assertEqual(ContactMessage.objects.count(), 1)
+
+    def test_different_message_is_kept(self):
+        ContactMessage.record_submission(**self.fields)
+        ContactMessage.record_submission(**dict(self.fields, message='Please call me about Purbachal'))
+        self.assertEqual(ContactMessage.objects.count(), 2)
+
+    @override_settings(CONTACT_DUPLICATE_WINDOW=60)
+    def test_fingerprint_changes_between_windows(self):
+        now = timezone.now()
+        fingerprint = ContactMessage.compute_fingerprint('a@example.com', '1', 'hi', now)
+        self.assertNotEqual(fingerprint, ContactMessage.compute_fingerprint('a@example.com', '1', 'hi', now - timedelta(minutes=2)))
+
+    def test_contact_form_posts_are_collapsed(self):
+        for _ in range(2):
+            response = self.client.post('/contact/', self.fields)
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(ContactMessage.objects.get().duplicate_count, 1)
+
+
+@skipIf(np is None, 'NumPy is not installed')
+class TrigramMatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.matcher = TrigramMatcher([
+            (1, canonicalize('Green Valley Keraniganj Dhaka')),
+            (2, canonicalize('Sea View Chittagong Patenga')),
+            (3, canonicalize('Lake City Keraniganj Dhaka')),
+        ])
+
+    def test_spelling_variants_match(self):
+        self.assertEqual(self.matcher.search(canonicalize('Keranigonj'), 0.5, 10), [1, 3])
+        self.assertEqual(self.matcher.search(canonicalize('Chattogram'), 0.5, 10), [2])
+
+    def test_typo_still_finds_the_project(self):
+        results = self.matcher.search(canonicalize('lake citty'), 0.4, 10)
+        self.assertEqual(results[0], 3)
+
+    def test_threshold_and_limit(self):
+        self.assertEqual(self.matcher.search('zzzz', 0.3, 10), [])
+        self.assertEqual(self.matcher.search(canonicalize('dhaka'), 0.5, 1), [1])
+
+
+@skipIf(np is None, 'NumPy is not installed')
+@override_settings(SEARCH_ENGINE='numpy')
+class NumpySearchEngineTests(TestCase):
+    def setUp(self):
+        # Built from this test's rows on first use
+        fuzzy_search.matcher_index.index = None
+
+    def tearDown(self):
+        fuzzy_search.matcher_index.index = None
+
+    def test_search_finds_variant_spelling(self):
+        wanted = create_land_property('Green Valley', location='Keraniganj, Dhaka', district='Dhaka', area_name='Keraniganj')
+        create_land_property('Sea View', location='Patenga, Chittagong', district='Chittagong', area_name='Patenga', division='chittagong')
+        results = fuzzy_search.search_land_properties(LandProperty.objects.all(), 'keranigonj')
+        self.assertEqual(list(results), [wanted])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'pg_trgm needs PostgreSQL')
+class PostgresTrigramEngineTests(TestCase):
+    def test_search_finds_variant_spelling(self):
+        wanted = create_land_property('Green Valley', location='Keraniganj, Dhaka', district='Dhaka', area_name='Keraniganj')
+        create_land_property('Sea View', location='Patenga, Chittagong', district='Chittagong', area_name='Patenga', division='chittagong')
+        results = PostgresTrigramEngine().search(LandProperty.objects.all(), 'keranigonj')
+        self.assertEqual(list(results), [wanted])
+
+
+class PrefixIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.suggestions = [(f'Project {i} Cox\'s Bazar' if i % 3 else f'Project {i} Savar', 'project', f'/p/{i}/') for i in range(300)]
+        self.index = PrefixIndex(self.suggestions)
+
+    def scan(self, query, limit):
+        prefix = normalize(query)
+        ids = sorted({i for i, (label, _, _) in enumerate(self.suggestions) if any(key.startswith(prefix) for key in word_suffixes(label))})
+        return [self.suggestions[i] for i in ids[:limit]]
+
+    def test_common_prefixes_are_precomputed(self):
+        self.assertGreater(300, SCAN_LIMIT)
+        self.assertIn('project', self.index.popular)
+        self.assertIn('p', self.index.popular)
+
+    def test_lookup_matches_a_full_scan(self):
+        for query in ('p', 'Project', 'project 1', 'project 12', 'coxs', "Cox's Ba", 'bazar', 'savar', 'sav', 'nothing'):
+            with self.subTest(query=query):
+                self.assertEqual(self.index.lookup(query, 10), self.scan(query, 10))
+
+    def test_best_ranked_first_and_limited(self):
+        self.assertEqual([label for label, _, _ in self.index.lookup('savar', 2)], ['Project 0 Savar', 'Project 3 Savar'])
+        self.assertEqual(self.index.lookup('', 10), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    def make_cache(self):
+        # Each name gets its own L1, like a separate worker process
+        return TwoTierCache(f'test-{uuid.uuid4().hex}', {
+            'OPTIONS': {'SHARED_CACHE': 'shared', 'GENERATION_CHECK_INTERVAL': 0},
+        })
+
+    def setUp(self):
+        caches['shared'].clear()
+        self.worker1 = self.make_cache()
+        self.worker2 = self.make_cache()
+
+    def test_writes_reach_other_workers(self):
+        self.worker1.set('key', 'old')
+        self.assertEqual(self.worker2.get('key'), 'old')
+        self.worker1.set('key', 'new')
+        self.assertEqual(self.worker2.get('key'), 'new')
+        self.worker1.delete('key')
+        self.assertIsNone(self.worker2.get('key'))
+
+    def test_sync_drops_only_changed_keys(self):
+        self.worker1.set('a', 1)
+        self.worker1.set('b', 1)
+        self.worker2.get('a')
+        self.worker2.get('b')
+        self.worker1.set('a', 2)
+        self.assertEqual(self.worker2.get('a'), 2)
+        self.assertEqual(self.worker2.get('b'), 1)
+        stats = self.worker2.get_stats()
+        self.assertEqual(stats['invalidations'], 1)
+        self.assertEqual(stats['l1_hits'], 1)
+
+    def test_l1_copy_expires_with_the_value(self):
+        # Regression: L1 kept L2 values for L1_TIMEOUT whatever their TTL
+        self.worker1.set('key', 'value', 0.3)
+        self.assertEqual(self.worker2.get('key'), 'value')
+        time.sleep(0.4)
+        self.assertIsNone(self.worker2.get('key'))
+        self.assertIsNone(self.worker1.get('key'))
+
+    def test_add_over_expired_key_reaches_other_workers(self):
+        self.worker1.set('key', 'first', 0.3)
+        self.worker2.get('key')
+        time.sleep(0.4)
+        self.assertTrue(self.worker1.add('key', 'second'))
+        self.assertEqual(self.worker2.get('key'), 'second')
+
+    def test_incr_keeps_expiry(self):
+        self.worker1.set('count', 1, 0.3)
+        self.assertEqual(self.worker2.incr('count'), 2)
+        self.assertEqual(self.worker1.get('count'), 2)
+        time.sleep(0.4)
+        self.assertIsNone(self.worker1.get('count'))
+        with self.assertRaises(ValueError):
+            self.worker1.incr('count')
+
+
+class SingleFlightTests(SimpleTestCase):
+    def key(self):
+        return f'test:{uuid.uuid4().hex}'
+
+    def test_one_holder_at_a_time(self):
+        key = self.key()
+        first = SingleFlight(key, 5)
+        self.assertTrue(first.acquire())
+        results = []
+        thread = threading.Thread(target=lambda: results.append(SingleFlight(key, 5).acquire()))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [False])
+        first.release()
+        second = SingleFlight(key, 5)
+        self.assertTrue(second.acquire())
+        second.release()
+
+    @override_settings(SINGLE_FLIGHT_CACHE=None)
+    def test_file_locks_exclude_other_holders(self):
+        key = self.key()
+        first = SingleFlight(key, 5)
+        other = SingleFlight(key, 5)
+        # Separate open files conflict like separate processes would
+        self.assertTrue(first._acquire_shared())
+        self.assertFalse(other._acquire_shared())
+        first.lock_file.close()
+        first.lock_file = None
+        self.assertTrue(other._acquire_shared())
+        other.lock_file.close()
+
+    @override_settings(CACHES=LOCMEM_CACHES, SINGLE_FLIGHT_CACHE='shared')
+    def test_cache_locks_exclude_other_holders(self):
+        key = self.key()
+        first = SingleFlight(key, 5)
+        other = SingleFlight(key, 5)
+        self.assertTrue(first._acquire_shared())
+        self.assertFalse(other._acquire_shared())
+
+    @override_settings(CACHES=LOCMEM_CACHES)
+    def test_concurrent_misses_compute_once(self):
+        key = self.key()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(get_or_compute(key, compute, 60))) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['value'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_non_atomic_backend_is_refused(self):
+        file_caches = {
+            'default': LOCMEM_CACHES['default'],
+            'shared': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': tempfile.gettempdir()},
+        }
+        with override_settings(CACHES=file_caches, SINGLE_FLIGHT_CACHE='shared'):
+            with self.assertRaises(ImproperlyConfigured):
+                check_single_flight_backend()
+        with override_settings(CACHES=file_caches, SINGLE_FLIGHT_CACHE=None):
+            check_single_flight_backend()
+
+
+class ImageUploadHandlerTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = {}
+
+        def view(request):
+            self.seen['files'] = request.FILES
+            self.seen['errors'] = get_upload_errors(request)
+            return HttpResponse('ok')
+
+        self.view = image_uploads(view)
+
+    def post(self, upload):
+        request = self.factory.post('/upload/', {'image': upload, 'name': 'Logo'})
+        request._dont_enforce_csrf_checks = True
+        return self.view(request)
+
+    def test_accepts_image_with_hash_and_size(self):
+        content = image_bytes(40, 30)
+        self.assertEqual(self.post(SimpleUploadedFile('logo.png', content, 'image/png')).status_code, 200)
+        upload = self.seen['files']['image']
+        self.assertEqual((upload.image_format, upload.image_size), ('PNG', (40, 30)))
+        self.assertEqual(upload.content_hash, hashlib.sha256(content).hexdigest())
+        self.assertEqual(self.seen['errors'], [])
+
+    def test_rejects_non_images(self):
+        self.post(SimpleUploadedFile('notes.png', b'just some text, not an image at all', 'image/png'))
+        self.assertNotIn('image', self.seen['files'])
+        self.assertIn('notes.png is not a JPEG, PNG, GIF, WebP or AVIF image', self.seen['errors'])
+
+    @override_settings(IMAGE_UPLOAD_MAX_PIXELS=100)
+    def test_rejects_pixel_bombs(self):
+        self.post(SimpleUploadedFile('huge.png', image_bytes(20, 20), 'image/png'))
+        self.assertNotIn('image', self.seen['files'])
+        self.assertIn('huge.png is 20x20 pixels, more than the 100 allowed', self.seen['errors'])
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=100)
+    def test_rejects_oversized_files(self):
+        self.post(SimpleUploadedFile('big.png', image_bytes(200, 200), 'image/png'))
+        self.assertNotIn('image', self.seen['files'])
+        self.assertEqual(len(self.seen['errors']), 1)
+
+    def test_csrf_is_still_checked(self):
+        request = self.factory.post('/upload/', {'image': SimpleUploadedFile('logo.png', image_bytes(4, 4), 'image/png')})
+        self.assertEqual(self.view(request).status_code, 403)
+
+
+class ResizeEndpointTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            RESIZE_CACHE_DIR=os.path.join(self.media_root, 'cache', 'resized'),
+            IMAGE_ENCODER='fixed',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        lru = mock.patch.object(image_cache, '_lru', None)
+        lru.start()
+        self.addCleanup(lru.stop)
+        os.makedirs(os.path.join(self.media_root, 'photos'))
+        with open(os.path.join(self.media_root, 'photos', 'plot.png'), 'wb') as f:
+            f.write(image_bytes(120, 90))
+
+    def test_serves_signed_variant(self):
+        response = self.client.get(image_cache.resized_url('photos/plot.png', 60, 40))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        with Image.open(io.BytesIO(b''.join(response.streaming_content))) as img:
+            self.assertEqual(img.size, (60, 40))
+
+    def test_rejects_bad_signature(self):
+        url = image_cache.resized_url('photos/plot.png', 60, 40)
+        response = self.client.get(url.replace('s=', 's=0'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_outdated_version_is_not_rendered(self):
+        url = image_cache.resized_url('photos/plot.png', 60, 40)
+        path = os.path.join(self.media_root, 'photos', 'plot.png')
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_undecodable_source_is_404(self):
+        with open(os.path.join(self.media_root, 'photos', 'broken.jpg'), 'wb') as f:
+            f.write(b'\xff\xd8\xff\xe0' + b'garbage' * 20)
+        self.assertEqual(self.client.get(image_cache.resized_url('photos/broken.jpg', 60, 40)).status_code, 404)
+
+    def test_decompression_bomb_is_404(self):
+        with mock.patch.object(Image, 'MAX_IMAGE_PIXELS', 1000):
+            self.assertEqual(self.client.get(image_cache.resized_url('photos/plot.png', 60, 40)).status_code, 404)
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def first_caller():
+    spin(0.03)
+
+
+def second_caller():
+    spin(0.03)
+
+
+def third_caller():
+    spin(0.03)
+
+
+class CollapsedStackTests(SimpleTestCase):
+    def test_shared_callee_is_counted_once(self):
+        # Regression: each caller edge carried the callee's total time
+        profiler = cProfile.Profile()
+        profiler.enable()
+        first_caller()
+        second_caller()
+        third_caller()
+        profiler.disable()
+        edges = {}
+        for line in cprofile_collapsed(profiler).splitlines():
+            stack, weight = line.rsplit(' ', 1)
+            if stack.endswith(f'spin (tests.py:{spin.__code__.co_firstlineno})'):
+                edges[stack.split(';')[0].split(' ')[0]] = int(weight)
+        self.assertEqual(set(edges), {'first_caller', 'second_caller', 'third_caller'})
+        for weight in edges.values():
+            self.assertLess(weight, 60)
+        self.assertLess(sum(edges.values()), 150)
@@ -0,0 +1,145 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+from .image_utils import read_image_size, sniff_image_format
+
+
+# Dimensions are read from at most this many leading bytes while streaming;
+# files whose header is longer are measured once complete
+HEADER_BYTES = 256 * 1024
+# Enough leading bytes to recognise every supported format
+SNIFF_BYTES = 32
+
+
+def get_upload_max_bytes():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_BYTES', 10 * 1024 * 1024)
+
+
+def get_upload_max_pixels():
+    return getattr(settings, 'IMAGE_UPLOAD_MAX_PIXELS', 40_000_000)
+
+
+def get_upload_errors(request):
+    """Messages for the files ImageUploadHandler rejected in this request"""
+    return getattr(request, 'upload_errors', [])
+
+
+class ImageUploadHandler(FileUploadHandler):
+    """
+    Stream uploaded images to a temporary file, hashing them on the way.
+
+    The first bytes must match a supported image format and, as soon as the
+    header reveals them, the dimensions must stay within
+    IMAGE_UPLOAD_MAX_PIXELS; files also stop being stored once they pass
+    IMAGE_UPLOAD_MAX_BYTES. A rejected file is skipped: the rest of it is
+    discarded as it arrives, the other form fields are still parsed and the
+    reason is listed in `request.upload_errors`.
+
+    Accepted files are TemporaryUploadedFile instances carrying
+    `content_hash` (SHA-256), `image_format` and `image_size`, so nothing
+    downstream has to read them again to find out what they are.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_bytes = get_upload_max_bytes()
+        self.max_pixels = get_upload_max_pixels()
+        if request is not None:
+            request.upload_errors = []
+
+    def new_file(self, field_name, file_name, content_type, content_length, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.hash = hashlib.sha256()
+        self.header = b''
+        self.image_format = None
+        self.image_size = None
+        if content_length and content_length > self.max_bytes:
+            self.reject(f'is larger than {filesizeformat(self.max_bytes)}')
+
+    def reject(self, reason):
+        if self.request is not None:
+            self.request.upload_errors.append(f'{self.file_name} {reason}')
+        raise SkipFile()
+
+    def check_size(self, size):
+        width, height = size
+        if width * height > self.max_pixels:
+            self.reject(f'is {width}x{height} pixels, more than the {self.max_pixels:,} allowed')
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self.reject(f'is larger than {filesizeformat(self.max_bytes)}')
+
+        if self.image_size is None and len(self.header) < HEADER_BYTES:
+            self.header += raw_data[:HEADER_BYTES - len(self.header)]
+            if self.image_format is None and len(self.header) >= SNIFF_BYTES:
+                self.image_format = sniff_image_format(self.header)
+                if self.image_format is None:
+                    self.reject('is not a JPEG, PNG, GIF, WebP or AVIF image')
+            if self.image_format is not None:
+                self.image_size = read_image_size(self.header, self.image_format)
+                if self.image_size is not None:
+                    self.check_size(self.image_size)
+                    self.header = b''
+
+        self.hash.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        try:
+            # Tiny files never reached SNIFF_BYTES; long headers never revealed the size
+            if self.image_format is None:
+                self.image_format = sniff_image_format(self.header)
+                if self.image_format is None:
+                    self.reject('is not a JPEG, PNG, GIF, WebP or AVIF image')
+            if self.image_size is None:
+                try:
+                    with Image.open(self.file.temporary_file_path()) as img:
+                        self.image_size = img.size
+                except Image.DecompressionBombError:
+                    self.reject(f'has more than the {self.max_pixels:,} pixels allowed')
+                except (OSError, SyntaxError):
+                    self.reject('could not be read as an image')
+                self.check_size(self.image_size)
+        except SkipFile:
+            # The parser only expects SkipFile while data is streaming
+            self.file.close()
+            return None
+
+        self.file.size = file_size
+        self.file.content_hash = self.hash.hexdigest()
+        self.file.image_format = self.image_format
+        self.file.image_size = self.image_size
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            self.file.close()
+
+
+def image_uploads(view):
+    """
+    Parse the view's uploads with ImageUploadHandler alone; other views keep
+    Django's default handlers. The handlers can only be swapped before
+    request.POST is read, which CsrfViewMiddleware does for every POST, so
+    the view is exempt from the middleware and checked here after the swap.
+    """
+    protected = csrf_protect(view)
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        # Not inserted before the defaults: their file_complete() would hand
+        # back an empty file for every upload this handler rejects
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return protected(request, *args, **kwargs)
+
+    return csrf_exempt(wrapped)
@@ -1,9 +1,20 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, metrics, memory, image_cache
 
 urlpatterns = [
     path('', views.home, name='home'),
     path('land-properties/', views.land_properties, name='land_properties'),
+    path('land-properties/autocomplete', views.autocomplete_view, name='autocomplete'),
+    path('land-properties/<int:pk>/', views.land_property_detail_by_id, name='land_property_detail_by_id'),
+    path('land-properties/<slug:slug>/', views.land_property_detail, name='land_property_detail'),
     path('contact/', views.contact, name='contact'),
     path('contact/ajax/', views.contact_ajax, name='contact_ajax'),
+    path('metrics', metrics.metrics_view, name='metrics'),
+    path('debug/memory', memory.memory_view, name='memory_diagnostics'),
+    path(
+        f"{settings.MEDIA_URL.strip('/')}/r/<int:width>x<int:height>/<str:fit>/<path:path>",
+        image_cache.resize_view,
+        name='resized_image',
+    ),
 ]
\ No newline at end of file
@@ -1,24 +1,35 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.core.paginator import Paginator
-from django.db.models import Q
 from django.contrib import messages
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from django.views.decorators.http import require_http_methods
+from django.views.decorators.http import condition, require_http_methods
 from django.utils.decorators import method_decorator
 from django.views import View
+from django.conf import settings
+import hashlib
 import json
-from .models import CompanyInfo, LandProperty, ContactMessage
+from .models import CompanyInfo, LandProperty, ContactMessage, cover_image_prefetch, get_similar_projects, similar_projects_subquery
+from .ratelimit import rate_limit
+from .cache_utils import cache_page_coalesced, get_cache_version
+from .search import autocomplete
+from .fuzzy_search import search_land_properties
+from .cache_tags import add_cache_tags, get_land_property_tags, land_property_group_tag, land_property_list_tag, land_property_tag
 
 
+# Versions of everything rendered on the public pages, including the navbar and footer
+PAGE_CACHE_VERSIONS = ('land_properties', 'carousel', 'navbar', 'company_info')
+
+
+@cache_page_coalesced(PAGE_CACHE_VERSIONS)
 def home(request):
     """Home page view with featured land projects"""
     # Get featured land projects, if none exist, get any active land projects
-    featured_land_projects = LandProperty.objects.filter(is_featured=True, is_active=True)[:3]
+    featured_land_projects = LandProperty.objects.filter(is_featured=True, is_active=True).prefetch_related(cover_image_prefetch())[:3]
     
     # If no featured projects, get any active land projects
     if not featured_land_projects.exists():
-        featured_land_projects = LandProperty.objects.filter(is_active=True)[:3]
+        featured_land_projects = LandProperty.objects.filter(is_active=True).prefetch_related(cover_image_prefetch())[:3]
     
     company_info = CompanyInfo.objects.first()
     
@@ -27,12 +38,19 @@ def home(request):
         'company_info': company_info,
         'has_land_projects': LandProperty.objects.filter(is_active=True).exists(),
     }
-    return render(request, 'properties/home.html', context)
+    response = render(request, 'properties/home.html', context)
+    return add_cache_tags(response, [
+        'carousel',
+        land_property_list_tag(),
+        *get_land_property_tags(featured_land_projects),
+    ])
 
 
+@cache_page_coalesced(PAGE_CACHE_VERSIONS)
 def land_properties(request):
     """Land properties page with filtering"""
-    land_properties_list = LandProperty.objects.filter(is_active=True)
+    # Cards only show a cover photo; full galleries load on the detail page
+    land_properties_list = LandProperty.objects.filter(is_active=True).prefetch_related(cover_image_prefetch())
     
     # Filtering
     project_status = request.GET.get('status', '')
@@ -61,11 +79,8 @@ def land_properties(request):
         land_properties_list = land_properties_list.filter(area_name__icontains=area)
     
     if search:
-        land_properties_list = land_properties_list.filter(
-            Q(name__icontains=search) |
-            Q(location__icontains=search) |
-            Q(description__icontains=search)
-        )
+        # Ranked by similarity, so matching spelling variants of place names come first
+        land_properties_list = search_land_properties(land_properties_list, search)
     
     # Check if user wants to view all projects
     view_mode = request.GET.get('view', 'paginated')
@@ -112,21 +127,97 @@ def land_properties(request):
         'property_types': LandProperty.PROPERTY_TYPE,
         'divisions': LandProperty.DIVISIONS,
     }
-    return render(request, 'properties/land_properties.html', context)
+    response = render(request, 'properties/land_properties.html', context)
+    return add_cache_tags(response, [land_property_list_tag(division), *get_land_property_tags(page_obj)])
+
 
+def get_land_property_etag(request, slug):
+    """
+    ETag of a project page: its own content (updated_at, also bumped by
+    gallery changes), the similar-project cards and the navbar and footer
+    """
+    row = (
+        LandProperty.objects.filter(slug=slug, is_active=True)
+        .annotate(similar_group=similar_projects_subquery())
+        .values_list('updated_at', 'similar_group')
+        .first()
+    )
+    if row is None:
+        return None
+    updated_at, similar_group = row
+    fingerprint = json.dumps([
+        updated_at.isoformat(),
+        similar_group,
+        get_cache_version('navbar'),
+        get_cache_version('company_info'),
+    ])
+    return hashlib.md5(fingerprint.encode()).hexdigest()
 
 
+@condition(etag_func=get_land_property_etag)
+def land_property_detail(request, slug):
+    """
+    Land project page. The body and gallery are a template fragment cached
+    per updated_at; the similar projects come from the group's stored list,
+    loaded in the same query as the project.
+    """
+    land_property = get_object_or_404(
+        LandProperty.objects.annotate(similar_group=similar_projects_subquery()),
+        slug=slug,
+        is_active=True,
+    )
+    similar_projects = get_similar_projects(land_property, land_property.similar_group)
+    
+    context = {
+        'land_property': land_property,
+        # Only evaluated when the cached fragment is missing
+        'gallery': land_property.images.all(),
+        'similar_projects': similar_projects,
+        'fragment_timeout': getattr(settings, 'DETAIL_FRAGMENT_TIMEOUT', 60 * 60 * 24),
+    }
+    response = render(request, 'properties/land_property_detail.html', context)
+    return add_cache_tags(response, [
+        land_property_tag(land_property.pk),
+        land_property_group_tag(land_property.division, land_property.property_type),
+        *[land_property_tag(item['pk']) for item in similar_projects],
+    ])
+
+
+def land_property_detail_by_id(request, pk):
+    """Old numeric project URLs redirect to the slug page"""
+    land_property = get_object_or_404(LandProperty, pk=pk, is_active=True)
+    return redirect(land_property, permanent=True)
+
+
+def autocomplete_view(request):
+    """
+    Typeahead suggestions for the project search box, answered from this
+    worker's in-memory index as a compact list of [label, type, url]
+    """
+    query = request.GET.get('q', '')[:100]
+    response = JsonResponse(
+        autocomplete(query),
+        safe=False,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False},
+    )
+    response['Cache-Control'] = 'public, max-age=60'
+    return response
+
 
 def get_client_ip(request):
-    """Get client IP address"""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        ip = x_forwarded_for.split(',')[0]
-    else:
-        ip = request.META.get('REMOTE_ADDR')
-    return ip
+    """
+    Get client IP address. X-Forwarded-For is only trusted for the hops
+    added by our own proxies (TRUSTED_PROXY_COUNT): entries to their left
+    come from the client and can be anything.
+    """
+    trusted_proxies = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if trusted_proxies and len(forwarded) >= trusted_proxies:
+        return forwarded[-trusted_proxies]
+    return request.META.get('REMOTE_ADDR')
 
 
+@rate_limit(get_client_ip)
 def contact(request):
     """Contact page view"""
     if request.method == 'POST':
@@ -161,7 +252,7 @@ def contact(request):
                 messages.error(request, error)
         else:
             # Save contact message
-            contact_message = ContactMessage.objects.create(
+            contact_message, created = ContactMessage.record_submission(
                 first_name=first_name,
                 last_name=last_name,
                 email=email,
@@ -179,12 +270,14 @@ def contact(request):
     context = {
         'property_types': ContactMessage.PROPERTY_INTEREST_CHOICES,
         'budget_ranges': ContactMessage.BUDGET_CHOICES,
+        'static_snapshot': getattr(request, 'static_snapshot', False),
     }
     return render(request, 'properties/contact.html', context)
 
 
 @csrf_exempt
 @require_http_methods(["POST"])
+@rate_limit(get_client_ip, json_response=True)
 def contact_ajax(request):
     """AJAX contact form submission"""
     try:
@@ -222,7 +315,7 @@ def contact_ajax(request):
             })
         
         # Save contact message
-        contact_message = ContactMessage.objects.create(
+        contact_message, created = ContactMessage.record_submission(
             first_name=first_name,
             last_name=last_name,
             email=email,
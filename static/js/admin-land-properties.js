@@ -0,0 +1,166 @@
+// District data for each division
+const districtData = {
+    'dhaka': ['Dhaka', 'Gazipur', 'Narayanganj', 'Tangail', 'Kishoreganj', 'Manikganj', 'Munshiganj', 'Rajbari', 'Shariatpur', 'Faridpur', 'Madaripur', 'Gopalganj'],
+    'chittagong': ['Chittagong', 'Cox\'s Bazar', 'Rangamati', 'Bandarban', 'Khagrachhari', 'Feni', 'Lakshmipur', 'Chandpur', 'Comilla', 'Noakhali', 'Brahmanbaria'],
+    'rajshahi': ['Rajshahi', 'Natore', 'Nawabganj', 'Naogaon', 'Bogra', 'Joypurhat', 'Pabna', 'Sirajganj', 'Kushtia', 'Meherpur', 'Chuadanga', 'Jhenaidah', 'Magura', 'Narail'],
+    'khulna': ['Khulna', 'Bagerhat', 'Satkhira', 'Jessore', 'Jhenaidah', 'Magura', 'Narail', 'Kushtia', 'Meherpur', 'Chuadanga'],
+    'barisal': ['Barisal', 'Bhola', 'Patuakhali', 'Pirojpur', 'Barguna', 'Jhalokati'],
+    'sylhet': ['Sylhet', 'Moulvibazar', 'Habiganj', 'Sunamganj'],
+    'rangpur': ['Rangpur', 'Panchagarh', 'Nilphamari', 'Lalmonirhat', 'Kurigram', 'Gaibandha', 'Dinajpur', 'Thakurgaon'],
+    'mymensingh': ['Mymensingh', 'Netrokona', 'Jamalpur', 'Sherpur']
+};
+
+// Upazila data for each district
+const upazilaData = {
+    'Dhaka': ['Dhanmondi', 'Gulshan', 'Banani', 'Uttara', 'Mirpur', 'Mohammadpur', 'Ramna', 'Sutrapur', 'Kotwali', 'Lalbagh', 'Hazaribagh', 'Keraniganj', 'Savar', 'Dohar', 'Nawabganj', 'Dhamrai'],
+    'Gazipur': ['Gazipur Sadar', 'Kaliakair', 'Kapasia', 'Sreepur'],
+    'Narayanganj': ['Narayanganj Sadar', 'Sonargaon', 'Bandar', 'Rupganj', 'Araihazar'],
+    'Tangail': ['Tangail Sadar', 'Sakhipur', 'Basail', 'Madhupur', 'Ghatail', 'Kalihati', 'Nagarpur', 'Mirzapur', 'Gopalpur', 'Delduar', 'Bhuapur', 'Dhanbari'],
+    'Chittagong': ['Chittagong Sadar', 'Hathazari', 'Raojan', 'Sandwip', 'Satkania', 'Banshkhali', 'Boalkhali', 'Anwara', 'Chandanaish', 'Fatikchhari', 'Lohagara', 'Patiya', 'Rangunia'],
+    'Cox\'s Bazar': ['Cox\'s Bazar Sadar', 'Chakaria', 'Kutubdia', 'Ukhiya', 'Teknaf', 'Ramu', 'Pekua'],
+    'Comilla': ['Comilla Sadar', 'Barura', 'Brahmanpara', 'Burichang', 'Chandina', 'Chauddagram', 'Daudkandi', 'Debidwar', 'Homna', 'Laksam', 'Monohorgonj', 'Meghna', 'Muradnagar', 'Nangalkot', 'Titas'],
+    'Rajshahi': ['Rajshahi Sadar', 'Bagha', 'Bagatipara', 'Charghat', 'Durgapur', 'Godagari', 'Mohanpur', 'Paba', 'Puthia', 'Tanore'],
+    'Bogra': ['Bogra Sadar', 'Adamdighi', 'Dhunat', 'Dhupchanchia', 'Gabtali', 'Kahaloo', 'Nandigram', 'Sariakandi', 'Shajahanpur', 'Sherpur', 'Shibganj', 'Sonatala'],
+    'Khulna': ['Khulna Sadar', 'Batiaghata', 'Dacope', 'Dumuria', 'Dighalia', 'Koyra', 'Paikgachha', 'Phultala', 'Rupsa', 'Terokhada'],
+    'Barisal': ['Barisal Sadar', 'Agailjhara', 'Babuganj', 'Bakerganj', 'Banaripara', 'Gaurnadi', 'Hizla', 'Mehendiganj', 'Muladi', 'Wazirpur'],
+    'Sylhet': ['Sylhet Sadar', 'Balaganj', 'Beanibazar', 'Bishwanath', 'Balaganj', 'Companigonj', 'Fenchuganj', 'Golapganj', 'Gowainghat', 'Jaintiapur', 'Kanaighat', 'Osmani Nagar', 'Zakiganj'],
+    'Rangpur': ['Rangpur Sadar', 'Badarganj', 'Gangachara', 'Kaunia', 'Mithapukur', 'Pirgacha', 'Pirganj', 'Taraganj'],
+    'Mymensingh': ['Mymensingh Sadar', 'Bhaluka', 'Dhobaura', 'Fulbaria', 'Gaffargaon', 'Gauripur', 'Haluaghat', 'Ishwarganj', 'Muktagachha', 'Nandail', 'Phulpur', 'Tarakanda']
+};
+
+// Function to populate districts based on division
+function populateDistricts(division) {
+    const districtSelect = document.getElementById('district');
+    const upazilaSelect = document.getElementById('area_name');
+    
+    districtSelect.innerHTML = '<option value="">Select District</option>';
+    upazilaSelect.innerHTML = '<option value="">Select Upazila</option>';
+    
+    if (division && districtData[division]) {
+        districtData[division].forEach(district => {
+            const option = document.createElement('option');
+            option.value = district;
+            option.textContent = district;
+            districtSelect.appendChild(option);
+        });
+    }
+}
+
+// Function to populate upazilas based on district
+function populateUpazilas(district) {
+    const upazilaSelect = document.getElementById('area_name');
+    
+    upazilaSelect.innerHTML = '<option value="">Select Upazila</option>';
+    
+    if (district && upazilaData[district]) {
+        upazilaData[district].forEach(upazila => {
+            const option = document.createElement('option');
+            option.value = upazila;
+            option.textContent = upazila;
+            upazilaSelect.appendChild(option);
+        });
+    }
+}
+
+// Initialize dropdown functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const divisionSelect = document.getElementById('division');
+    const districtSelect = document.getElementById('district');
+    const upazilaSelect = document.getElementById('area_name');
+    
+    if (divisionSelect) {
+        divisionSelect.addEventListener('change', function() {
+            populateDistricts(this.value);
+        });
+    }
+    
+    if (districtSelect) {
+        districtSelect.addEventListener('change', function() {
+            populateUpazilas(this.value);
+        });
+    }
+});
+
+function openCreateModal() {
+    document.getElementById('modalTitle').textContent = 'Add New Land Property';
+    document.getElementById('action').value = 'create';
+    document.getElementById('land_property_id').value = '';
+    document.getElementById('landPropertyForm').reset();
+    document.getElementById('is_active').checked = true;
+    
+    // Reset dropdowns
+    document.getElementById('district').innerHTML = '<option value="">Select District</option>';
+    document.getElementById('area_name').innerHTML = '<option value="">Select Upazila</option>';
+    
+    document.getElementById('landPropertyModal').classList.remove('hidden');
+}
+
+function openEditModal(id, name, area, location, division, district, area_name, description, project_status, property_type, price_per_katha, total_plots, available_plots, amenities, is_featured, is_active) {
+    document.getElementById('modalTitle').textContent = 'Edit Land Property';
+    document.getElementById('action').value = 'update';
+    document.getElementById('land_property_id').value = id;
+    document.getElementById('name').value = name;
+    document.getElementById('area').value = area;
+    document.getElementById('location').value = location;
+    document.getElementById('division').value = division;
+    
+    // Populate districts and upazilas for edit modal
+    populateDistricts(division);
+    setTimeout(() => {
+        document.getElementById('district').value = district;
+        populateUpazilas(district);
+        setTimeout(() => {
+            document.getElementById('area_name').value = area_name;
+        }, 100);
+    }, 100);
+    
+    document.getElementById('description').value = description;
+    document.getElementById('project_status').value = project_status;
+    document.getElementById('property_type').value = property_type;
+    document.getElementById('price_per_katha').value = price_per_katha || '';
+    document.getElementById('total_plots').value = total_plots || '';
+    document.getElementById('available_plots').value = available_plots || '';
+    document.getElementById('amenities').value = amenities;
+    document.getElementById('is_featured').checked = is_featured;
+    document.getElementById('is_active').checked = is_active;
+    document.getElementById('landPropertyModal').classList.remove('hidden');
+}
+
+function closeModal() {
+    document.getElementById('landPropertyModal').classList.add('hidden');
+}
+
+function confirmDelete(id, name) {
+    document.getElementById('delete_land_property_id').value = id;
+    document.getElementById('deleteModal').classList.remove('hidden');
+}
+
+function closeDeleteModal() {
+    document.getElementById('deleteModal').classList.add('hidden');
+}
+
+function openGalleryModal(id, name) {
+    document.getElementById('gallery_land_property_id').value = id;
+    document.getElementById('galleryModalTitle').textContent = 'Add Gallery Images: ' + name;
+    document.getElementById('galleryModal').classList.remove('hidden');
+}
+
+function closeGalleryModal() {
+    document.getElementById('galleryModal').classList.add('hidden');
+}
+
+// Close modals when clicking outside
+window.onclick = function(event) {
+    const modal = document.getElementById('landPropertyModal');
+    const deleteModal = document.getElementById('deleteModal');
+    const galleryModal = document.getElementById('galleryModal');
+    if (event.target === modal) {
+        modal.classList.add('hidden');
+    }
+    if (event.target === deleteModal) {
+        deleteModal.classList.add('hidden');
+    }
+    if (event.target === galleryModal) {
+        galleryModal.classList.add('hidden');
+    }
+}
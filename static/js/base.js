@@ -0,0 +1,119 @@
+// Mobile drawer functionality
+const mobileMenuButton = document.getElementById('mobile-menu-button');
+const mobileMenu = document.getElementById('mobile-menu');
+const mobileDrawerOverlay = document.getElementById('mobile-drawer-overlay');
+const mobileDrawerClose = document.getElementById('mobile-drawer-close');
+const mobilePropertiesToggle = document.getElementById('mobile-properties-toggle');
+const mobilePropertiesMenu = document.getElementById('mobile-properties-menu');
+const mobilePropertiesArrow = document.getElementById('mobile-properties-arrow');
+const mobileCorporateToggle = document.getElementById('mobile-corporate-toggle');
+const mobileCorporateMenu = document.getElementById('mobile-corporate-menu');
+const mobileCorporateArrow = document.getElementById('mobile-corporate-arrow');
+
+// Open mobile drawer
+function openDrawer() {
+  mobileMenu.classList.remove('hidden');
+  mobileDrawerOverlay.classList.remove('hidden');
+  mobileMenu.classList.remove('translate-x-full');
+  mobileMenu.classList.add('translate-x-0');
+  document.body.style.overflow = 'hidden'; // Prevent background scrolling
+}
+
+// Close mobile drawer
+function closeDrawer() {
+  mobileMenu.classList.add('translate-x-full');
+  mobileMenu.classList.remove('translate-x-0');
+  setTimeout(() => {
+    mobileMenu.classList.add('hidden');
+    mobileDrawerOverlay.classList.add('hidden');
+  }, 300);
+  document.body.style.overflow = 'auto'; // Restore scrolling
+}
+
+// Toggle mobile drawer
+mobileMenuButton.addEventListener('click', function() {
+  if (mobileMenu.classList.contains('hidden')) {
+    openDrawer();
+  } else {
+    closeDrawer();
+  }
+});
+
+// Close drawer when clicking close button
+mobileDrawerClose.addEventListener('click', closeDrawer);
+
+// Close drawer when clicking overlay
+mobileDrawerOverlay.addEventListener('click', closeDrawer);
+
+// Toggle mobile properties dropdown
+if (mobilePropertiesToggle) {
+  mobilePropertiesToggle.addEventListener('click', function() {
+    mobilePropertiesMenu.classList.toggle('hidden');
+    mobilePropertiesArrow.classList.toggle('rotate-180');
+  });
+}
+
+// Toggle mobile corporate dropdown
+if (mobileCorporateToggle) {
+  mobileCorporateToggle.addEventListener('click', function() {
+    mobileCorporateMenu.classList.toggle('hidden');
+    mobileCorporateArrow.classList.toggle('rotate-180');
+  });
+}
+
+// Close drawer when clicking outside
+document.addEventListener('click', function(event) {
+  if (!mobileMenuButton.contains(event.target) && 
+      !mobileMenu.contains(event.target) && 
+      !mobileDrawerOverlay.contains(event.target)) {
+    closeDrawer();
+  }
+});
+
+// Close drawer on escape key
+document.addEventListener('keydown', function(event) {
+  if (event.key === 'Escape' && !mobileMenu.classList.contains('hidden')) {
+    closeDrawer();
+  }
+});
+
+// Scroll to top button
+const scrollToTopBtn = document.getElementById('scrollToTop');
+
+window.addEventListener('scroll', function() {
+  const scrollTop = window.pageYOffset || document.documentElement.scrollTop;
+  
+  // Scroll to top button visibility
+  if (scrollTop > 300) {
+    scrollToTopBtn.style.opacity = '1';
+    scrollToTopBtn.style.visibility = 'visible';
+    scrollToTopBtn.style.transform = 'translateY(0)';
+  } else {
+    scrollToTopBtn.style.opacity = '0';
+    scrollToTopBtn.style.visibility = 'invisible';
+    scrollToTopBtn.style.transform = 'translateY(20px)';
+  }
+});
+
+// Scroll to top functionality
+scrollToTopBtn.addEventListener('click', function() {
+  window.scrollTo({
+    top: 0,
+    behavior: 'smooth'
+  });
+});
+
+// Smooth scroll for anchor links
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+  anchor.addEventListener('click', function (e) {
+    e.preventDefault();
+    const target = document.querySelector(this.getAttribute('href'));
+    if (target) {
+      const offsetTop = target.offsetTop - 80; // Account for fixed navbar
+      window.scrollTo({
+        top: offsetTop,
+        behavior: 'smooth'
+      });
+    }
+  });
+});
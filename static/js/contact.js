@@ -0,0 +1,123 @@
+document.addEventListener('DOMContentLoaded', function() {
+  const contactForm = document.getElementById('contactForm');
+  
+  if (contactForm) {
+    contactForm.addEventListener('submit', function(e) {
+      const submitBtn = contactForm.querySelector('button[type="submit"]');
+      const originalText = submitBtn.innerHTML;
+      
+      // Show loading state
+      submitBtn.innerHTML = '<i class="fas fa-spinner fa-spin mr-2"></i>Sending...';
+      submitBtn.disabled = true;
+      
+      // Static snapshots have no CSRF token, so they post JSON to the AJAX endpoint
+      if (contactForm.dataset.ajaxUrl) {
+        e.preventDefault();
+        submitAjax(contactForm, function() {
+          submitBtn.innerHTML = originalText;
+          submitBtn.disabled = false;
+        });
+      }
+      
+      // Otherwise the form submits normally, this is just for visual feedback
+    });
+  }
+  
+  // Form validation
+  const inputs = document.querySelectorAll('#contactForm input, #contactForm textarea, #contactForm select');
+  inputs.forEach(input => {
+    input.addEventListener('blur', function() {
+      validateField(this);
+    });
+    
+    input.addEventListener('input', function() {
+      if (this.classList.contains('border-red-500')) {
+        validateField(this);
+      }
+    });
+  });
+});
+
+function submitAjax(form, done) {
+  const data = Object.fromEntries(new FormData(form).entries());
+  data.newsletter_subscription = form.querySelector('[name="newsletter_subscription"]').checked;
+  
+  fetch(form.dataset.ajaxUrl, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(data)
+  })
+    .then(response => response.json())
+    .then(result => {
+      if (result.success) {
+        form.reset();
+        showFormStatus([result.message], false);
+      } else {
+        showFormStatus(result.errors || ['An error occurred. Please try again.'], true);
+      }
+    })
+    .catch(() => showFormStatus(['An error occurred. Please try again.'], true))
+    .finally(done);
+}
+
+function showFormStatus(lines, isError) {
+  const status = document.getElementById('contactFormStatus');
+  status.className = (isError ? 'bg-red-100 border border-red-400 text-red-700' : 'bg-green-100 border border-green-400 text-green-700') + ' px-4 py-3 rounded mb-6';
+  status.replaceChildren(...lines.map(line => {
+    const p = document.createElement('p');
+    p.textContent = line;
+    return p;
+  }));
+}
+
+function validateField(field) {
+  const value = field.value.trim();
+  const fieldName = field.name;
+  
+  // Remove existing error styling
+  field.classList.remove('border-red-500', 'border-green-500');
+  
+  if (field.hasAttribute('required') && !value) {
+    field.classList.add('border-red-500');
+    return false;
+  }
+  
+  // Email validation
+  if (fieldName === 'email' && value) {
+    const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+    if (!emailRegex.test(value)) {
+      field.classList.add('border-red-500');
+      return false;
+    }
+  }
+  
+  // Phone validation
+  if (fieldName === 'phone' && value) {
+    const phoneRegex = /^[\+]?[0-9\s\-\(\)]{10,}$/;
+    if (!phoneRegex.test(value)) {
+      field.classList.add('border-red-500');
+      return false;
+    }
+  }
+  
+  // Add success styling for valid fields
+  if (value) {
+    field.classList.add('border-green-500');
+  }
+  
+  return true;
+}
+
+// Smooth scrolling for anchor links
+document.querySelectorAll('a[href^="#"]').forEach(anchor => {
+  anchor.addEventListener('click', function (e) {
+    e.preventDefault();
+    const target = document.querySelector(this.getAttribute('href'));
+    if (target) {
+      target.scrollIntoView({
+        behavior: 'smooth',
+        block: 'start'
+      });
+    }
+  });
+});
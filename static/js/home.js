@@ -0,0 +1,65 @@
+document.addEventListener("DOMContentLoaded", function () {
+  const slides = document.querySelector(".carousel-slides");
+  const dots = document.querySelectorAll(".carousel-dot");
+  const prevBtn = document.querySelector(".carousel-prev");
+  const nextBtn = document.querySelector(".carousel-next");
+  let currentSlide = 0;
+  const totalSlides = dots.length;
+
+  // Function to update carousel position
+  function updateCarousel() {
+    const translateX = -currentSlide * 100;
+    slides.style.transform = `translateX(${translateX}%)`;
+
+    // Update active dot
+    dots.forEach((dot, index) => {
+      if (index === currentSlide) {
+        dot.style.backgroundColor = "#4caf50";
+        dot.style.borderColor = "#4caf50";
+      } else {
+        dot.style.backgroundColor = "rgba(255,255,255,0.3)";
+        dot.style.borderColor = "rgba(255,255,255,0.5)";
+      }
+    });
+  }
+
+  // Next slide function
+  function nextSlide() {
+    currentSlide = (currentSlide + 1) % totalSlides;
+    updateCarousel();
+  }
+
+  // Previous slide function
+  function prevSlide() {
+    currentSlide = (currentSlide - 1 + totalSlides) % totalSlides;
+    updateCarousel();
+  }
+
+  // Event listeners
+  nextBtn.addEventListener("click", nextSlide);
+  prevBtn.addEventListener("click", prevSlide);
+
+  // Dot navigation
+  dots.forEach((dot, index) => {
+    dot.addEventListener("click", () => {
+      currentSlide = index;
+      updateCarousel();
+    });
+  });
+
+  // Auto-play functionality
+  let autoPlayInterval = setInterval(nextSlide, 5000);
+
+  // Pause auto-play on hover
+  const carouselContainer = document.querySelector(".carousel-container");
+  carouselContainer.addEventListener("mouseenter", () => {
+    clearInterval(autoPlayInterval);
+  });
+
+  carouselContainer.addEventListener("mouseleave", () => {
+    autoPlayInterval = setInterval(nextSlide, 5000);
+  });
+
+  // Initialize carousel
+  updateCarousel();
+});
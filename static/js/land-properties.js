@@ -0,0 +1,416 @@
+// Enhanced dropdown functionality
+document.addEventListener('DOMContentLoaded', function() {
+    const divisionSelect = document.getElementById('division-select');
+    const districtSelect = document.getElementById('district-select');
+    const upazilaSelect = document.getElementById('upazila-select');
+    
+    // District data for each division
+    const districtData = {
+        'dhaka': ['Dhaka', 'Gazipur', 'Narayanganj', 'Tangail', 'Kishoreganj', 'Manikganj', 'Munshiganj', 'Rajbari', 'Shariatpur', 'Faridpur', 'Madaripur', 'Gopalganj'],
+        'chittagong': ['Chittagong', 'Cox\'s Bazar', 'Rangamati', 'Bandarban', 'Khagrachhari', 'Feni', 'Lakshmipur', 'Chandpur', 'Comilla', 'Noakhali', 'Brahmanbaria'],
+        'rajshahi': ['Rajshahi', 'Natore', 'Nawabganj', 'Naogaon', 'Bogra', 'Joypurhat', 'Pabna', 'Sirajganj', 'Kushtia', 'Meherpur', 'Chuadanga', 'Jhenaidah', 'Magura', 'Narail'],
+        'khulna': ['Khulna', 'Bagerhat', 'Satkhira', 'Jessore', 'Jhenaidah', 'Magura', 'Narail', 'Kushtia', 'Meherpur', 'Chuadanga'],
+        'barisal': ['Barisal', 'Bhola', 'Patuakhali', 'Pirojpur', 'Barguna', 'Jhalokati'],
+        'sylhet': ['Sylhet', 'Moulvibazar', 'Habiganj', 'Sunamganj'],
+        'rangpur': ['Rangpur', 'Panchagarh', 'Nilphamari', 'Lalmonirhat', 'Kurigram', 'Gaibandha', 'Dinajpur', 'Thakurgaon'],
+        'mymensingh': ['Mymensingh', 'Netrokona', 'Jamalpur', 'Sherpur']
+    };
+    
+    // Upazila data for each district
+    const upazilaData = {
+        'Dhaka': ['Dhanmondi', 'Gulshan', 'Banani', 'Uttara', 'Mirpur', 'Mohammadpur', 'Ramna', 'Sutrapur', 'Kotwali', 'Lalbagh', 'Hazaribagh', 'Keraniganj', 'Savar', 'Dohar', 'Nawabganj', 'Dhamrai'],
+        'Gazipur': ['Gazipur Sadar', 'Kaliakair', 'Kapasia', 'Sreepur'],
+        'Narayanganj': ['Narayanganj Sadar', 'Sonargaon', 'Bandar', 'Rupganj', 'Araihazar'],
+        'Tangail': ['Tangail Sadar', 'Sakhipur', 'Basail', 'Madhupur', 'Ghatail', 'Kalihati', 'Nagarpur', 'Mirzapur', 'Gopalpur', 'Delduar', 'Bhuapur', 'Dhanbari'],
+        'Chittagong': ['Chittagong Sadar', 'Hathazari', 'Raojan', 'Sandwip', 'Satkania', 'Banshkhali', 'Boalkhali', 'Anwara', 'Chandanaish', 'Fatikchhari', 'Lohagara', 'Patiya', 'Rangunia'],
+        'Cox\'s Bazar': ['Cox\'s Bazar Sadar', 'Chakaria', 'Kutubdia', 'Ukhiya', 'Teknaf', 'Ramu', 'Pekua'],
+        'Comilla': ['Comilla Sadar', 'Barura', 'Brahmanpara', 'Burichang', 'Chandina', 'Chauddagram', 'Daudkandi', 'Debidwar', 'Homna', 'Laksam', 'Monohorgonj', 'Meghna', 'Muradnagar', 'Nangalkot', 'Titas'],
+        'Rajshahi': ['Rajshahi Sadar', 'Bagha', 'Bagatipara', 'Charghat', 'Durgapur', 'Godagari', 'Mohanpur', 'Paba', 'Puthia', 'Tanore'],
+        'Bogra': ['Bogra Sadar', 'Adamdighi', 'Dhunat', 'Dhupchanchia', 'Gabtali', 'Kahaloo', 'Nandigram', 'Sariakandi', 'Shajahanpur', 'Sherpur', 'Shibganj', 'Sonatala'],
+        'Khulna': ['Khulna Sadar', 'Batiaghata', 'Dacope', 'Dumuria', 'Dighalia', 'Koyra', 'Paikgachha', 'Phultala', 'Rupsa', 'Terokhada'],
+        'Barisal': ['Barisal Sadar', 'Agailjhara', 'Babuganj', 'Bakerganj', 'Banaripara', 'Gaurnadi', 'Hizla', 'Mehendiganj', 'Muladi', 'Wazirpur'],
+        'Sylhet': ['Sylhet Sadar', 'Balaganj', 'Beanibazar', 'Bishwanath', 'Balaganj', 'Companigonj', 'Fenchuganj', 'Golapganj', 'Gowainghat', 'Jaintiapur', 'Kanaighat', 'Osmani Nagar', 'Zakiganj'],
+        'Rangpur': ['Rangpur Sadar', 'Badarganj', 'Gangachara', 'Kaunia', 'Mithapukur', 'Pirgacha', 'Pirganj', 'Taraganj'],
+        'Mymensingh': ['Mymensingh Sadar', 'Bhaluka', 'Dhobaura', 'Fulbaria', 'Gaffargaon', 'Gauripur', 'Haluaghat', 'Ishwarganj', 'Muktagachha', 'Nandail', 'Phulpur', 'Tarakanda']
+    };
+    
+    // Function to populate districts based on division
+    function populateDistricts(division, preserveValues = false) {
+        console.log('Populating districts for division:', division, 'Preserve values:', preserveValues);
+        
+        // Store current values if preserving
+        const currentDistrict = preserveValues ? districtSelect.value : '';
+        const currentUpazila = preserveValues ? upazilaSelect.value : '';
+        
+        districtSelect.innerHTML = '<option value="">- select a district -</option>';
+        upazilaSelect.innerHTML = '<option value="">- select an upazila -</option>';
+        districtSelect.style.borderColor = '#22c55e'; // Green border for visual feedback
+        
+        if (division && districtData[division]) {
+            console.log('Found districts:', districtData[division]);
+            districtData[division].forEach(district => {
+                const option = document.createElement('option');
+                option.value = district;
+                option.textContent = district;
+                districtSelect.appendChild(option);
+            });
+            
+            // Restore selected district if preserving values
+            if (preserveValues && currentDistrict) {
+                districtSelect.value = currentDistrict;
+                console.log('Restored district value:', currentDistrict);
+            }
+        } else {
+            console.log('No districts found for division:', division);
+        }
+        
+        // Reset border color after a short delay
+        setTimeout(() => {
+            districtSelect.style.borderColor = '';
+        }, 1000);
+    }
+    
+    // Function to populate upazilas based on district
+    function populateUpazilas(district, preserveValues = false) {
+        console.log('Populating upazilas for district:', district, 'Preserve values:', preserveValues);
+        
+        // Store current value if preserving
+        const currentUpazila = preserveValues ? upazilaSelect.value : '';
+        
+        upazilaSelect.innerHTML = '<option value="">- select an upazila -</option>';
+        upazilaSelect.style.borderColor = '#22c55e'; // Green border for visual feedback
+        
+        if (district && upazilaData[district]) {
+            console.log('Found upazilas:', upazilaData[district]);
+            upazilaData[district].forEach(upazila => {
+                const option = document.createElement('option');
+                option.value = upazila;
+                option.textContent = upazila;
+                upazilaSelect.appendChild(option);
+            });
+            
+            // Restore selected upazila if preserving values
+            if (preserveValues && currentUpazila) {
+                upazilaSelect.value = currentUpazila;
+                console.log('Restored upazila value:', currentUpazila);
+            }
+        } else {
+            console.log('No upazilas found for district:', district);
+        }
+        
+        // Reset border color after a short delay
+        setTimeout(() => {
+            upazilaSelect.style.borderColor = '';
+        }, 1000);
+    }
+    
+    // Function to clear dependent dropdowns
+    function clearDependentDropdowns() {
+        districtSelect.innerHTML = '<option value="">- select a district -</option>';
+        upazilaSelect.innerHTML = '<option value="">- select an upazila -</option>';
+    }
+    
+    // Flag to prevent auto-submit during dropdown population
+    let isPopulatingDropdowns = false;
+    
+    // Event listeners
+    divisionSelect.addEventListener('change', function() {
+        const selectedDivision = this.value;
+        isPopulatingDropdowns = true;
+        
+        if (selectedDivision) {
+            populateDistricts(selectedDivision);
+            // Clear upazila dropdown when division changes
+            upazilaSelect.innerHTML = '<option value="">- select an upazila -</option>';
+        } else {
+            clearDependentDropdowns();
+        }
+        
+        // Reset flag and auto-submit form when division changes
+        setTimeout(() => {
+            isPopulatingDropdowns = false;
+            console.log('Submitting form after division change');
+            this.form.submit();
+        }, 200);
+    });
+    
+    districtSelect.addEventListener('change', function() {
+        const selectedDistrict = this.value;
+        console.log('District selected:', selectedDistrict);
+        isPopulatingDropdowns = true;
+        
+        if (selectedDistrict) {
+            populateUpazilas(selectedDistrict);
+        } else {
+            upazilaSelect.innerHTML = '<option value="">- select an upazila -</option>';
+        }
+        
+        // Reset flag and auto-submit form when district changes
+        setTimeout(() => {
+            isPopulatingDropdowns = false;
+            console.log('Submitting form after district change');
+            this.form.submit();
+        }, 200);
+    });
+    
+    upazilaSelect.addEventListener('change', function() {
+        console.log('Upazila selected:', this.value);
+        // Auto-submit form when upazila is selected
+        this.form.submit();
+    });
+    
+    // Add event listeners for radio buttons to auto-submit
+    const radioButtons = document.querySelectorAll('input[type="radio"]');
+    radioButtons.forEach(radio => {
+        radio.addEventListener('change', function() {
+            // Auto-submit form when any radio button changes
+            this.form.submit();
+        });
+    });
+    
+    // Initialize districts and upazilas on page load
+    if (divisionSelect.value) {
+        console.log('Initializing with division:', divisionSelect.value);
+        // Store the current values before populating
+        const currentDistrict = districtSelect.value;
+        const currentUpazila = upazilaSelect.value;
+        
+        console.log('Current values - District:', currentDistrict, 'Upazila:', currentUpazila);
+        
+        populateDistricts(divisionSelect.value, true);
+        
+        // Wait for districts to populate, then set district value
+        setTimeout(() => {
+            if (currentDistrict) {
+                console.log('Setting district value:', currentDistrict);
+                districtSelect.value = currentDistrict;
+                populateUpazilas(currentDistrict, false);
+                
+                // Wait for upazilas to populate, then set upazila value
+                setTimeout(() => {
+                    if (currentUpazila) {
+                        console.log('Setting upazila value:', currentUpazila);
+                        upazilaSelect.value = currentUpazila;
+                        console.log('Upazila value set to:', upazilaSelect.value);
+                        
+                        // Verify the value was set correctly
+                        if (upazilaSelect.value !== currentUpazila) {
+                            console.log('Upazila value not set correctly, trying again...');
+                            setTimeout(() => {
+                                upazilaSelect.value = currentUpazila;
+                                console.log('Upazila value retry set to:', upazilaSelect.value);
+                            }, 100);
+                        }
+                    }
+                }, 200);
+            }
+        }, 100);
+    } else if (districtSelect.value) {
+        // If only district is selected (no division), still try to populate upazilas
+        console.log('Only district selected:', districtSelect.value);
+        const currentUpazila = upazilaSelect.value;
+        populateUpazilas(districtSelect.value, false);
+        
+        setTimeout(() => {
+            if (currentUpazila) {
+                console.log('Setting upazila value for district only:', currentUpazila);
+                upazilaSelect.value = currentUpazila;
+            }
+        }, 200);
+    }
+    
+    // Debug: Log initial form values
+    logFormValues();
+    
+    // Add visual feedback for dropdown changes
+    [divisionSelect, districtSelect, upazilaSelect].forEach(select => {
+        select.addEventListener('change', function() {
+            this.style.borderColor = '#22c55e';
+            setTimeout(() => {
+                this.style.borderColor = '';
+            }, 1000);
+        });
+    });
+    
+    // Prevent form submission during dropdown population
+    const form = document.querySelector('form');
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            if (isPopulatingDropdowns) {
+                e.preventDefault();
+                return false;
+            }
+            // Allow normal form submission for all other cases
+        });
+    }
+    
+    // Debug: Log form data on submission
+    if (form) {
+        form.addEventListener('submit', function(e) {
+            console.log('Form submitted with data:');
+            const formData = new FormData(form);
+            for (let [key, value] of formData.entries()) {
+                console.log(key + ': ' + value);
+            }
+        });
+    }
+    
+    // Debug: Log all form field values
+    function logFormValues() {
+        console.log('Current form values:');
+        console.log('Division:', divisionSelect.value);
+        console.log('District:', districtSelect.value);
+        console.log('Upazila:', upazilaSelect.value);
+    }
+});
+
+// Filter toggle functionality
+function toggleFilters() {
+    const filterOptions = document.getElementById('filterOptions');
+    if (filterOptions.classList.contains('hidden')) {
+        filterOptions.classList.remove('hidden');
+    } else {
+        filterOptions.classList.add('hidden');
+    }
+}
+
+function clearFilters() {
+    // Clear all radio buttons
+    document.querySelectorAll('input[type="radio"]').forEach(radio => {
+        radio.checked = false;
+    });
+    
+    // Clear all select dropdowns
+    document.getElementById('division-select').value = '';
+    document.getElementById('district-select').value = '';
+    document.getElementById('upazila-select').value = '';
+    
+    // Submit form to clear filters
+    document.querySelector('form').submit();
+}
+
+// Search box typeahead, fed by the autocomplete endpoint
+document.addEventListener('DOMContentLoaded', function() {
+    const input = document.getElementById('search-input');
+    const list = document.getElementById('search-suggestions');
+    if (!input || !list) {
+        return;
+    }
+
+    const url = input.dataset.autocompleteUrl;
+    const typeLabels = { project: 'Project', area: 'Area', district: 'District', location: 'Location' };
+    // Responses by query, so retyping or backspacing never refetches
+    const results = {};
+    let suggestions = [];
+    let active = -1;
+    let timer = null;
+    let controller = null;
+
+    function close() {
+        list.classList.add('hidden');
+        list.innerHTML = '';
+        input.setAttribute('aria-expanded', 'false');
+        suggestions = [];
+        active = -1;
+    }
+
+    function render(items) {
+        suggestions = items;
+        active = -1;
+        list.innerHTML = '';
+        if (!items.length) {
+            close();
+            return;
+        }
+        items.forEach(([label, type, href], index) => {
+            const item = document.createElement('li');
+            item.id = `search-suggestion-${index}`;
+            item.setAttribute('role', 'option');
+            item.className = 'flex items-center justify-between px-4 py-2 cursor-pointer hover:bg-gray-100';
+
+            const text = document.createElement('span');
+            text.className = 'text-gray-800 truncate';
+            text.textContent = label;
+            const badge = document.createElement('span');
+            badge.className = 'ml-3 text-xs text-gray-500';
+            badge.textContent = typeLabels[type] || type;
+            item.append(text, badge);
+
+            // mousedown fires before the input loses focus and closes the list
+            item.addEventListener('mousedown', function(e) {
+                e.preventDefault();
+                window.location.href = href;
+            });
+            list.appendChild(item);
+        });
+        list.classList.remove('hidden');
+        input.setAttribute('aria-expanded', 'true');
+    }
+
+    function highlight(index) {
+        const items = list.children;
+        if (active >= 0 && items[active]) {
+            items[active].classList.remove('bg-gray-100');
+            items[active].removeAttribute('aria-selected');
+        }
+        active = index;
+        if (active >= 0 && items[active]) {
+            items[active].classList.add('bg-gray-100');
+            items[active].setAttribute('aria-selected', 'true');
+            input.setAttribute('aria-activedescendant', items[active].id);
+        } else {
+            input.removeAttribute('aria-activedescendant');
+        }
+    }
+
+    function fetchSuggestions(query) {
+        if (results[query]) {
+            render(results[query]);
+            return;
+        }
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        fetch(`${url}?q=${encodeURIComponent(query)}`, { signal: controller.signal })
+            .then(response => response.ok ? response.json() : [])
+            .then(items => {
+                results[query] = items;
+                // Ignore answers to queries the visitor has already typed past
+                if (input.value.trim() === query) {
+                    render(items);
+                }
+            })
+            .catch(() => {});
+    }
+
+    input.addEventListener('input', function() {
+        clearTimeout(timer);
+        const query = this.value.trim();
+        if (!query) {
+            close();
+            return;
+        }
+        timer = setTimeout(() => fetchSuggestions(query), 80);
+    });
+
+    input.addEventListener('keydown', function(e) {
+        if (!suggestions.length) {
+            return;
+        }
+        if (e.key === 'ArrowDown') {
+            e.preventDefault();
+            highlight((active + 1) % suggestions.length);
+        } else if (e.key === 'ArrowUp') {
+            e.preventDefault();
+            highlight(active <= 0 ? suggestions.length - 1 : active - 1);
+        } else if (e.key === 'Enter' && active >= 0) {
+            e.preventDefault();
+            window.location.href = suggestions[active][2];
+        } else if (e.key === 'Escape') {
+            close();
+        }
+    });
+
+    input.addEventListener('blur', close);
+});
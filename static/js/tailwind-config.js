@@ -0,0 +1,24 @@
+tailwind.config = {
+  theme: {
+    extend: {
+      colors: {
+        "matrichaya-light-green": "#69e46dcb",
+        "matrichaya-dark-green": "#4caf50",
+      },
+      fontFamily: {
+        sans: [
+          "Roboto",
+          "ui-sans-serif",
+          "system-ui",
+          "-apple-system",
+          "BlinkMacSystemFont",
+          "Segoe UI",
+          "Helvetica Neue",
+          "Arial",
+          "Noto Sans",
+          "sans-serif",
+        ],
+      },
+    },
+  },
+};